@@ -39,11 +39,17 @@ import {
   CheckSquare,
   MessageCircle,
   ExternalLink,
+  ChevronUp,
+  ChevronDown,
 } from "lucide-react"
 import { useRouter } from "next/navigation"
 import { createClient } from "@/lib/supabase/client"
 import Link from "next/link"
 
+// Lets this server instance serve the edited content right away instead of
+// waiting for the content cache to re-check versions.
+const invalidateContentCache = () => fetch("/api/modules/invalidate", { method: "POST" }).catch(() => {})
+
 interface TransformationModule {
   id: string
   title: string
@@ -89,6 +95,57 @@ interface ContentTemplate {
   is_active: boolean
 }
 
+interface ModuleBundle {
+  module: TransformationModule
+  sections: ModuleSection[]
+  config: ModuleConfiguration | null
+  // Content version the bundle was read at; saves based on it are rejected
+  // once someone else has saved the module.
+  version: number
+}
+
+const loadModuleBundle = async (moduleId: string) => {
+  const supabase = createClient()
+  const { data, error } = await supabase.rpc("get_module_bundle", { target_module_id: moduleId })
+  if (error) throw error
+  return data as ModuleBundle | null
+}
+
+// Saves the module and its complete, ordered list of sections in one
+// transaction (scripts/038_save_module_bundle.sql): sections left out are
+// deleted and order_index follows the array. Pass sections as null to leave
+// them untouched, and version as null to skip the conflict check.
+const saveModuleBundle = async (
+  module: Partial<TransformationModule>,
+  sections: Partial<ModuleSection>[] | null,
+  version: number | null,
+) => {
+  const supabase = createClient()
+  const { data, error } = await supabase.rpc("save_module_bundle", {
+    module,
+    sections:
+      sections?.map(({ id, title, content, section_type, estimated_duration_minutes, is_active }) => ({
+        id,
+        title,
+        content,
+        section_type,
+        estimated_duration_minutes,
+        is_active,
+      })) ?? null,
+    expected_version: version,
+  })
+  if (error) throw error
+
+  await invalidateContentCache()
+  return data as { module_id: string; version: number }
+}
+
+const alertOnConflict = (error: unknown) => {
+  if ((error as { code?: string } | null)?.code === "PT409") {
+    alert("Este módulo foi alterado por outra pessoa. Recarregue a página e aplique suas alterações novamente.")
+  }
+}
+
 const mockModules: TransformationModule[] = [
   {
     id: "1",
@@ -149,6 +206,7 @@ export default function ContentEditorPage() {
   const [selectedModule, setSelectedModule] = useState<TransformationModule | null>(null)
   const [sections, setSections] = useState<ModuleSection[]>([])
   const [configuration, setConfiguration] = useState<ModuleConfiguration | null>(null)
+  const [moduleVersion, setModuleVersion] = useState<number | null>(null)
   const [templates, setTemplates] = useState<ContentTemplate[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [activeTab, setActiveTab] = useState("modules")
@@ -182,36 +240,26 @@ export default function ContentEditorPage() {
           console.log("[v0] Loaded modules from database:", modulesData.length)
         } else {
           console.log("[v0] No modules in database, creating from mock data")
-          // Insert mock modules into database for admin editing
+          // Insert mock modules, each with a default section, into database for admin editing
           for (const mockModule of mockModules) {
-            const { error: insertError } = await supabase
-              .from("transformation_modules")
-              .insert({
-                id: mockModule.id,
-                title: mockModule.title,
-                description: mockModule.description,
-                category: mockModule.category,
-                estimated_duration_minutes: mockModule.estimated_duration_minutes,
-                difficulty_level: mockModule.difficulty_level,
-                content_type: mockModule.content_type,
-                content_url: mockModule.content_url,
-                is_active: mockModule.is_active,
-                order_index: mockModule.order_index,
-              })
-              .select()
-              .single()
-
-            if (!insertError) {
-              // Create default section for each module
-              await supabase.from("module_sections").insert({
-                module_id: mockModule.id,
-                title: "Conteúdo Principal",
-                content: getDefaultSectionContent(mockModule),
-                section_type: mockModule.content_type === "video" ? "video" : "text",
-                order_index: 1,
-                estimated_duration_minutes: mockModule.estimated_duration_minutes,
-                is_active: true,
-              })
+            // Mock ids are not UUIDs; the database assigns real ones.
+            const { id, created_at, ...moduleData } = mockModule
+            try {
+              await saveModuleBundle(
+                moduleData,
+                [
+                  {
+                    title: "Conteúdo Principal",
+                    content: getDefaultSectionContent(mockModule),
+                    section_type: mockModule.content_type === "video" ? "video" : "text",
+                    estimated_duration_minutes: mockModule.estimated_duration_minutes,
+                    is_active: true,
+                  },
+                ],
+                null,
+              )
+            } catch (error) {
+              console.warn("[v0] Could not create mock module:", mockModule.title, error)
             }
           }
 
@@ -257,106 +305,62 @@ export default function ContentEditorPage() {
   }
 
   const loadModuleDetails = async (moduleId: string) => {
-    const supabase = createClient()
-
     try {
       console.log("[v0] Loading details for module:", moduleId)
 
-      // Load sections - handle case where table might not exist yet
-      let sectionsData = []
-      try {
-        const { data, error: sectionsError } = await supabase
-          .from("module_sections")
-          .select("*")
-          .eq("module_id", moduleId)
-          .order("order_index", { ascending: true })
-
-        if (sectionsError) {
-          console.warn("[v0] Module sections table not found")
-        } else {
-          sectionsData = data || []
-        }
-      } catch (error) {
-        console.warn("[v0] Module sections not available yet")
-      }
-
-      // Load configuration - handle case where table might not exist yet
-      let configData = null
-      try {
-        const { data, error: configError } = await supabase
-          .from("module_configurations")
-          .select("*")
-          .eq("module_id", moduleId)
-          .single()
-
-        if (configError && configError.code !== "PGRST116") {
-          console.warn("[v0] Module configurations table not found")
-        } else {
-          configData = data
-        }
-      } catch (error) {
-        console.warn("[v0] Module configurations not available yet")
-      }
+      // Module, sections, configuration and content version in one call
+      const bundle = await loadModuleBundle(moduleId)
 
-      console.log("[v0] Loaded sections:", sectionsData.length)
-      setSections(sectionsData)
-      setConfiguration(configData)
+      console.log("[v0] Loaded sections:", bundle?.sections.length ?? 0)
+      setSections(bundle?.sections || [])
+      setConfiguration(bundle?.config || null)
+      setModuleVersion(bundle?.version ?? null)
     } catch (error) {
       console.error("[v0] Error loading module details:", error)
     }
   }
 
-  const saveModule = async (moduleData: Partial<TransformationModule>) => {
-    const supabase = createClient()
-
+  const saveModule = async (
+    moduleData: Partial<TransformationModule>,
+    moduleSections: ModuleSection[] | null,
+    version: number | null,
+  ) => {
     try {
-      if (editingModule?.id) {
-        // Update existing module
-        const { error } = await supabase.from("transformation_modules").update(moduleData).eq("id", editingModule.id)
-
-        if (error) throw error
-      } else {
-        // Create new module
-        const { error } = await supabase.from("transformation_modules").insert(moduleData)
-
-        if (error) throw error
-      }
+      // Creates the module when editingModule is null
+      await saveModuleBundle({ ...moduleData, id: editingModule?.id }, moduleSections, version)
 
       await loadData()
+      if (selectedModule && selectedModule.id === editingModule?.id) {
+        await loadModuleDetails(selectedModule.id)
+      }
       setShowModuleDialog(false)
       setEditingModule(null)
     } catch (error) {
       console.error("[v0] Error saving module:", error)
+      alertOnConflict(error)
     }
   }
 
+  // Section edits on the content tab are saved through the same bundle call,
+  // with the whole section list, so they are checked for conflicts too.
   const saveSection = async (sectionData: Partial<ModuleSection>) => {
-    const supabase = createClient()
+    // moduleVersion is set once the sections are loaded; before that the
+    // list would be saved empty.
+    if (!selectedModule || moduleVersion === null) return
+
+    const nextSections = editingSection?.id
+      ? sections.map((section) => (section.id === editingSection.id ? { ...section, ...sectionData } : section))
+      : [...sections, { ...sectionData, id: crypto.randomUUID() }]
 
     try {
-      if (editingSection?.id) {
-        // Update existing section
-        const { error } = await supabase.from("module_sections").update(sectionData).eq("id", editingSection.id)
-
-        if (error) throw error
-      } else {
-        // Create new section
-        const { error } = await supabase.from("module_sections").insert({
-          ...sectionData,
-          module_id: selectedModule?.id,
-          order_index: sections.length + 1,
-        })
-
-        if (error) throw error
-      }
+      await saveModuleBundle({ id: selectedModule.id }, nextSections, moduleVersion)
 
-      if (selectedModule) {
-        await loadModuleDetails(selectedModule.id)
-      }
+      await loadModuleDetails(selectedModule.id)
       setShowSectionDialog(false)
       setEditingSection(null)
     } catch (error) {
       console.error("[v0] Error saving section:", error)
+      alertOnConflict(error)
     }
   }
 
@@ -372,11 +376,13 @@ export default function ContentEditorPage() {
 
       if (error) throw error
 
+      await invalidateContentCache()
       await loadData()
       if (selectedModule?.id === moduleId) {
         setSelectedModule(null)
         setSections([])
         setConfiguration(null)
+        setModuleVersion(null)
       }
     } catch (error) {
       console.error("[v0] Error deleting module:", error)
@@ -384,22 +390,21 @@ export default function ContentEditorPage() {
   }
 
   const deleteSection = async (sectionId: string) => {
-    if (!confirm("Tem certeza que deseja deletar esta seção?")) {
+    if (!selectedModule || moduleVersion === null || !confirm("Tem certeza que deseja deletar esta seção?")) {
       return
     }
 
-    const supabase = createClient()
-
     try {
-      const { error } = await supabase.from("module_sections").delete().eq("id", sectionId)
-
-      if (error) throw error
+      await saveModuleBundle(
+        { id: selectedModule.id },
+        sections.filter((section) => section.id !== sectionId),
+        moduleVersion,
+      )
 
-      if (selectedModule) {
-        await loadModuleDetails(selectedModule.id)
-      }
+      await loadModuleDetails(selectedModule.id)
     } catch (error) {
       console.error("[v0] Error deleting section:", error)
+      alertOnConflict(error)
     }
   }
 
@@ -934,7 +939,7 @@ function ModuleForm({
   onCancel,
 }: {
   module: TransformationModule | null
-  onSave: (data: Partial<TransformationModule>) => void
+  onSave: (data: Partial<TransformationModule>, sections: ModuleSection[] | null, version: number | null) => void
   onCancel: () => void
 }) {
   const [formData, setFormData] = useState({
@@ -949,7 +954,9 @@ function ModuleForm({
     order_index: module?.order_index || 1,
   })
 
+  // Section changes are kept here and saved together with the module.
   const [sections, setSections] = useState<ModuleSection[]>([])
+  const [version, setVersion] = useState<number | null>(null)
   const [editingSection, setEditingSection] = useState<ModuleSection | null>(null)
   const [showSectionForm, setShowSectionForm] = useState(false)
 
@@ -960,16 +967,11 @@ function ModuleForm({
   }, [module])
 
   const loadModuleSections = async (moduleId: string) => {
-    const supabase = createClient()
     try {
-      const { data, error } = await supabase
-        .from("module_sections")
-        .select("*")
-        .eq("module_id", moduleId)
-        .order("order_index", { ascending: true })
-
-      if (!error && data) {
-        setSections(data)
+      const bundle = await loadModuleBundle(moduleId)
+      if (bundle) {
+        setSections(bundle.sections)
+        setVersion(bundle.version)
       }
     } catch (error) {
       console.warn("[v0] Could not load sections:", error)
@@ -978,7 +980,9 @@ function ModuleForm({
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault()
-    onSave(formData)
+    // Without a loaded version the sections never arrived; saving the empty
+    // list would delete them.
+    onSave(formData, module?.id && version === null ? null : sections, version)
   }
 
   const addSection = () => {
@@ -991,51 +995,32 @@ function ModuleForm({
     setShowSectionForm(true)
   }
 
-  const saveSection = async (sectionData: Partial<ModuleSection>) => {
-    const supabase = createClient()
-
-    try {
-      if (editingSection?.id) {
-        // Update existing section
-        const { error } = await supabase.from("module_sections").update(sectionData).eq("id", editingSection.id)
-
-        if (error) throw error
-      } else {
-        // Create new section
-        const { error } = await supabase.from("module_sections").insert({
-          ...sectionData,
-          module_id: module?.id || "temp",
-          order_index: sections.length + 1,
-        })
-
-        if (error) throw error
-      }
-
-      if (module?.id) {
-        await loadModuleSections(module.id)
-      }
-      setShowSectionForm(false)
-      setEditingSection(null)
-    } catch (error) {
-      console.error("[v0] Error saving section:", error)
+  const saveSection = (sectionData: Partial<ModuleSection>) => {
+    if (editingSection?.id) {
+      setSections(
+        sections.map((section) => (section.id === editingSection.id ? { ...section, ...sectionData } : section)),
+      )
+    } else {
+      setSections([...sections, { ...sectionData, id: crypto.randomUUID(), module_id: module?.id } as ModuleSection])
     }
+    setShowSectionForm(false)
+    setEditingSection(null)
   }
 
-  const deleteSection = async (sectionId: string) => {
+  const deleteSection = (sectionId: string) => {
     if (!confirm("Tem certeza que deseja deletar esta seção?")) return
 
-    const supabase = createClient()
-    try {
-      const { error } = await supabase.from("module_sections").delete().eq("id", sectionId)
+    setSections(sections.filter((section) => section.id !== sectionId))
+  }
 
-      if (error) throw error
+  const moveSection = (index: number, offset: number) => {
+    const target = index + offset
+    if (target < 0 || target >= sections.length) return
 
-      if (module?.id) {
-        await loadModuleSections(module.id)
-      }
-    } catch (error) {
-      console.error("[v0] Error deleting section:", error)
-    }
+    const reordered = [...sections]
+    const [moved] = reordered.splice(index, 1)
+    reordered.splice(target, 0, moved)
+    setSections(reordered)
   }
 
   return (
@@ -1174,7 +1159,9 @@ function ModuleForm({
         <div className="flex items-center justify-between">
           <div>
             <h3 className="text-lg font-semibold">Conteúdo do Módulo</h3>
-            <p className="text-sm text-muted-foreground">Gerencie as seções de conteúdo que os usuários verão</p>
+            <p className="text-sm text-muted-foreground">
+              Gerencie as seções de conteúdo que os usuários verão. As alterações são salvas com o módulo.
+            </p>
           </div>
           <Button onClick={addSection} size="sm">
             <Plus className="w-4 h-4 mr-2" />
@@ -1202,6 +1189,17 @@ function ModuleForm({
                     <p className="text-sm text-muted-foreground line-clamp-2">{section.content.substring(0, 150)}...</p>
                   </div>
                   <div className="flex items-center space-x-1 ml-4">
+                    <Button variant="ghost" size="sm" disabled={index === 0} onClick={() => moveSection(index, -1)}>
+                      <ChevronUp className="w-3 h-3" />
+                    </Button>
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      disabled={index === sections.length - 1}
+                      onClick={() => moveSection(index, 1)}
+                    >
+                      <ChevronDown className="w-3 h-3" />
+                    </Button>
                     <Button variant="ghost" size="sm" onClick={() => editSection(section)}>
                       <Edit className="w-3 h-3" />
                     </Button>
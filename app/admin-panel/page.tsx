@@ -3,19 +3,18 @@
 import { useEffect, useState } from "react"
 import { useRouter } from "next/navigation"
 import { Button } from "@/components/ui/button"
+import { Input } from "@/components/ui/input"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table"
 import { Progress } from "@/components/ui/progress"
-import { ChevronLeft, ChevronRight, Download, Settings, Edit } from "lucide-react"
+import { ChevronLeft, ChevronRight, Download, Settings, Edit, Search } from "lucide-react"
 import { format } from "date-fns"
 import { ptBR } from "date-fns/locale"
 
-import { createAdminClient } from "@/lib/supabase/admin-client"
-
 interface Client {
   id: string
   email: string
   display_name: string
-  created_at: string
+  created_at: string | null
   progress_percentage: number
   phone?: string
 }
@@ -27,6 +26,12 @@ export default function AdminPanelPage() {
   const [clients, setClients] = useState<Client[]>([])
   const [currentPage, setCurrentPage] = useState(1)
   const [totalClients, setTotalClients] = useState(0)
+  const [listTotal, setListTotal] = useState(0)
+  const [listTotalIsEstimate, setListTotalIsEstimate] = useState(false)
+  // pageCursors[n] is the keyset cursor that loads page n + 1 (null for the first)
+  const [pageCursors, setPageCursors] = useState<(string | null)[]>([null])
+  const [searchInput, setSearchInput] = useState("")
+  const [search, setSearch] = useState("")
   const [exporting, setExporting] = useState(false)
 
   const CLIENTS_PER_PAGE = 20
@@ -45,7 +50,6 @@ export default function AdminPanelPage() {
 
         setIsAuthenticated(true)
         setIsLoading(false)
-        fetchClients()
       } catch (error) {
         console.error("Admin access check error:", error)
         router.push("/login")
@@ -53,128 +57,66 @@ export default function AdminPanelPage() {
     }
 
     checkAdminAccess()
-  }, [router, currentPage])
+  }, [router])
 
-  const fetchClients = async () => {
-    const supabase = createAdminClient()
+  useEffect(() => {
+    if (isAuthenticated) fetchClients()
+  }, [isAuthenticated, currentPage, search])
+
+  // Search after the admin stops typing, starting again from the first page
+  useEffect(() => {
+    const timeout = setTimeout(() => {
+      if (searchInput.trim() === search) return
+      setPageCursors([null])
+      setCurrentPage(1)
+      setSearch(searchInput.trim())
+    }, 300)
+    return () => clearTimeout(timeout)
+  }, [searchInput, search])
 
+  const fetchClients = async () => {
     try {
-      console.log("[v0] Fetching clients from database...")
-
-      // Get total count from user_profiles table
-      const { count } = await supabase.from("user_profiles").select("*", { count: "exact", head: true })
-      setTotalClients(count || 0)
-      console.log("[v0] Total clients found:", count)
-
-      // Get paginated clients with progress data from user_profiles table
-      const { data: userProfiles, error } = await supabase
-        .from("user_profiles")
-        .select(`
-          id,
-          user_id,
-          email,
-          display_name,
-          created_at,
-          user_progress (
-            progress_percentage
-          )
-        `)
-        .range((currentPage - 1) * CLIENTS_PER_PAGE, currentPage * CLIENTS_PER_PAGE - 1)
-        .order("created_at", { ascending: false })
-
-      if (error) {
-        console.error("[v0] Database error:", error)
-        throw error
+      // Keyset pages: the cursor of the page before, never an OFFSET
+      const params = new URLSearchParams({ limit: String(CLIENTS_PER_PAGE) })
+      const cursor = pageCursors[currentPage - 1]
+      if (cursor) params.set("cursor", cursor)
+      if (search) params.set("search", search)
+
+      const response = await fetch(`/api/admin/clients?${params}`)
+      if (!response.ok) {
+        throw new Error(`Failed to fetch clients: ${response.status}`)
       }
+      const data = await response.json()
 
-      console.log("[v0] User profiles data received:", userProfiles)
-
-      const clientsData =
-        userProfiles?.map((profile, index) => ({
-          id: profile.id,
-          email: profile.email || "",
-          display_name: profile.display_name || "Sem nome",
-          created_at: profile.created_at,
-          progress_percentage: profile.user_progress?.[0]?.progress_percentage || 0,
-          phone: "+55 (11) 99999-9999", // Placeholder since phone is not in user_profiles
-        })) || []
-
-      console.log("[v0] Processed clients data:", clientsData)
-      setClients(clientsData)
+      // Totals only come with the first page
+      if (data.total !== undefined) {
+        setListTotal(data.total)
+        setListTotalIsEstimate(data.totalIsEstimate)
+        if (!search) setTotalClients(data.total)
+      }
+      setPageCursors((prev) => {
+        const next = prev.slice(0, currentPage)
+        next[currentPage] = data.nextCursor
+        return next
+      })
+      setClients(data.clients || [])
     } catch (error) {
       console.error("[v0] Erro ao buscar clientes:", error)
       alert("Erro ao carregar clientes. Verifique o console para mais detalhes.")
     }
   }
 
-  const exportClients = async () => {
-    console.log("[v0] Starting CSV export...")
+  const exportClients = () => {
+    // The server streams the CSV page by page, so the browser writes it
+    // straight to disk instead of building the whole file in memory.
     setExporting(true)
-    const supabase = createAdminClient()
-
-    try {
-      const { data: allUserProfiles, error } = await supabase
-        .from("user_profiles")
-        .select(`
-          id,
-          user_id,
-          email,
-          display_name,
-          created_at,
-          user_progress (
-            progress_percentage
-          )
-        `)
-        .order("created_at", { ascending: false })
-
-      if (error) {
-        console.error("[v0] Export error:", error)
-        throw error
-      }
-
-      console.log("[v0] Export data received:", allUserProfiles)
-
-      if (!allUserProfiles || allUserProfiles.length === 0) {
-        alert("Nenhum cliente encontrado para exportar.")
-        return
-      }
-
-      const exportData = allUserProfiles.map((profile, index) => ({
-        "Número de Inscrição": index + 1,
-        "Data de Inscrição": format(new Date(profile.created_at), "dd/MM/yyyy", { locale: ptBR }),
-        Nome: profile.display_name || "Sem nome",
-        Email: profile.email || "",
-        Telefone: "+55 (11) 99999-9999", // Placeholder
-        "Progressão (%)": profile.user_progress?.[0]?.progress_percentage || 0,
-      }))
-
-      // Convert to CSV with proper encoding
-      const headers = Object.keys(exportData[0])
-      const csvContent = [
-        headers.join(","),
-        ...exportData.map((row) => headers.map((header) => `"${row[header as keyof typeof row]}"`).join(",")),
-      ].join("\n")
-
-      const BOM = "\uFEFF"
-      const blob = new Blob([BOM + csvContent], { type: "text/csv;charset=utf-8;" })
-      const link = document.createElement("a")
-      const url = URL.createObjectURL(blob)
-      link.setAttribute("href", url)
-      link.setAttribute("download", `clientes_renove_se_${format(new Date(), "dd_MM_yyyy")}.csv`)
-      link.style.visibility = "hidden"
-      document.body.appendChild(link)
-      link.click()
-      document.body.removeChild(link)
-      URL.revokeObjectURL(url)
-
-      console.log("[v0] CSV export completed successfully")
-      alert(`Exportação concluída! ${exportData.length} clientes exportados.`)
-    } catch (error) {
-      console.error("[v0] Erro ao exportar clientes:", error)
-      alert("Erro ao exportar clientes. Verifique o console para mais detalhes.")
-    } finally {
-      setExporting(false)
-    }
+    const link = document.createElement("a")
+    link.setAttribute("href", "/api/admin/export?dataset=clients&format=csv")
+    link.style.visibility = "hidden"
+    document.body.appendChild(link)
+    link.click()
+    document.body.removeChild(link)
+    setTimeout(() => setExporting(false), 1000)
   }
 
   const handleLogout = () => {
@@ -186,7 +128,9 @@ export default function AdminPanelPage() {
     }
   }
 
-  const totalPages = Math.ceil(totalClients / CLIENTS_PER_PAGE)
+  const totalPages = Math.max(1, Math.ceil(listTotal / CLIENTS_PER_PAGE))
+  // Large tables report an estimated total
+  const approx = listTotalIsEstimate ? "~" : ""
 
   if (isLoading) {
     return (
@@ -349,6 +293,15 @@ export default function AdminPanelPage() {
                 </h2>
                 <p className="text-sm text-gray-500">Gestión completa com ID, data, telefone e exportação</p>
               </div>
+              <div className="relative w-64">
+                <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-4 h-4 text-gray-400" />
+                <Input
+                  value={searchInput}
+                  onChange={(e) => setSearchInput(e.target.value)}
+                  placeholder="Buscar por nome ou email"
+                  className="pl-9"
+                />
+              </div>
               <Button
                 onClick={exportClients}
                 disabled={exporting}
@@ -384,7 +337,7 @@ export default function AdminPanelPage() {
                           #{(currentPage - 1) * CLIENTS_PER_PAGE + index + 1}
                         </TableCell>
                         <TableCell className="font-medium">
-                          {format(new Date(client.created_at), "dd/MM/yyyy", { locale: ptBR })}
+                          {client.created_at ? format(new Date(client.created_at), "dd/MM/yyyy", { locale: ptBR }) : "—"}
                         </TableCell>
                         <TableCell className="font-medium">{client.display_name}</TableCell>
                         <TableCell>{client.email}</TableCell>
@@ -404,8 +357,9 @@ export default function AdminPanelPage() {
 
                 <div className="flex items-center justify-between mt-6 pt-4 border-t border-gray-200">
                   <div className="text-sm text-gray-500 font-medium">
-                    Mostrando {(currentPage - 1) * CLIENTS_PER_PAGE + 1} a{" "}
-                    {Math.min(currentPage * CLIENTS_PER_PAGE, totalClients)} de {totalClients} clientes
+                    Mostrando {clients.length ? (currentPage - 1) * CLIENTS_PER_PAGE + 1 : 0} a{" "}
+                    {(currentPage - 1) * CLIENTS_PER_PAGE + clients.length} de {approx}
+                    {listTotal} clientes
                   </div>
 
                   <div className="flex items-center gap-2">
@@ -422,17 +376,16 @@ export default function AdminPanelPage() {
 
                     <div className="flex items-center gap-1 px-3 py-1 bg-blue-100 text-blue-800 rounded-md">
                       <span className="text-sm font-medium">
-                        Página {currentPage} de {Math.ceil(totalClients / CLIENTS_PER_PAGE)}
+                        Página {currentPage} de {approx}
+                        {Math.max(totalPages, currentPage)}
                       </span>
                     </div>
 
                     <Button
                       variant="outline"
                       size="sm"
-                      onClick={() =>
-                        setCurrentPage((prev) => Math.min(Math.ceil(totalClients / CLIENTS_PER_PAGE), prev + 1))
-                      }
-                      disabled={currentPage === Math.ceil(totalClients / CLIENTS_PER_PAGE)}
+                      onClick={() => setCurrentPage((prev) => prev + 1)}
+                      disabled={!pageCursors[currentPage]}
                       className="flex items-center gap-1 font-medium"
                     >
                       Próximos 20
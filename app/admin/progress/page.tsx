@@ -59,12 +59,16 @@ export default async function AdminProgressPage() {
     // Get progress statistics by category
     const { data: categoryStats } = await supabase.rpc("get_progress_stats_by_category")
 
+    // Status totals from the per-user progress summaries
+    const { data: statusTotals } = await supabase.rpc("get_progress_status_totals").single()
+
     return (
       <ProgressTracking
         adminUser={adminUser}
         progressData={progressData || []}
         sessionsData={sessionsData || []}
         categoryStats={categoryStats || []}
+        statusTotals={statusTotals}
       />
     )
   } catch (error) {
@@ -94,55 +94,34 @@ export default function AnalyticsPage() {
     }
 
     try {
-      // Load goals data
-      const { data: goals } = await supabase.from("goals").select("*").eq("user_id", user.id)
-
-      // Load reflections data
-      const { data: reflections } = await supabase
-        .from("daily_reflections")
-        .select("*")
-        .eq("user_id", user.id)
-        .order("reflection_date", { ascending: false })
-
-      // Load module progress
-      const { data: moduleProgress } = await supabase.from("user_module_progress").select("*").eq("user_id", user.id)
-
-      // Load habits
-      const { data: habits } = await supabase.from("habits").select("*").eq("user_id", user.id)
-
-      // Calculate analytics
-      const totalGoals = goals?.length || 0
-      const completedGoals = goals?.filter((g) => g.status === "completed").length || 0
-      const activeGoals = goals?.filter((g) => g.status === "active").length || 0
-      const completionRate = totalGoals > 0 ? Math.round((completedGoals / totalGoals) * 100) : 0
+      const tz = Intl.DateTimeFormat().resolvedOptions().timeZone
+
+      // Counters, goals by category and the daily series in one call
+      const [{ data: stats, error }, { data: streaks }] = await Promise.all([
+        supabase.rpc("get_user_analytics", { days_back: 30, tz }),
+        supabase.rpc("get_user_streaks", { tz }),
+      ])
 
-      const totalReflections = reflections?.length || 0
-      const averageMoodRating =
-        reflections?.length > 0
-          ? Math.round((reflections.reduce((sum, r) => sum + (r.mood_rating || 0), 0) / reflections.length) * 10) / 10
-          : 0
+      if (error) throw error
+      if (!stats) return
 
-      const totalModulesCompleted = moduleProgress?.filter((m) => m.status === "completed").length || 0
-      const totalHabits = habits?.length || 0
-      const activeHabits = habits?.filter((h) => h.is_active).length || 0
+      const reflectionStreak = streaks?.find((s: { kind: string }) => s.kind === "reflection")
+
+      const totalGoals = stats.total_goals
+      const completedGoals = stats.completed_goals
+      const completionRate = totalGoals > 0 ? Math.round((completedGoals / totalGoals) * 100) : 0
 
       setAnalytics({
         totalGoals,
         completedGoals,
-        activeGoals,
+        activeGoals: stats.active_goals,
         completionRate,
-        totalReflections,
-        currentStreak: 7, // Mock data for now
-        averageMoodRating,
-        totalModulesCompleted,
-        totalHabits,
-        activeHabits,
-      })
-
-      // Process goals by category
-      const categoryData: { [key: string]: number } = {}
-      goals?.forEach((goal) => {
-        categoryData[goal.category] = (categoryData[goal.category] || 0) + 1
+        totalReflections: stats.total_reflections,
+        currentStreak: reflectionStreak?.current_streak || 0,
+        averageMoodRating: Number(stats.average_mood_rating),
+        totalModulesCompleted: stats.total_modules_completed,
+        totalHabits: stats.total_habits,
+        activeHabits: stats.active_habits,
       })
 
       const categoryColors = {
@@ -162,32 +141,22 @@ export default function AnalyticsPage() {
       }
 
       setGoalsByCategory(
-        Object.entries(categoryData).map(([category, count]) => ({
+        Object.entries(stats.goals_by_category as Record<string, number>).map(([category, count]) => ({
           name: categoryLabels[category as keyof typeof categoryLabels] || category,
           value: count,
           color: categoryColors[category as keyof typeof categoryColors] || "#8B5CF6",
         })),
       )
 
-      // Generate mock time series data for the last 30 days
-      const timeSeriesData: TimeSeriesData[] = []
-      for (let i = 29; i >= 0; i--) {
-        const date = new Date()
-        date.setDate(date.getDate() - i)
-
-        const dateStr = date.toISOString().split("T")[0]
-        const dayReflections = reflections?.filter((r) => r.reflection_date === dateStr) || []
-        const dayGoalsCompleted =
-          goals?.filter((g) => g.completed_at && new Date(g.completed_at).toDateString() === date.toDateString())
-            .length || 0
-
-        timeSeriesData.push({
-          date: date.toLocaleDateString("pt-BR", { day: "2-digit", month: "2-digit" }),
-          goals: dayGoalsCompleted,
-          reflections: dayReflections.length,
-          mood: dayReflections.length > 0 ? dayReflections[0].mood_rating || 0 : 0,
-        })
-      }
+      // Daily series for the last 30 days, already bucketed by the server
+      const timeSeriesData: TimeSeriesData[] = (stats.series || []).map(
+        (day: { day: string; goals_completed: number; reflections: number; mood: number }) => ({
+          date: new Date(`${day.day}T00:00:00`).toLocaleDateString("pt-BR", { day: "2-digit", month: "2-digit" }),
+          goals: day.goals_completed,
+          reflections: day.reflections,
+          mood: day.mood,
+        }),
+      )
 
       setProgressOverTime(timeSeriesData)
     } catch (error) {
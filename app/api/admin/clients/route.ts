@@ -0,0 +1,95 @@
+import { NextResponse, type NextRequest } from "next/server"
+import { createAdminClient } from "@/lib/supabase/admin-client"
+import { rejectNonAdminRequest } from "@/lib/supabase/admin"
+
+// Client list for /admin-panel: keyset pages over (created_at, id), newest
+// first, so every page costs the same however deep it is.
+// GET /api/admin/clients?cursor=&limit=&search=
+// The total comes only with the first page and is an estimate on large
+// tables (totalIsEstimate).
+
+export const dynamic = "force-dynamic"
+
+const DEFAULT_PAGE_SIZE = 20
+const MAX_PAGE_SIZE = 500
+
+interface ClientCursor {
+  createdAt: string | null
+  id: string
+}
+
+function encodeCursor(cursor: ClientCursor) {
+  return Buffer.from(JSON.stringify(cursor)).toString("base64url")
+}
+
+function decodeCursor(value: string | null): ClientCursor | null {
+  if (!value) return null
+  try {
+    const cursor = JSON.parse(Buffer.from(value, "base64url").toString("utf8"))
+    const createdAtValid = typeof cursor?.createdAt === "string" || cursor?.createdAt === null
+    return createdAtValid && typeof cursor?.id === "string" ? cursor : null
+  } catch {
+    return null
+  }
+}
+
+export async function GET(request: NextRequest) {
+  try {
+    const rejection = await rejectNonAdminRequest()
+    if (rejection) return rejection
+
+    const supabase = createAdminClient()
+    const { searchParams } = request.nextUrl
+
+    const cursorParam = searchParams.get("cursor")
+    const cursor = decodeCursor(cursorParam)
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 })
+    }
+    const pageSize = Math.min(Math.max(Number(searchParams.get("limit")) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    const search = searchParams.get("search")?.trim() || null
+
+    const [pageResult, countResult] = await Promise.all([
+      supabase.rpc("get_admin_clients_page", {
+        after_created_at: cursor?.createdAt ?? null,
+        after_id: cursor?.id ?? null,
+        page_size: pageSize,
+        search,
+      }),
+      cursor ? null : supabase.rpc("get_admin_clients_count", { search }).single(),
+    ])
+
+    if (pageResult.error || countResult?.error) {
+      console.error("Error fetching clients:", pageResult.error || countResult?.error)
+      return NextResponse.json({ error: "Failed to fetch clients" }, { status: 500 })
+    }
+
+    const rows = pageResult.data || []
+    const clients = rows.map((profile) => ({
+      id: profile.id,
+      email: profile.email || "",
+      display_name: profile.display_name || "Sem nome",
+      created_at: profile.created_at,
+      progress_percentage: profile.progress_percentage,
+      phone: "+55 (11) 99999-9999", // Placeholder since phone is not in user_profiles
+    }))
+
+    const lastRow = rows[rows.length - 1]
+    const nextCursor =
+      rows.length === pageSize && lastRow ? encodeCursor({ createdAt: lastRow.created_at, id: lastRow.id }) : null
+
+    if (!countResult) {
+      return NextResponse.json({ clients, nextCursor })
+    }
+
+    return NextResponse.json({
+      clients,
+      nextCursor,
+      total: countResult.data?.total ?? 0,
+      totalIsEstimate: countResult.data?.is_estimate ?? false,
+    })
+  } catch (error) {
+    console.error("Admin clients API error:", error)
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 })
+  }
+}
@@ -1,84 +1,106 @@
-import { NextResponse } from "next/server"
+import { NextResponse, type NextRequest } from "next/server"
 import { createAdminClient } from "@/lib/supabase/admin-client"
 
-export async function GET() {
+const DEFAULT_PAGE_SIZE = 50
+const MAX_PAGE_SIZE = 500
+
+interface ProgressCursor {
+  updatedAt: string
+  id: string
+}
+
+function encodeCursor(cursor: ProgressCursor) {
+  return Buffer.from(JSON.stringify(cursor)).toString("base64url")
+}
+
+function decodeCursor(value: string | null): ProgressCursor | null {
+  if (!value) return null
+  try {
+    const cursor = JSON.parse(Buffer.from(value, "base64url").toString("utf8"))
+    return typeof cursor?.updatedAt === "string" && typeof cursor?.id === "string" ? cursor : null
+  } catch {
+    return null
+  }
+}
+
+export async function GET(request: NextRequest) {
   try {
     const supabase = createAdminClient()
+    const { searchParams } = request.nextUrl
 
-    // Fetch user profiles
-    const { data: profiles, error: profilesError } = await supabase
-      .from("user_profiles")
-      .select("*")
-      .order("created_at", { ascending: false })
+    const cursorParam = searchParams.get("cursor")
+    const cursor = decodeCursor(cursorParam)
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 })
+    }
+    const pageSize = Math.min(Math.max(Number(searchParams.get("limit")) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
 
-    if (profilesError) {
-      console.error("Error fetching profiles:", profilesError)
+    // Progress summary: one keyset page, newest first
+    const progressPage = supabase.rpc("get_admin_progress_page", {
+      after_updated_at: cursor?.updatedAt ?? null,
+      after_id: cursor?.id ?? null,
+      page_size: pageSize,
+    })
+
+    // Stats and recent users only come with the first page
+    const [statsResult, profilesResult, progressResult] = await Promise.all([
+      cursor ? null : supabase.rpc("get_admin_dashboard_stats").single(),
+      cursor
+        ? null
+        : supabase
+            .from("user_profiles")
+            .select("id, user_id, email, display_name, language, created_at, updated_at")
+            .order("created_at", { ascending: false })
+            .limit(10),
+      progressPage,
+    ])
+
+    if (statsResult?.error || profilesResult?.error) {
+      console.error("Error fetching dashboard stats:", statsResult?.error || profilesResult?.error)
       return NextResponse.json({ error: "Failed to fetch profiles" }, { status: 500 })
     }
 
-    // Fetch user progress
-    const { data: progressData, error: progressError } = await supabase
-      .from("user_progress")
-      .select(`
-        *,
-        user_profiles!inner(email, display_name)
-      `)
-      .order("updated_at", { ascending: false })
-
-    if (progressError) {
-      console.error("Error fetching progress:", progressError)
+    if (progressResult.error) {
+      console.error("Error fetching progress:", progressResult.error)
     }
 
-    // Calculate statistics
-    const now = new Date()
-    const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-    const oneMonthAgo = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000)
-
-    const totalUsers = profiles?.length || 0
-    const newUsersWeek = profiles?.filter((p) => new Date(p.created_at) >= oneWeekAgo).length || 0
-    const newUsersMonth = profiles?.filter((p) => new Date(p.created_at) >= oneMonthAgo).length || 0
-
-    const totalCompletions = progressData?.filter((p) => p.status === "completed").length || 0
-    const activeUsersWeek = progressData
-      ? new Set(progressData.filter((p) => new Date(p.updated_at) >= oneWeekAgo).map((p) => p.user_id)).size
-      : 0
-
-    const stats = {
-      total_users: totalUsers,
-      new_users_week: newUsersWeek,
-      new_users_month: newUsersMonth,
-      total_completions: totalCompletions,
-      active_users_week: activeUsersWeek,
-      active_users_month: newUsersMonth,
+    const progressRows = progressResult.data || []
+
+    // Format progress summary
+    const progressSummary = progressRows.map((progress) => ({
+      user_id: progress.user_id,
+      email: progress.email || "Unknown",
+      protocol_id: progress.protocol_id,
+      status: progress.status,
+      progress_percentage: progress.progress_percentage,
+      profiles: {
+        email: progress.email || "Unknown",
+        first_name: progress.display_name || progress.email?.split("@")[0] || "Unknown",
+        last_name: "",
+      },
+    }))
+
+    const lastRow = progressRows[progressRows.length - 1]
+    const nextCursor =
+      progressRows.length === pageSize && lastRow ? encodeCursor({ updatedAt: lastRow.updated_at, id: lastRow.id }) : null
+
+    if (cursor) {
+      return NextResponse.json({ progressSummary, nextCursor })
     }
 
     // Format recent users
     const recentUsers =
-      profiles?.slice(0, 10).map((profile) => ({
+      profilesResult?.data?.map((profile) => ({
         ...profile,
         first_name: profile.display_name || profile.email?.split("@")[0] || "Unknown",
         last_name: "",
       })) || []
 
-    // Format progress summary
-    const progressSummary =
-      progressData?.map((progress) => ({
-        user_id: progress.user_id,
-        email: progress.user_profiles?.email || "Unknown",
-        protocol_id: progress.protocol_id,
-        status: progress.status,
-        progress_percentage: progress.progress_percentage,
-        profiles: {
-          email: progress.user_profiles?.email || "Unknown",
-          first_name: progress.user_profiles?.display_name || progress.user_profiles?.email?.split("@")[0] || "Unknown",
-          last_name: "",
-        },
-      })) || []
-
     return NextResponse.json({
-      stats,
+      stats: statsResult?.data,
       recentUsers,
       progressSummary,
+      nextCursor,
     })
   } catch (error) {
     console.error("Admin dashboard API error:", error)
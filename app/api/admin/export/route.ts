@@ -0,0 +1,141 @@
+import { NextResponse, type NextRequest } from "next/server"
+import { format } from "date-fns"
+import { createAdminClient } from "@/lib/supabase/admin-client"
+import { rejectNonAdminRequest } from "@/lib/supabase/admin"
+
+// Streams admin exports page by page (keyset pagination through the
+// export_*_page functions), so memory stays constant whatever the row count.
+// GET /api/admin/export?dataset=clients|progress&format=csv|ndjson
+// Progress exports also take status, category and search filters.
+// Parquet is produced offline by scripts/export_data.py.
+
+export const dynamic = "force-dynamic"
+
+const PAGE_SIZE = 2000
+
+type Row = Record<string, unknown>
+
+interface Page {
+  rows: Row[]
+  done: boolean
+}
+
+function csvCell(value: unknown) {
+  if (value === null || value === undefined) return ""
+  const text = typeof value === "object" ? JSON.stringify(value) : String(value)
+  return /[",\n\r]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text
+}
+
+// Clients: same columns as the old in-browser export.
+function clientPages() {
+  const supabase = createAdminClient()
+  let cursor: { createdAt: string | null; id: string } | null = null
+  let number = 0
+
+  return async (): Promise<Page> => {
+    const { data, error } = await supabase.rpc("export_clients_page", {
+      after_created_at: cursor?.createdAt ?? null,
+      after_id: cursor?.id ?? null,
+      page_size: PAGE_SIZE,
+    })
+    if (error) throw error
+
+    const last = data[data.length - 1]
+    if (last) cursor = { createdAt: last.created_at, id: last.id }
+
+    const rows = data.map((profile: Row) => ({
+      "Número de Inscrição": ++number,
+      "Data de Inscrição": profile.created_at ? format(new Date(profile.created_at as string), "dd/MM/yyyy") : "",
+      Nome: profile.display_name || "Sem nome",
+      Email: profile.email || "",
+      Telefone: "+55 (11) 99999-9999", // Placeholder
+      "Progressão (%)": profile.progress_percentage,
+    }))
+    return { rows, done: data.length < PAGE_SIZE }
+  }
+}
+
+function progressPages(params: URLSearchParams) {
+  const supabase = createAdminClient()
+  let afterId: string | null = null
+
+  return async (): Promise<Page> => {
+    const { data, error } = await supabase.rpc("export_progress_page", {
+      after_id: afterId,
+      page_size: PAGE_SIZE,
+      status_filter: params.get("status") || null,
+      category_filter: params.get("category") || null,
+      search: params.get("search") || null,
+    })
+    if (error) throw error
+
+    if (data.length > 0) afterId = data[data.length - 1].id
+    return { rows: data.map((row: { record: Row }) => row.record), done: data.length < PAGE_SIZE }
+  }
+}
+
+export async function GET(request: NextRequest) {
+  const rejection = await rejectNonAdminRequest()
+  if (rejection) return rejection
+
+  const params = request.nextUrl.searchParams
+  const dataset = params.get("dataset") || "clients"
+  const outputFormat = params.get("format") || "csv"
+  if (!["clients", "progress"].includes(dataset) || !["csv", "ndjson"].includes(outputFormat)) {
+    return NextResponse.json({ error: "Unsupported dataset or format" }, { status: 400 })
+  }
+
+  const nextPage = dataset === "clients" ? clientPages() : progressPages(params)
+  const encoder = new TextEncoder()
+  let headers: string[] | null = null
+  let finished = false
+
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      // Excel needs the BOM to read the CSV as UTF-8
+      if (outputFormat === "csv") controller.enqueue(encoder.encode("﻿"))
+    },
+    // Called whenever the client is ready for more, so a slow download
+    // never buffers more than one page.
+    async pull(controller) {
+      if (finished) {
+        controller.close()
+        return
+      }
+      try {
+        const page = await nextPage()
+        finished = page.done
+
+        let chunk = ""
+        if (outputFormat === "ndjson") {
+          chunk = page.rows.map((row) => JSON.stringify(row)).join("\n") + (page.rows.length ? "\n" : "")
+        } else {
+          if (!headers && page.rows.length > 0) {
+            headers = Object.keys(page.rows[0])
+            chunk += headers.map(csvCell).join(",") + "\n"
+          }
+          for (const row of page.rows) {
+            chunk += headers!.map((header) => csvCell(row[header])).join(",") + "\n"
+          }
+        }
+        if (chunk) controller.enqueue(encoder.encode(chunk))
+        if (finished) controller.close()
+      } catch (error) {
+        console.error("Export stream error:", error)
+        controller.error(error)
+      }
+    },
+  })
+
+  const stamp = format(new Date(), "dd_MM_yyyy")
+  const filename =
+    dataset === "clients" ? `clientes_renove_se_${stamp}.${outputFormat}` : `renove-se-progress-${stamp}.${outputFormat}`
+
+  return new Response(stream, {
+    headers: {
+      "Content-Type": outputFormat === "csv" ? "text/csv; charset=utf-8" : "application/x-ndjson; charset=utf-8",
+      "Content-Disposition": `attachment; filename="${filename}"`,
+      "Cache-Control": "no-store",
+    },
+  })
+}
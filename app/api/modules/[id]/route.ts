@@ -0,0 +1,22 @@
+import { NextResponse, type NextRequest } from "next/server"
+import { getCachedModule } from "@/lib/content-cache"
+
+export const dynamic = "force-dynamic"
+
+export async function GET(request: NextRequest, { params }: { params: { id: string } }) {
+  try {
+    const entry = await getCachedModule(params.id)
+    if (!entry) {
+      return NextResponse.json({ error: "Module not found" }, { status: 404 })
+    }
+    // With a current bundle the page fetches the pre-rendered sections from
+    // storage, so the raw markdown is left out unless ?raw is passed.
+    const withSections = !entry.bundle || request.nextUrl.searchParams.has("raw")
+    return NextResponse.json(
+      withSections ? entry : { version: entry.version, module: entry.module, bundle: entry.bundle },
+    )
+  } catch (error) {
+    console.error("Error loading module:", error)
+    return NextResponse.json({ error: "Failed to load module" }, { status: 500 })
+  }
+}
@@ -0,0 +1,27 @@
+import { timingSafeEqual } from "crypto"
+import { NextResponse, type NextRequest } from "next/server"
+import { cacheStats, invalidateContentCache } from "@/lib/content-cache"
+import { rejectNonAdminRequest } from "@/lib/supabase/admin"
+
+// Called by the content editor after every save, and by
+// scripts/content_cache.py with the x-cache-secret header set to
+// CONTENT_CACHE_SECRET. Anyone else could keep this instance re-reading the
+// content versions, so other callers must be signed-in admins.
+function hasCacheSecret(request: NextRequest) {
+  const secret = process.env.CONTENT_CACHE_SECRET
+  const sent = request.headers.get("x-cache-secret")
+  if (!secret || !sent) return false
+  const expected = Buffer.from(secret)
+  const actual = Buffer.from(sent)
+  return expected.length === actual.length && timingSafeEqual(expected, actual)
+}
+
+export async function POST(request: NextRequest) {
+  if (!hasCacheSecret(request)) {
+    const rejection = await rejectNonAdminRequest()
+    if (rejection) return rejection
+  }
+
+  invalidateContentCache()
+  return NextResponse.json({ success: true, ...cacheStats })
+}
@@ -0,0 +1,15 @@
+import { NextResponse } from "next/server"
+import { getCachedCatalog } from "@/lib/content-cache"
+
+// Served from the module content cache; never prerendered at build time.
+export const dynamic = "force-dynamic"
+
+export async function GET() {
+  try {
+    const catalog = await getCachedCatalog()
+    return NextResponse.json(catalog)
+  } catch (error) {
+    console.error("Error loading modules:", error)
+    return NextResponse.json({ error: "Failed to load modules" }, { status: 500 })
+  }
+}
@@ -0,0 +1,70 @@
+import { NextResponse, type NextRequest } from "next/server"
+import { createClient } from "@/lib/supabase/server"
+
+// Progress events are queued here and applied to user_module_progress in
+// coalesced batches by scripts/progress_worker.py.
+
+const MAX_EVENTS = 100
+const STATUSES = ["not_started", "in_progress", "completed"]
+
+interface ProgressEvent {
+  module_id: string
+  status?: string
+  progress_percentage?: number
+  notes?: string
+}
+
+function toRow(userId: string, event: ProgressEvent) {
+  if (typeof event?.module_id !== "string") return null
+  if (event.status !== undefined && !STATUSES.includes(event.status)) return null
+  if (
+    event.progress_percentage !== undefined &&
+    !(Number.isInteger(event.progress_percentage) && event.progress_percentage >= 0 && event.progress_percentage <= 100)
+  ) {
+    return null
+  }
+  if (event.notes !== undefined && typeof event.notes !== "string") return null
+
+  return {
+    user_id: userId,
+    module_id: event.module_id,
+    status: event.status ?? null,
+    progress_percentage: event.progress_percentage ?? null,
+    notes: event.notes ?? null,
+  }
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    const supabase = await createClient()
+    const {
+      data: { user },
+    } = await supabase.auth.getUser()
+
+    if (!user) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+    }
+
+    const body = await request.json().catch(() => null)
+    const events: ProgressEvent[] = Array.isArray(body?.events) ? body.events : body ? [body] : []
+    if (events.length === 0 || events.length > MAX_EVENTS) {
+      return NextResponse.json({ error: `Send between 1 and ${MAX_EVENTS} events` }, { status: 400 })
+    }
+
+    const rows = events.map((event) => toRow(user.id, event))
+    if (rows.some((row) => row === null)) {
+      return NextResponse.json({ error: "Invalid event" }, { status: 400 })
+    }
+
+    const { error } = await supabase.from("progress_events").insert(rows)
+    if (error) {
+      console.error("Error queueing progress events:", error)
+      return NextResponse.json({ error: "Failed to queue events" }, { status: 500 })
+    }
+
+    return NextResponse.json({ queued: rows.length }, { status: 202 })
+  } catch (error) {
+    console.error("Progress events API error:", error)
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 })
+  }
+}
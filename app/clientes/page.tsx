@@ -45,27 +45,26 @@ export default function ClientsPage() {
       // Get paginated clients with progress data
       const { data: profiles, error } = await supabase
         .from("user_profiles")
-        .select(`
-          id,
-          email,
-          display_name,
-          created_at,
-          user_progress (
-            progress_percentage
-          )
-        `)
+        .select("id, user_id, email, display_name, created_at")
         .range((currentPage - 1) * CLIENTS_PER_PAGE, currentPage * CLIENTS_PER_PAGE - 1)
         .order("created_at", { ascending: false })
 
       if (error) throw error
 
+      // One summary row per client instead of every progress row
+      const { data: summaries } = await supabase
+        .from("user_progress_summary")
+        .select("user_id, overall_percentage")
+        .in("user_id", (profiles || []).map((profile) => profile.user_id))
+      const percentageByUser = new Map((summaries || []).map((summary) => [summary.user_id, summary.overall_percentage]))
+
       const clientsData =
         profiles?.map((profile, index) => ({
           id: profile.id,
           email: profile.email || "",
           display_name: profile.display_name || "Sem nome",
           created_at: profile.created_at,
-          progress_percentage: profile.user_progress?.[0]?.progress_percentage || 0,
+          progress_percentage: percentageByUser.get(profile.user_id) || 0,
           phone: "+55 (11) 99999-9999", // Placeholder - adicione campo phone na tabela se necessário
         })) || []
 
@@ -77,59 +76,16 @@ export default function ClientsPage() {
     }
   }
 
-  const exportClients = async () => {
+  const exportClients = () => {
+    // Streamed by /api/admin/export; see app/admin-panel/page.tsx
     setExporting(true)
-    const supabase = createClient()
-
-    try {
-      // Get all clients for export
-      const { data: allProfiles, error } = await supabase
-        .from("user_profiles")
-        .select(`
-          id,
-          email,
-          display_name,
-          created_at,
-          user_progress (
-            progress_percentage
-          )
-        `)
-        .order("created_at", { ascending: false })
-
-      if (error) throw error
-
-      const exportData =
-        allProfiles?.map((profile, index) => ({
-          "Número de Inscrição": index + 1,
-          "Data de Inscrição": format(new Date(profile.created_at), "dd/MM/yyyy", { locale: ptBR }),
-          Nome: profile.display_name || "Sem nome",
-          Email: profile.email || "",
-          Telefone: "+55 (11) 99999-9999", // Placeholder
-          "Progressão (%)": profile.user_progress?.[0]?.progress_percentage || 0,
-        })) || []
-
-      // Convert to CSV
-      const headers = Object.keys(exportData[0] || {})
-      const csvContent = [
-        headers.join(","),
-        ...exportData.map((row) => headers.map((header) => `"${row[header as keyof typeof row]}"`).join(",")),
-      ].join("\n")
-
-      // Download CSV
-      const blob = new Blob([csvContent], { type: "text/csv;charset=utf-8;" })
-      const link = document.createElement("a")
-      const url = URL.createObjectURL(blob)
-      link.setAttribute("href", url)
-      link.setAttribute("download", `clientes_renove_se_${format(new Date(), "dd_MM_yyyy")}.csv`)
-      link.style.visibility = "hidden"
-      document.body.appendChild(link)
-      link.click()
-      document.body.removeChild(link)
-    } catch (error) {
-      console.error("Erro ao exportar clientes:", error)
-    } finally {
-      setExporting(false)
-    }
+    const link = document.createElement("a")
+    link.setAttribute("href", "/api/admin/export?dataset=clients&format=csv")
+    link.style.visibility = "hidden"
+    document.body.appendChild(link)
+    link.click()
+    document.body.removeChild(link)
+    setTimeout(() => setExporting(false), 1000)
   }
 
   const totalPages = Math.ceil(totalClients / CLIENTS_PER_PAGE)
@@ -104,196 +104,71 @@ export default function DashboardPage() {
   useEffect(() => {
     const initializeDashboard = async () => {
       const supabase = createClient()
-      const {
-        data: { user },
-      } = await supabase.auth.getUser()
 
-      if (!user) {
+      // Profile, counters, recent goals and modules with progress in one call
+      const { data: bootstrap, error } = await supabase.rpc("get_dashboard_bootstrap", {
+        tz: Intl.DateTimeFormat().resolvedOptions().timeZone,
+      })
+
+      if (!error && !bootstrap) {
         router.push("/auth/login")
         return
       }
 
-      setUserEmail(user.email || "")
-
-      // Get user profile
-      const { data: profile } = await supabase
-        .from("user_profiles")
-        .select("display_name, language")
-        .eq("user_id", user.id)
-        .single()
-
-      if (profile) {
-        setUserName(profile.display_name || user.email?.split("@")[0] || "")
-        if (profile.language) {
-          setT(getTranslations(profile.language as Language))
-        }
-      } else {
-        setUserName(user.email?.split("@")[0] || "")
+      if (error) {
+        console.error("[v0] Error loading dashboard data:", error)
+
+        setRecentModules(mockModules)
+        setStats({
+          totalGoals: 0,
+          completedGoals: 0,
+          activeHabits: 0,
+          currentStreak: 0,
+          completedModules: 1, // Show 1 completed from mock data
+          totalReflections: 0,
+        })
+        setIsLoading(false)
+        return
       }
 
-      await loadDashboardData(user.id)
-      setIsLoading(false)
-    }
-
-    initializeDashboard()
-  }, [router])
-
-  const loadDashboardData = async (userId: string) => {
-    const supabase = createClient()
-
-    try {
-      console.log("[v0] Loading dashboard data for user:", userId)
-
-      // Load goals
-      const { data: goals } = await supabase
-        .from("goals")
-        .select("id, title, status, target_date")
-        .eq("user_id", userId)
-        .order("created_at", { ascending: false })
-
-      console.log("[v0] Goals loaded:", goals?.length || 0)
-
-      // Load habits
-      const { data: habits } = await supabase.from("habits").select("id").eq("user_id", userId).eq("is_active", true)
-
-      console.log("[v0] Habits loaded:", habits?.length || 0)
-
-      let moduleProgress = []
-      try {
-        // First, get all active modules from admin
-        const { data: adminModules, error: modulesError } = await supabase
-          .from("transformation_modules")
-          .select("*")
-          .eq("is_active", true)
-          .order("order_index", { ascending: true })
-
-        if (modulesError) {
-          console.log("[v0] Admin modules error (using mock data):", modulesError.message)
-          moduleProgress = mockModules
-        } else if (adminModules && adminModules.length > 0) {
-          console.log("[v0] Admin modules loaded:", adminModules.length)
-
-          // Get user progress for these modules
-          const { data: userProgress } = await supabase
-            .from("user_module_progress")
-            .select("module_id, progress_percentage, status, last_accessed_at")
-            .eq("user_id", userId)
-
-          // Combine admin modules with user progress
-          moduleProgress = adminModules.map((module) => {
-            const progress = userProgress?.find((p) => p.module_id === module.id)
-            return {
-              id: module.id,
-              title: module.title,
-              description: module.description,
-              progress_percentage: progress?.progress_percentage || 0,
-              status: progress?.status || "not_started",
-              last_accessed_at: progress?.last_accessed_at,
-              category: module.category,
-              difficulty_level: module.difficulty_level,
-              estimated_duration_minutes: module.estimated_duration_minutes,
-            }
-          })
-
-          // If no user progress exists, create initial progress records
-          if (!userProgress || userProgress.length === 0) {
-            for (const module of adminModules.slice(0, 3)) {
-              // Create progress for first 3 modules
-              const initialProgress = {
-                user_id: userId,
-                module_id: module.id,
-                progress_percentage: module.order_index === 1 ? 75 : module.order_index === 2 ? 100 : 25,
-                status: module.order_index === 2 ? "completed" : "in_progress",
-                last_accessed_at: new Date().toISOString(),
-              }
-
-              await supabase.from("user_module_progress").upsert(initialProgress).select()
-
-              // Update the moduleProgress array with initial data
-              const moduleIndex = moduleProgress.findIndex((m) => m.id === module.id)
-              if (moduleIndex !== -1) {
-                moduleProgress[moduleIndex] = {
-                  ...moduleProgress[moduleIndex],
-                  progress_percentage: initialProgress.progress_percentage,
-                  status: initialProgress.status,
-                  last_accessed_at: initialProgress.last_accessed_at,
-                }
-              }
-            }
-          }
-        } else {
-          console.log("[v0] No admin modules found, using mock data")
-          moduleProgress = mockModules
-        }
-      } catch (error) {
-        console.log("[v0] Module loading fallback to mock data:", error)
-        moduleProgress = mockModules
+      const email = bootstrap.email || ""
+      const profile = bootstrap.profile
+      setUserEmail(email)
+      setUserName(profile?.display_name || email.split("@")[0] || "")
+      if (profile?.language) {
+        setT(getTranslations(profile.language as Language))
       }
 
-      // Load reflections count
-      const { data: reflections } = await supabase.from("daily_reflections").select("id").eq("user_id", userId)
-
-      console.log("[v0] Reflections loaded:", reflections?.length || 0)
-
-      // Calculate stats
-      const totalGoals = goals?.length || 0
-      const completedGoals = goals?.filter((g) => g.status === "completed").length || 0
-      const activeHabits = habits?.length || 0
-      const completedModules = moduleProgress?.filter((m: any) => m.status === "completed").length || 0
-      const totalReflections = reflections?.length || 0
-
-      console.log("[v0] Stats calculated:", {
-        totalGoals,
-        completedGoals,
-        activeHabits,
-        completedModules,
-        totalReflections,
-      })
-
       setStats({
-        totalGoals,
-        completedGoals,
-        activeHabits,
-        currentStreak: 0, // TODO: Calculate actual streak
-        completedModules,
-        totalReflections,
+        totalGoals: bootstrap.stats.total_goals,
+        completedGoals: bootstrap.stats.completed_goals,
+        activeHabits: bootstrap.stats.active_habits,
+        currentStreak: bootstrap.stats.current_streak,
+        completedModules:
+          bootstrap.modules.length > 0
+            ? bootstrap.stats.completed_modules
+            : mockModules.filter((m) => m.status === "completed").length,
+        totalReflections: bootstrap.stats.total_reflections,
       })
 
-      // Set recent goals (limit to 3)
       setRecentGoals(
-        goals?.slice(0, 3).map((goal) => ({
+        bootstrap.recent_goals.map((goal: RecentGoal) => ({
           id: goal.id,
           title: goal.title,
           status: goal.status,
           target_date: goal.target_date,
-        })) || [],
+        })),
       )
 
-      // Set recent modules - now using admin-created content
-      setRecentModules(
-        moduleProgress?.slice(0, 3).map((module: any) => ({
-          id: module.id,
-          title: module.title,
-          progress_percentage: module.progress_percentage,
-          status: module.status,
-        })) || [],
-      )
-
-      console.log("[v0] Dashboard data loaded successfully")
-    } catch (error) {
-      console.error("[v0] Error loading dashboard data:", error)
+      // Admin-created modules, or mock data until some exist
+      const modules: RecentModule[] = bootstrap.modules.length > 0 ? bootstrap.modules : mockModules
+      setRecentModules(modules.slice(0, 3))
 
-      setRecentModules(mockModules)
-      setStats({
-        totalGoals: 0,
-        completedGoals: 0,
-        activeHabits: 0,
-        currentStreak: 0,
-        completedModules: 1, // Show 1 completed from mock data
-        totalReflections: 0,
-      })
+      setIsLoading(false)
     }
-  }
+
+    initializeDashboard()
+  }, [router])
 
   const handleLogout = async () => {
     const supabase = createClient()
@@ -46,6 +46,10 @@ interface ModuleSection {
   order_index: number
   estimated_duration_minutes: number
   is_active: boolean
+  // Pre-rendered by scripts/publish_modules.py
+  html?: string
+  videos?: string[]
+  links?: { text: string; href: string }[]
 }
 
 const mockTransformationModules = [
@@ -137,25 +141,17 @@ export default function ModuleDetailPage() {
       let sectionsData = []
 
       try {
-        const { data: dbModule, error: moduleError } = await supabase
-          .from("transformation_modules")
-          .select("*")
-          .eq("id", moduleId)
-          .eq("is_active", true)
-          .single()
+        // Module and its sections come from the server-side content cache
+        const moduleResponse = await fetch(`/api/modules/${moduleId}`)
+        const cached = moduleResponse.ok ? await moduleResponse.json() : null
 
-        if (!moduleError && dbModule) {
-          moduleData = dbModule
+        if (cached?.module) {
+          moduleData = cached.module
           console.log("[v0] Loaded module from admin database:", moduleData.title)
 
-          const { data: dbSections, error: sectionsError } = await supabase
-            .from("module_sections")
-            .select("*")
-            .eq("module_id", moduleId)
-            .eq("is_active", true)
-            .order("order_index", { ascending: true })
+          const dbSections = cached.bundle ? await loadBundleSections(cached.bundle.url) : cached.sections
 
-          if (!sectionsError && dbSections && dbSections.length > 0) {
+          if (dbSections && dbSections.length > 0) {
             sectionsData = dbSections
             console.log("[v0] Loaded admin-created sections:", sectionsData.length)
           } else {
@@ -210,7 +206,7 @@ export default function ModuleDetailPage() {
       try {
         const { data: dbProgress, error: progressError } = await supabase
           .from("user_module_progress")
-          .select("*")
+          .select("id, module_id, status, progress_percentage, started_at, completed_at, last_accessed_at, notes")
           .eq("user_id", user.id)
           .eq("module_id", moduleId)
           .single()
@@ -227,12 +223,9 @@ export default function ModuleDetailPage() {
       setProgress(progressData || null)
       setNotes(progressData?.notes || "")
 
-      // Update last accessed time if progress exists
+      // Record the visit (applied in batches by the progress worker)
       if (progressData) {
-        await supabase
-          .from("user_module_progress")
-          .update({ last_accessed_at: new Date().toISOString() })
-          .eq("id", progressData.id)
+        sendProgressEvent({}).catch((error) => console.log("[v0] Could not record visit:", error))
       }
 
       console.log("[v0] Module loaded successfully with", sectionsData.length, "sections")
@@ -243,6 +236,26 @@ export default function ModuleDetailPage() {
     }
   }
 
+  // Sections pre-rendered into one immutable bundle; falls back to the raw
+  // markdown sections if the bundle cannot be fetched.
+  const loadBundleSections = async (url: string): Promise<ModuleSection[]> => {
+    try {
+      const bundleResponse = await fetch(url)
+      if (!bundleResponse.ok) throw new Error(`bundle ${bundleResponse.status}`)
+      const bundle = await bundleResponse.json()
+      return bundle.sections.map((section: ModuleSection) => ({
+        ...section,
+        module_id: moduleId,
+        content: "",
+        is_active: true,
+      }))
+    } catch (error) {
+      console.log("[v0] Bundle unavailable, loading raw sections:", error)
+      const rawResponse = await fetch(`/api/modules/${moduleId}?raw`)
+      return rawResponse.ok ? (await rawResponse.json()).sections || [] : []
+    }
+  }
+
   const getDefaultSectionContent = (module: TransformationModule) => {
     const baseContent = `# ${module.title}
 
@@ -366,17 +379,24 @@ Reserve alguns minutos para:
     }
   }
 
-  const updateProgress = async (newProgress: number, newStatus?: string) => {
-    const supabase = createClient()
-    const {
-      data: { user },
-    } = await supabase.auth.getUser()
+  // Progress writes are queued and applied in coalesced batches by
+  // scripts/progress_worker.py; keepalive lets them outlive a page change.
+  const sendProgressEvent = async (event: { status?: string; progress_percentage?: number; notes?: string }) => {
+    const response = await fetch("/api/progress/events", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ module_id: moduleId, ...event }),
+      keepalive: true,
+    })
+    if (!response.ok) throw new Error(`progress event ${response.status}`)
+  }
 
-    if (!user || !module) return
+  const updateProgress = async (newProgress: number, newStatus?: string) => {
+    if (!module) return
 
     try {
       const updateData: any = {
-        progress_percentage: newProgress,
+        progress_percentage: Math.round(newProgress),
         last_accessed_at: new Date().toISOString(),
       }
 
@@ -388,50 +408,35 @@ Reserve alguns minutos para:
         }
       }
 
-      if (progress) {
-        // Update existing progress
-        const { error } = await supabase.from("user_module_progress").update(updateData).eq("id", progress.id)
-
-        if (error) throw error
-
-        setProgress({ ...progress, ...updateData })
-      } else {
-        // Create new progress
-        const { data, error } = await supabase
-          .from("user_module_progress")
-          .insert({
-            user_id: user.id,
-            module_id: moduleId,
-            status: newStatus || "in_progress",
-            started_at: new Date().toISOString(),
-            ...updateData,
-          })
-          .select()
-          .single()
-
-        if (error) throw error
-
-        setProgress(data)
-      }
+      await sendProgressEvent({
+        progress_percentage: updateData.progress_percentage,
+        status: newStatus || (progress ? undefined : "in_progress"),
+      })
+
+      // Show the change right away; the row is written by the worker
+      setProgress({
+        ...(progress || {
+          id: "",
+          module_id: moduleId,
+          status: "in_progress",
+          started_at: new Date().toISOString(),
+          completed_at: null,
+          notes: "",
+        }),
+        ...updateData,
+      })
     } catch (error) {
       console.error("[v0] Error updating progress:", error)
     }
   }
 
   const saveNotes = async () => {
-    const supabase = createClient()
-    const {
-      data: { user },
-    } = await supabase.auth.getUser()
-
-    if (!user || !progress) return
+    if (!progress) return
 
     setIsSavingNotes(true)
 
     try {
-      const { error } = await supabase.from("user_module_progress").update({ notes }).eq("id", progress.id)
-
-      if (error) throw error
+      await sendProgressEvent({ notes })
 
       setProgress({ ...progress, notes })
     } catch (error) {
@@ -584,18 +589,22 @@ Reserve alguns minutos para:
 
     const videoRegex =
       /(https?:\/\/)?(www\.)?(youtube\.com\/watch\?v=|youtu\.be\/|vimeo\.com\/|player\.vimeo\.com\/video\/)([a-zA-Z0-9_-]+)/g
-    const videoMatches = [...content.matchAll(videoRegex)]
+    const embedUrls =
+      section.videos ??
+      [...content.matchAll(videoRegex)].map((match) =>
+        convertToEmbedUrl(match[0].startsWith("http") ? match[0] : `https://${match[0]}`),
+      )
 
     const linkRegex = /\[([^\]]+)\]$$([^)]+)$$/g
-    const linkMatches = [...content.matchAll(linkRegex)]
+    const linkMatches = section.links
+      ? section.links.map((link) => ["", link.text, link.href])
+      : [...content.matchAll(linkRegex)]
 
     return (
       <div className="space-y-6">
-        {videoMatches.length > 0 && (
+        {embedUrls.length > 0 && (
           <div className="space-y-4">
-            {videoMatches.map((match, index) => {
-              const fullUrl = match[0].startsWith("http") ? match[0] : `https://${match[0]}`
-              const embedUrl = convertToEmbedUrl(fullUrl)
+            {embedUrls.map((embedUrl, index) => {
               if (embedUrl) {
                 return (
                   <div key={index} className="aspect-video rounded-lg overflow-hidden bg-muted border">
@@ -619,7 +628,7 @@ Reserve alguns minutos para:
           <div
             className="whitespace-pre-line"
             dangerouslySetInnerHTML={{
-              __html: parseMarkdown(content),
+              __html: section.html ?? parseMarkdown(content),
             }}
           />
         </div>
@@ -149,6 +149,7 @@ const mockUserProgress = {
 export default function ModulesPage() {
   const [modules, setModules] = useState<TransformationModule[]>([])
   const [userProgress, setUserProgress] = useState<{ [key: string]: UserModuleProgress }>({})
+  const [lockedModules, setLockedModules] = useState<Set<string>>(new Set())
   const [filteredModules, setFilteredModules] = useState<TransformationModule[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [searchTerm, setSearchTerm] = useState("")
@@ -184,25 +185,36 @@ export default function ModulesPage() {
       let progressData = null
 
       try {
-        const { data: dbModules, error: modulesError } = await supabase
-          .from("transformation_modules")
-          .select("*")
-          .eq("is_active", true)
-          .order("order_index", { ascending: true })
-
-        if (modulesError) {
-          console.log("[v0] Modules error (using mock data):", modulesError.message)
+        // Published modules come from the server-side content cache
+        const modulesResponse = await fetch("/api/modules")
+
+        if (!modulesResponse.ok) {
+          console.log("[v0] Modules error (using mock data):", modulesResponse.status)
           modulesData = mockTransformationModules
         } else {
+          const { modules: dbModules } = await modulesResponse.json()
           console.log("[v0] Modules loaded from DB:", dbModules?.length || 0)
           modulesData = dbModules || mockTransformationModules
         }
 
-        // Load user progress
-        const { data: dbProgress, error: progressError } = await supabase
-          .from("user_module_progress")
-          .select("*")
-          .eq("user_id", user.id)
+        // Load user progress and the precomputed lock state of the catalog
+        const [{ data: dbProgress, error: progressError }, { data: lockState, error: lockError }] =
+          await Promise.all([
+            supabase.from("user_module_progress").select("*").eq("user_id", user.id),
+            supabase.rpc("get_module_lock_state"),
+          ])
+
+        if (lockError) {
+          console.log("[v0] Lock state error (all modules unlocked):", lockError.message)
+        } else {
+          setLockedModules(
+            new Set(
+              (lockState || [])
+                .filter((row: { is_locked: boolean }) => row.is_locked)
+                .map((row: { module_id: string }) => row.module_id),
+            ),
+          )
+        }
 
         if (progressError) {
           console.log("[v0] Progress error (using mock data):", progressError.message)
@@ -563,7 +575,8 @@ export default function ModulesPage() {
               const progress = userProgress[module.id]
               const isCompleted = progress?.status === "completed"
               const isInProgress = progress?.status === "in_progress"
-              const isLocked = false // For now, all modules are unlocked
+              // Modules already started stay open even if their prerequisites change
+              const isLocked = !progress && lockedModules.has(module.id)
 
               return (
                 <Card
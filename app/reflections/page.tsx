@@ -1,16 +1,18 @@
 "use client"
 
-import { useEffect, useState } from "react"
+import { useEffect, useRef, useState } from "react"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Badge } from "@/components/ui/badge"
 import { Textarea } from "@/components/ui/textarea"
+import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
 import { Slider } from "@/components/ui/slider"
-import { Heart, ArrowLeft, Plus, Trash2, Save, X, Sparkles, Sun, Moon, Star } from "lucide-react"
+import { Heart, ArrowLeft, Plus, Trash2, Save, X, Sparkles, Sun, Moon, Star, Search } from "lucide-react"
 import { useRouter } from "next/navigation"
 import { createClient } from "@/lib/supabase/client"
 import Link from "next/link"
+import { SearchHeadline } from "@/components/search-headline"
 import {
   AlertDialog,
   AlertDialogAction,
@@ -35,6 +37,11 @@ interface DailyReflection {
   updated_at: string
 }
 
+interface SearchHit {
+  id: string
+  headline: string
+}
+
 export default function ReflectionsPage() {
   const [reflections, setReflections] = useState<DailyReflection[]>([])
   const [isLoading, setIsLoading] = useState(true)
@@ -47,12 +54,30 @@ export default function ReflectionsPage() {
     achievements: "",
     tomorrow_intentions: "",
   })
+  const [searchTerm, setSearchTerm] = useState("")
+  // Ranked matches for searchTerm, or null while not searching.
+  const [searchHits, setSearchHits] = useState<SearchHit[] | null>(null)
+  // The query whose results may still be shown; responses for anything else
+  // arrived late and are dropped.
+  const latestQuery = useRef("")
   const router = useRouter()
 
   useEffect(() => {
     loadReflections()
   }, [])
 
+  useEffect(() => {
+    const query = searchTerm.trim()
+    latestQuery.current = query
+    if (!query) {
+      setSearchHits(null)
+      return
+    }
+
+    const timeout = setTimeout(() => searchReflections(query), 300)
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
   const loadReflections = async () => {
     const supabase = createClient()
     const {
@@ -67,7 +92,9 @@ export default function ReflectionsPage() {
     try {
       const { data, error } = await supabase
         .from("daily_reflections")
-        .select("*")
+        .select(
+          "id, reflection_date, mood_rating, gratitude_notes, challenges_faced, achievements, tomorrow_intentions, created_at, updated_at",
+        )
         .eq("user_id", user.id)
         .order("reflection_date", { ascending: false })
 
@@ -114,6 +141,25 @@ export default function ReflectionsPage() {
     }
   }
 
+  const searchReflections = async (query: string) => {
+    const supabase = createClient()
+
+    try {
+      const { data, error } = await supabase.rpc("search_content", {
+        search_query: query,
+        search_kinds: ["reflection"],
+        max_results: 50,
+      })
+
+      if (error) throw error
+      if (latestQuery.current !== query) return
+
+      setSearchHits((data || []).map((hit: SearchHit) => ({ id: hit.id, headline: hit.headline })))
+    } catch (error) {
+      console.error("[v0] Error searching reflections:", error)
+    }
+  }
+
   const deleteReflection = async (id: string) => {
     const supabase = createClient()
 
@@ -146,6 +192,12 @@ export default function ReflectionsPage() {
 
   const todayReflection = reflections.find((r) => r.reflection_date === new Date().toISOString().split("T")[0])
 
+  // While searching, matches (today's included) in rank order; otherwise every earlier reflection.
+  const headlines = new Map((searchHits || []).map((hit) => [hit.id, hit.headline]))
+  const listedReflections = searchHits
+    ? searchHits.flatMap((hit) => reflections.filter((r) => r.id === hit.id))
+    : reflections.filter((r) => r.reflection_date !== new Date().toISOString().split("T")[0])
+
   if (isLoading) {
     return (
       <div className="min-h-screen bg-background flex items-center justify-center">
@@ -306,95 +358,118 @@ export default function ReflectionsPage() {
             <h2 className="text-xl font-semibold text-foreground">Reflexões Anteriores</h2>
           </div>
 
-          {reflections.filter((r) => r.reflection_date !== new Date().toISOString().split("T")[0]).length > 0 ? (
+          {reflections.length > 0 && (
+            <div className="relative">
+              <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground w-4 h-4" />
+              <Input
+                placeholder="Buscar nas reflexões..."
+                value={searchTerm}
+                onChange={(e) => setSearchTerm(e.target.value)}
+                className="pl-10"
+              />
+            </div>
+          )}
+
+          {listedReflections.length > 0 ? (
             <div className="grid gap-6">
-              {reflections
-                .filter((r) => r.reflection_date !== new Date().toISOString().split("T")[0])
-                .map((reflection) => (
-                  <Card key={reflection.id} className="border-0 shadow-sm">
-                    <CardHeader className="pb-3">
-                      <div className="flex items-center justify-between">
-                        <div className="flex items-center space-x-3">
-                          <span className="text-xl">{getMoodEmoji(reflection.mood_rating)}</span>
-                          <div>
-                            <CardTitle className="text-lg">
-                              {new Date(reflection.reflection_date).toLocaleDateString("pt-BR", {
-                                weekday: "long",
-                                year: "numeric",
-                                month: "long",
-                                day: "numeric",
-                              })}
-                            </CardTitle>
-                            <Badge className={getMoodColor(reflection.mood_rating)}>
-                              Humor: {reflection.mood_rating}/10
-                            </Badge>
-                          </div>
+              {listedReflections.map((reflection) => (
+                <Card key={reflection.id} className="border-0 shadow-sm">
+                  <CardHeader className="pb-3">
+                    <div className="flex items-center justify-between">
+                      <div className="flex items-center space-x-3">
+                        <span className="text-xl">{getMoodEmoji(reflection.mood_rating)}</span>
+                        <div>
+                          <CardTitle className="text-lg">
+                            {new Date(reflection.reflection_date).toLocaleDateString("pt-BR", {
+                              weekday: "long",
+                              year: "numeric",
+                              month: "long",
+                              day: "numeric",
+                            })}
+                          </CardTitle>
+                          <Badge className={getMoodColor(reflection.mood_rating)}>
+                            Humor: {reflection.mood_rating}/10
+                          </Badge>
                         </div>
-
-                        <AlertDialog>
-                          <AlertDialogTrigger asChild>
-                            <Button variant="ghost" size="sm" className="text-destructive hover:text-destructive">
-                              <Trash2 className="w-4 h-4" />
-                            </Button>
-                          </AlertDialogTrigger>
-                          <AlertDialogContent>
-                            <AlertDialogHeader>
-                              <AlertDialogTitle>Excluir Reflexão</AlertDialogTitle>
-                              <AlertDialogDescription>
-                                Tem certeza que deseja excluir esta reflexão? Esta ação não pode ser desfeita.
-                              </AlertDialogDescription>
-                            </AlertDialogHeader>
-                            <AlertDialogFooter>
-                              <AlertDialogCancel>Cancelar</AlertDialogCancel>
-                              <AlertDialogAction
-                                onClick={() => deleteReflection(reflection.id)}
-                                className="bg-destructive text-destructive-foreground hover:bg-destructive/90"
-                              >
-                                Excluir
-                              </AlertDialogAction>
-                            </AlertDialogFooter>
-                          </AlertDialogContent>
-                        </AlertDialog>
                       </div>
-                    </CardHeader>
 
-                    <CardContent className="space-y-4">
-                      {reflection.gratitude_notes && (
-                        <div>
-                          <h4 className="font-medium text-foreground mb-2 flex items-center space-x-2">
-                            <Star className="w-4 h-4 text-yellow-500" />
-                            <span>Gratidão</span>
-                          </h4>
-                          <p className="text-muted-foreground">{reflection.gratitude_notes}</p>
-                        </div>
-                      )}
+                      <AlertDialog>
+                        <AlertDialogTrigger asChild>
+                          <Button variant="ghost" size="sm" className="text-destructive hover:text-destructive">
+                            <Trash2 className="w-4 h-4" />
+                          </Button>
+                        </AlertDialogTrigger>
+                        <AlertDialogContent>
+                          <AlertDialogHeader>
+                            <AlertDialogTitle>Excluir Reflexão</AlertDialogTitle>
+                            <AlertDialogDescription>
+                              Tem certeza que deseja excluir esta reflexão? Esta ação não pode ser desfeita.
+                            </AlertDialogDescription>
+                          </AlertDialogHeader>
+                          <AlertDialogFooter>
+                            <AlertDialogCancel>Cancelar</AlertDialogCancel>
+                            <AlertDialogAction
+                              onClick={() => deleteReflection(reflection.id)}
+                              className="bg-destructive text-destructive-foreground hover:bg-destructive/90"
+                            >
+                              Excluir
+                            </AlertDialogAction>
+                          </AlertDialogFooter>
+                        </AlertDialogContent>
+                      </AlertDialog>
+                    </div>
+                  </CardHeader>
 
-                      {reflection.challenges_faced && (
-                        <div>
-                          <h4 className="font-medium text-foreground mb-2">Desafios</h4>
-                          <p className="text-muted-foreground">{reflection.challenges_faced}</p>
-                        </div>
-                      )}
+                  <CardContent className="space-y-4">
+                    {headlines.has(reflection.id) && (
+                      <SearchHeadline
+                        headline={headlines.get(reflection.id)!}
+                        className="text-sm text-muted-foreground italic"
+                      />
+                    )}
+
+                    {reflection.gratitude_notes && (
+                      <div>
+                        <h4 className="font-medium text-foreground mb-2 flex items-center space-x-2">
+                          <Star className="w-4 h-4 text-yellow-500" />
+                          <span>Gratidão</span>
+                        </h4>
+                        <p className="text-muted-foreground">{reflection.gratitude_notes}</p>
+                      </div>
+                    )}
 
-                      {reflection.achievements && (
-                        <div>
-                          <h4 className="font-medium text-foreground mb-2 flex items-center space-x-2">
-                            <Sparkles className="w-4 h-4 text-primary" />
-                            <span>Conquistas</span>
-                          </h4>
-                          <p className="text-muted-foreground">{reflection.achievements}</p>
-                        </div>
-                      )}
+                    {reflection.challenges_faced && (
+                      <div>
+                        <h4 className="font-medium text-foreground mb-2">Desafios</h4>
+                        <p className="text-muted-foreground">{reflection.challenges_faced}</p>
+                      </div>
+                    )}
+
+                    {reflection.achievements && (
+                      <div>
+                        <h4 className="font-medium text-foreground mb-2 flex items-center space-x-2">
+                          <Sparkles className="w-4 h-4 text-primary" />
+                          <span>Conquistas</span>
+                        </h4>
+                        <p className="text-muted-foreground">{reflection.achievements}</p>
+                      </div>
+                    )}
 
-                      {reflection.tomorrow_intentions && (
-                        <div>
-                          <h4 className="font-medium text-foreground mb-2">Intenções</h4>
-                          <p className="text-muted-foreground">{reflection.tomorrow_intentions}</p>
-                        </div>
-                      )}
-                    </CardContent>
-                  </Card>
-                ))}
+                    {reflection.tomorrow_intentions && (
+                      <div>
+                        <h4 className="font-medium text-foreground mb-2">Intenções</h4>
+                        <p className="text-muted-foreground">{reflection.tomorrow_intentions}</p>
+                      </div>
+                    )}
+                  </CardContent>
+                </Card>
+              ))}
+            </div>
+          ) : searchHits ? (
+            <div className="text-center py-12">
+              <Search className="w-16 h-16 text-muted-foreground mx-auto mb-4" />
+              <h3 className="text-lg font-semibold text-foreground mb-2">Nenhuma reflexão encontrada</h3>
+              <p className="text-muted-foreground">Tente buscar por outras palavras</p>
             </div>
           ) : (
             <div className="text-center py-12">
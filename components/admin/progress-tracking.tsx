@@ -77,16 +77,30 @@ interface CategoryStats {
   completion_rate: number
 }
 
+interface StatusTotals {
+  completed: number
+  in_progress: number
+  not_started: number
+  skipped: number
+}
+
 interface ProgressTrackingProps {
   adminUser: AdminUser
   progressData: ProgressData[]
   sessionsData: SessionData[]
   categoryStats: CategoryStats[]
+  statusTotals?: StatusTotals | null
 }
 
 const COLORS = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6"]
 
-export function ProgressTracking({ adminUser, progressData, sessionsData, categoryStats }: ProgressTrackingProps) {
+export function ProgressTracking({
+  adminUser,
+  progressData,
+  sessionsData,
+  categoryStats,
+  statusTotals,
+}: ProgressTrackingProps) {
   const [searchTerm, setSearchTerm] = useState("")
   const [filterCategory, setFilterCategory] = useState("all")
   const [filterStatus, setFilterStatus] = useState("all")
@@ -163,14 +177,15 @@ export function ProgressTracking({ adminUser, progressData, sessionsData, catego
   }
 
   const exportProgressData = () => {
-    const dataStr = JSON.stringify(filteredProgress, null, 2)
-    const dataUri = "data:application/json;charset=utf-8," + encodeURIComponent(dataStr)
-
-    const exportFileDefaultName = `renove-se-progress-${new Date().toISOString().split("T")[0]}.json`
+    // Exports every matching row (not just the ones loaded here), streamed
+    // as NDJSON by the server.
+    const params = new URLSearchParams({ dataset: "progress", format: "ndjson" })
+    if (filterStatus !== "all") params.set("status", filterStatus)
+    if (filterCategory !== "all") params.set("category", filterCategory)
+    if (searchTerm) params.set("search", searchTerm)
 
     const linkElement = document.createElement("a")
-    linkElement.setAttribute("href", dataUri)
-    linkElement.setAttribute("download", exportFileDefaultName)
+    linkElement.setAttribute("href", `/api/admin/export?${params}`)
     linkElement.click()
   }
 
@@ -183,27 +198,22 @@ export function ProgressTracking({ adminUser, progressData, sessionsData, catego
     tasa: stat.completion_rate,
   }))
 
+  // Totals come from user_progress_summary; counting the loaded rows (one
+  // pass) is only the fallback.
+  const statusCounts = useMemo<StatusTotals>(() => {
+    if (statusTotals) return statusTotals
+    const counts = { completed: 0, in_progress: 0, not_started: 0, skipped: 0 }
+    for (const progress of progressData) {
+      if (progress.status in counts) counts[progress.status as keyof StatusTotals]++
+    }
+    return counts
+  }, [statusTotals, progressData])
+
   const statusDistribution = [
-    {
-      name: "Completado",
-      value: progressData.filter((p) => p.status === "completed").length,
-      color: "#10B981",
-    },
-    {
-      name: "En progreso",
-      value: progressData.filter((p) => p.status === "in_progress").length,
-      color: "#3B82F6",
-    },
-    {
-      name: "No iniciado",
-      value: progressData.filter((p) => p.status === "not_started").length,
-      color: "#6B7280",
-    },
-    {
-      name: "Omitido",
-      value: progressData.filter((p) => p.status === "skipped").length,
-      color: "#F59E0B",
-    },
+    { name: "Completado", value: statusCounts.completed, color: "#10B981" },
+    { name: "En progreso", value: statusCounts.in_progress, color: "#3B82F6" },
+    { name: "No iniciado", value: statusCounts.not_started, color: "#6B7280" },
+    { name: "Omitido", value: statusCounts.skipped, color: "#F59E0B" },
   ]
 
   // Activity over time (last 30 days)
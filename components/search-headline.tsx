@@ -0,0 +1,20 @@
+import { Fragment } from "react"
+
+// Renders a headline from the search_content RPC. The database wraps hits in
+// <mark></mark> and leaves the rest of the stored text as is, so only those
+// markers become elements; everything else is rendered as plain text.
+export function SearchHeadline({ headline, className }: { headline: string; className?: string }) {
+  return (
+    <p className={className}>
+      {headline.split(/(<mark>.*?<\/mark>)/g).map((part, index) =>
+        part.startsWith("<mark>") && part.endsWith("</mark>") ? (
+          <mark key={index} className="bg-primary/20 text-foreground rounded px-0.5">
+            {part.slice(6, -7)}
+          </mark>
+        ) : (
+          <Fragment key={index}>{part}</Fragment>
+        ),
+      )}
+    </p>
+  )
+}
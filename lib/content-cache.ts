@@ -0,0 +1,168 @@
+import { createHash } from "crypto"
+import { createAdminClient } from "@/lib/supabase/admin-client"
+
+// Published module content, cached in memory per server instance.
+// Entries are keyed by module id and content version (module_content_versions,
+// bumped by triggers on every content write). The version table itself is
+// re-read at most every VERSION_TTL_MS, so a read usually skips the database
+// and an edit made on another instance shows up within that window.
+// The content editor calls POST /api/modules/invalidate after each save to
+// make the change visible on this instance immediately.
+
+const VERSION_TTL_MS = 30_000
+const MAX_ENTRIES = 500
+// PostgREST caps every response at its max-rows setting (1000 by default),
+// so whole-table reads are fetched in pages no larger than that.
+const PAGE_SIZE = 1000
+
+// Explicit columns: both tables also carry a stored search_vector (037) that
+// is as large as the text it indexes and that no client needs.
+const MODULE_COLUMNS =
+  "id, title, description, category, estimated_duration_minutes, difficulty_level, content_type, content_url, is_active, order_index, created_at, updated_at"
+const SECTION_COLUMNS =
+  "id, module_id, title, content, section_type, order_index, estimated_duration_minutes, is_active, created_at, updated_at"
+
+export interface ModuleBundle {
+  url: string
+  content_hash: string
+}
+
+export interface CachedModule {
+  version: number
+  module: Record<string, any>
+  sections: Record<string, any>[]
+  // Pre-rendered bundle from scripts/publish_modules.py, when one was built
+  // from this version of the content.
+  bundle: ModuleBundle | null
+}
+
+export interface CachedCatalog {
+  version: string
+  modules: Record<string, any>[]
+}
+
+let versions: Map<string, number> | null = null
+let versionsLoadedAt = 0
+let catalog: CachedCatalog | null = null
+const modules = new Map<string, CachedModule>()
+
+export const cacheStats = { hits: 0, misses: 0 }
+
+// Reads every row of a query page by page until a short page comes back.
+// The query must have a total order, or rows can repeat or go missing
+// between pages.
+async function fetchAllRows<T>(
+  page: (from: number, to: number) => PromiseLike<{ data: T[] | null; error: unknown }>,
+): Promise<T[]> {
+  const rows: T[] = []
+  for (let from = 0; ; from += PAGE_SIZE) {
+    const { data, error } = await page(from, from + PAGE_SIZE - 1)
+    if (error) throw error
+    rows.push(...(data || []))
+    if (!data || data.length < PAGE_SIZE) return rows
+  }
+}
+
+async function getVersions() {
+  if (versions && Date.now() - versionsLoadedAt < VERSION_TTL_MS) {
+    return versions
+  }
+
+  const supabase = createAdminClient()
+  const data = await fetchAllRows((from, to) =>
+    supabase.from("module_content_versions").select("module_id, version").order("module_id").range(from, to),
+  )
+
+  versions = new Map(data.map((row) => [row.module_id as string, Number(row.version)]))
+  versionsLoadedAt = Date.now()
+  return versions
+}
+
+// A digest of every (module_id, version) pair, sorted by module id. A sum of
+// the versions could come out the same for two different states (one module
+// created while another is deleted, say); the pairs themselves cannot.
+function catalogVersion(current: Map<string, number>) {
+  const hash = createHash("sha256")
+  Array.from(current.keys())
+    .sort()
+    .forEach((moduleId) => hash.update(`${moduleId}:${current.get(moduleId)};`))
+  return hash.digest("hex")
+}
+
+export async function getCachedCatalog(): Promise<CachedCatalog> {
+  const version = catalogVersion(await getVersions())
+  if (catalog?.version === version) {
+    cacheStats.hits++
+    return catalog
+  }
+
+  cacheStats.misses++
+  const supabase = createAdminClient()
+  const data = await fetchAllRows((from, to) =>
+    supabase
+      .from("transformation_modules")
+      .select(MODULE_COLUMNS)
+      .eq("is_active", true)
+      .order("order_index", { ascending: true })
+      .order("id", { ascending: true })
+      .range(from, to),
+  )
+
+  catalog = { version, modules: data }
+  return catalog
+}
+
+export async function getCachedModule(moduleId: string): Promise<CachedModule | null> {
+  const version = (await getVersions()).get(moduleId)
+  if (version === undefined) return null
+
+  const cached = modules.get(moduleId)
+  if (cached?.version === version) {
+    cacheStats.hits++
+    return cached
+  }
+
+  cacheStats.misses++
+  const supabase = createAdminClient()
+  const [moduleResult, sectionsResult, bundleResult] = await Promise.all([
+    supabase.from("transformation_modules").select(MODULE_COLUMNS).eq("id", moduleId).eq("is_active", true).maybeSingle(),
+    supabase
+      .from("module_sections")
+      .select(SECTION_COLUMNS)
+      .eq("module_id", moduleId)
+      .eq("is_active", true)
+      .order("order_index", { ascending: true }),
+    supabase.from("module_bundles").select("version, content_hash, path").eq("module_id", moduleId).maybeSingle(),
+  ])
+  if (moduleResult.error) throw moduleResult.error
+  if (sectionsResult.error) throw sectionsResult.error
+
+  if (!moduleResult.data) {
+    modules.delete(moduleId)
+    return null
+  }
+
+  const bundleRow = bundleResult.data
+  const bundle =
+    bundleRow && Number(bundleRow.version) === version
+      ? {
+          url: `${process.env.NEXT_PUBLIC_SUPABASE_URL}/storage/v1/object/public/module-bundles/${bundleRow.path}`,
+          content_hash: bundleRow.content_hash,
+        }
+      : null
+
+  const entry = { version, module: moduleResult.data, sections: sectionsResult.data || [], bundle }
+  modules.delete(moduleId)
+  modules.set(moduleId, entry)
+  // Map keeps insertion order, so the first key is the least recently rebuilt.
+  if (modules.size > MAX_ENTRIES) {
+    modules.delete(modules.keys().next().value as string)
+  }
+  return entry
+}
+
+// Forget the known versions; the next read re-checks them and rebuilds
+// whatever changed.
+export function invalidateContentCache() {
+  versions = null
+}
@@ -1,3 +1,4 @@
+import { NextResponse } from "next/server"
 import { createClient } from "@/lib/supabase/server"
 
 export async function checkAdminAccess() {
@@ -36,3 +37,24 @@ export async function requireAdminAccess() {
 
   return result
 }
+
+// For admin API routes. The adminSession cookie is set by the browser and
+// proves nothing, so only a user the auth server confirms for this session
+// and for whom is_admin() holds gets through. Returns the 401/403 response to
+// send, or null when the request may go ahead.
+export async function rejectNonAdminRequest() {
+  const supabase = await createClient()
+  const {
+    data: { user },
+    error,
+  } = await supabase.auth.getUser()
+  if (error || !user) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+  }
+
+  const { data: isAdmin, error: adminError } = await supabase.rpc("is_admin")
+  if (adminError || isAdmin !== true) {
+    return NextResponse.json({ error: "Forbidden" }, { status: 403 })
+  }
+  return null
+}
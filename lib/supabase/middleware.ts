@@ -1,5 +1,13 @@
 import { createServerClient } from "@supabase/ssr"
 import { NextResponse, type NextRequest } from "next/server"
+import { authStats, verifyAccessToken } from "@/lib/supabase/jwt"
+
+// Access tokens are verified locally against the cached signing keys. The
+// auth server is only asked when a token is about to expire, cannot be
+// verified here, or the path needs a revocation check. Set
+// AUTH_VERIFY_MODE=remote to always ask the auth server.
+const EXPIRY_MARGIN_SECONDS = 60
+const REMOTE_CHECK_PATHS = ["/admin"]
 
 export async function updateSession(request: NextRequest) {
   let supabaseResponse = NextResponse.next({
@@ -15,6 +23,9 @@ export async function updateSession(request: NextRequest) {
     }
   }
 
+  const started = performance.now()
+  let verifiedBy = "none"
+
   // With Fluid compute, don't put this client in a global environment
   // variable. Always create a new one on each request.
   const supabase = createServerClient(
@@ -37,15 +48,36 @@ export async function updateSession(request: NextRequest) {
   )
 
   // Do not run code between createServerClient and
-  // supabase.auth.getUser(). A simple mistake could make it very hard to debug
+  // supabase.auth.getSession(). A simple mistake could make it very hard to debug
   // issues with users being randomly logged out.
 
   try {
-    // IMPORTANT: If you remove getUser() and you use server-side rendering
-    // with the Supabase client, your users may be randomly logged out.
+    // IMPORTANT: getSession() refreshes an expired session and rewrites the
+    // cookies; if you remove it and you use server-side rendering with the
+    // Supabase client, your users may be randomly logged out.
     const {
-      data: { user },
-    } = await supabase.auth.getUser()
+      data: { session },
+    } = await supabase.auth.getSession()
+
+    let user: { id: string } | null = null
+    if (session) {
+      const pathname = request.nextUrl.pathname
+      const local =
+        process.env.AUTH_VERIFY_MODE !== "remote" &&
+        !REMOTE_CHECK_PATHS.some((prefix) => pathname.startsWith(prefix)) &&
+        (session.expires_at ?? 0) - Date.now() / 1000 > EXPIRY_MARGIN_SECONDS
+      const claims = local ? await verifyAccessToken(session.access_token) : null
+
+      if (claims) {
+        authStats.hits++
+        verifiedBy = "local"
+        user = { id: claims.sub }
+      } else {
+        authStats.misses++
+        verifiedBy = "remote"
+        user = (await supabase.auth.getUser()).data.user
+      }
+    }
 
     if (request.nextUrl.pathname.startsWith("/admin")) {
       if (!user) {
@@ -68,6 +100,10 @@ export async function updateSession(request: NextRequest) {
     console.error("[v0] Error in middleware auth check:", error)
   }
 
+  supabaseResponse.headers.set(
+    "Server-Timing",
+    `auth;desc="${verifiedBy}";dur=${(performance.now() - started).toFixed(2)}`,
+  )
   // IMPORTANT: You *must* return the supabaseResponse object as it is.
   return supabaseResponse
 }
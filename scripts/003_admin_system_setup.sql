@@ -148,14 +148,8 @@ SELECT
 -- Grant access to admin view
 GRANT SELECT ON public.admin_dashboard_stats TO authenticated;
 
--- Create RLS policy for admin dashboard stats
-CREATE POLICY "admin_dashboard_stats_select" ON public.admin_dashboard_stats
-  FOR SELECT USING (
-    EXISTS (
-      SELECT 1 FROM public.admin_users au 
-      WHERE au.id = auth.uid() AND au.is_active = true
-    )
-  );
+-- Views cannot carry RLS policies (CREATE POLICY fails on them), so access
+-- to this one is governed by the GRANT above alone.
 
 -- Insert initial super admin (you'll need to replace this email with your admin email)
 -- This will be created after the first admin user signs up
@@ -114,11 +114,5 @@ WHERE session_start >= NOW() - INTERVAL '7 days';
 -- Grant access to admin analytics view
 GRANT SELECT ON admin_analytics_summary TO authenticated;
 
--- Create RLS policy for admin analytics
-CREATE POLICY "admin_analytics_summary_select" ON admin_analytics_summary
-  FOR SELECT USING (
-    EXISTS (
-      SELECT 1 FROM public.admin_users au 
-      WHERE au.id = auth.uid() AND au.is_active = true
-    )
-  );
+-- Views cannot carry RLS policies (CREATE POLICY fails on them), so access
+-- to this one is governed by the GRANT above alone.
@@ -11,6 +11,10 @@ CREATE TABLE IF NOT EXISTS public.user_profiles (
     UNIQUE(email)
 );
 
+-- 003 already creates user_progress with a different layout (step_name,
+-- step_category), in which case this is a no-op and the table keeps that
+-- layout; a fresh database always ends up with 003's. Later migrations read
+-- the layout-specific columns through to_jsonb(up) so they work with both.
 CREATE TABLE IF NOT EXISTS public.user_progress (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
@@ -119,11 +123,13 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Add updated_at triggers
+-- Add updated_at triggers (003 already added the user_progress one)
+DROP TRIGGER IF EXISTS update_user_profiles_updated_at ON public.user_profiles;
 CREATE TRIGGER update_user_profiles_updated_at
     BEFORE UPDATE ON public.user_profiles
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 
+DROP TRIGGER IF EXISTS update_user_progress_updated_at ON public.user_progress;
 CREATE TRIGGER update_user_progress_updated_at
     BEFORE UPDATE ON public.user_progress
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
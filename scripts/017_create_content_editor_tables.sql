@@ -41,6 +41,12 @@ CREATE TABLE IF NOT EXISTS public.module_configurations (
   UNIQUE(module_id)
 );
 
+-- 017_content_management_tables creates content_templates first with a
+-- narrower set of types; accept the types of both scripts.
+ALTER TABLE public.content_templates DROP CONSTRAINT IF EXISTS content_templates_template_type_check;
+ALTER TABLE public.content_templates ADD CONSTRAINT content_templates_template_type_check
+  CHECK (template_type IN ('text', 'video', 'exercise', 'reflection', 'meditation', 'quiz'));
+
 -- Enable Row Level Security
 ALTER TABLE public.content_templates ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.module_sections ENABLE ROW LEVEL SECURITY;
@@ -67,7 +73,10 @@ CREATE INDEX IF NOT EXISTS idx_module_sections_order ON public.module_sections(o
 CREATE INDEX IF NOT EXISTS idx_module_configurations_module_id ON public.module_configurations(module_id);
 CREATE INDEX IF NOT EXISTS idx_content_templates_type ON public.content_templates(template_type);
 
--- Add updated_at triggers
+-- Add updated_at triggers (017_content_management_tables may have added them already)
+DROP TRIGGER IF EXISTS update_content_templates_updated_at ON public.content_templates;
+DROP TRIGGER IF EXISTS update_module_sections_updated_at ON public.module_sections;
+DROP TRIGGER IF EXISTS update_module_configurations_updated_at ON public.module_configurations;
 CREATE TRIGGER update_content_templates_updated_at BEFORE UPDATE ON public.content_templates FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 CREATE TRIGGER update_module_sections_updated_at BEFORE UPDATE ON public.module_sections FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 CREATE TRIGGER update_module_configurations_updated_at BEFORE UPDATE ON public.module_configurations FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
@@ -18,10 +18,12 @@ CREATE TABLE IF NOT EXISTS public.transformation_modules (
 ALTER TABLE public.transformation_modules ENABLE ROW LEVEL SECURITY;
 
 -- Allow public read access to active modules
+DROP POLICY IF EXISTS "Anyone can view active modules" ON public.transformation_modules;
 CREATE POLICY "Anyone can view active modules" ON public.transformation_modules 
   FOR SELECT USING (is_active = true);
 
 -- Allow admin access
+DROP POLICY IF EXISTS "Admins can manage all modules" ON public.transformation_modules;
 CREATE POLICY "Admins can manage all modules" ON public.transformation_modules 
   FOR ALL USING (
     EXISTS (
@@ -36,4 +38,4 @@ INSERT INTO public.transformation_modules (title, description, category, estimat
 ('Autoconhecimento Básico', 'Introdução ao processo de autoconhecimento e reflexão pessoal', 'personal', 20, 'beginner', 'article', 1),
 ('Gestão de Emoções', 'Aprenda a identificar e gerenciar suas emoções de forma saudável', 'personal', 25, 'intermediate', 'exercise', 2),
 ('Relacionamentos Saudáveis', 'Como construir e manter relacionamentos equilibrados', 'relationship', 30, 'intermediate', 'article', 3),
-('Propósito de Vida', 'Descobrindo seu propósito e direção na vida', 'career', 35, 'advanced', 'reflection', 4);
+('Propósito de Vida', 'Descobrindo seu propósito e direção na vida', 'career', 35, 'advanced', 'exercise', 4);
@@ -0,0 +1,376 @@
+-- Incrementally maintained analytics rollups
+-- The admin analytics functions and views used to recount auth.users,
+-- user_progress and user_sessions on every call. They now read small rollup
+-- tables that triggers keep current, so their cost depends on the number of
+-- days and categories, not on the number of users.
+--
+-- Days are UTC calendar days. "Active in the last N days" is answered with
+-- day granularity from a histogram of each user's latest session day.
+
+-- get_progress_stats_by_category() groups by step_category; make sure the
+-- column exists whichever user_progress layout this database has.
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS step_category TEXT;
+
+CREATE OR REPLACE FUNCTION public.analytics_day(ts TIMESTAMP WITH TIME ZONE)
+RETURNS DATE
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT (ts AT TIME ZONE 'UTC')::DATE
+$$;
+
+-- Every write to the base tables adds its deltas to a rollup row, so a
+-- single row per day or category would serialize all concurrent writers on
+-- that row's lock. Each day and category is spread over rollup_slots()
+-- rows instead; a backend always writes the slot picked by its pid, and
+-- readers sum the slots. A slot can go negative (a session counted in one
+-- slot and deleted through another); only the sums are meaningful.
+CREATE OR REPLACE FUNCTION public.rollup_slots()
+RETURNS SMALLINT
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT 16::SMALLINT
+$$;
+
+CREATE OR REPLACE FUNCTION public.rollup_slot()
+RETURNS SMALLINT
+LANGUAGE sql STABLE
+AS $$
+  SELECT (pg_backend_pid() % public.rollup_slots())::SMALLINT
+$$;
+
+-- Per day: signups, sessions started that day, and how many users had their
+-- most recent session on that day.
+CREATE TABLE IF NOT EXISTS public.analytics_daily_rollup (
+  day DATE NOT NULL,
+  slot SMALLINT NOT NULL DEFAULT 0,
+  signups BIGINT NOT NULL DEFAULT 0,
+  sessions BIGINT NOT NULL DEFAULT 0,
+  session_minutes BIGINT NOT NULL DEFAULT 0,
+  timed_sessions BIGINT NOT NULL DEFAULT 0,
+  last_active_users BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, slot)
+);
+
+-- Per progress category: status counts.
+CREATE TABLE IF NOT EXISTS public.progress_category_rollup (
+  category TEXT NOT NULL,
+  slot SMALLINT NOT NULL DEFAULT 0,
+  total_steps BIGINT NOT NULL DEFAULT 0,
+  completed_steps BIGINT NOT NULL DEFAULT 0,
+  in_progress_steps BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (category, slot)
+);
+
+-- Latest session start per user; drives last_active_users.
+CREATE TABLE IF NOT EXISTS public.user_last_activity (
+  user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  last_session_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Rollups are only read through the SECURITY DEFINER functions below.
+ALTER TABLE public.analytics_daily_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.progress_category_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.user_last_activity ENABLE ROW LEVEL SECURITY;
+
+-- Signups
+CREATE OR REPLACE FUNCTION public.rollup_auth_users()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO analytics_daily_rollup (day, slot, signups)
+    SELECT analytics_day(created_at), rollup_slot(), COUNT(*) FROM new_rows GROUP BY 1
+    ON CONFLICT (day, slot) DO UPDATE SET signups = analytics_daily_rollup.signups + EXCLUDED.signups;
+  ELSE
+    INSERT INTO analytics_daily_rollup (day, slot, signups)
+    SELECT analytics_day(created_at), rollup_slot(), -COUNT(*) FROM old_rows GROUP BY 1
+    ON CONFLICT (day, slot) DO UPDATE SET signups = analytics_daily_rollup.signups + EXCLUDED.signups;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_auth_users_insert ON auth.users;
+CREATE TRIGGER rollup_auth_users_insert
+  AFTER INSERT ON auth.users
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_auth_users();
+
+DROP TRIGGER IF EXISTS rollup_auth_users_delete ON auth.users;
+CREATE TRIGGER rollup_auth_users_delete
+  AFTER DELETE ON auth.users
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_auth_users();
+
+-- Sessions: one aggregated upsert per statement, so bulk loads stay cheap.
+-- Sessions are append-only; deleting one does not move a user's last activity back.
+CREATE OR REPLACE FUNCTION public.rollup_user_sessions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO analytics_daily_rollup (day, slot, sessions, session_minutes, timed_sessions)
+    SELECT analytics_day(session_start), rollup_slot(), -COUNT(*), -COALESCE(SUM(duration_minutes), 0), -COUNT(duration_minutes)
+    FROM old_rows GROUP BY 1
+    ON CONFLICT (day, slot) DO UPDATE SET
+      sessions = analytics_daily_rollup.sessions + EXCLUDED.sessions,
+      session_minutes = analytics_daily_rollup.session_minutes + EXCLUDED.session_minutes,
+      timed_sessions = analytics_daily_rollup.timed_sessions + EXCLUDED.timed_sessions;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO analytics_daily_rollup (day, slot, sessions, session_minutes, timed_sessions)
+    SELECT analytics_day(session_start), rollup_slot(), COUNT(*), COALESCE(SUM(duration_minutes), 0), COUNT(duration_minutes)
+    FROM new_rows GROUP BY 1
+    ON CONFLICT (day, slot) DO UPDATE SET
+      sessions = analytics_daily_rollup.sessions + EXCLUDED.sessions,
+      session_minutes = analytics_daily_rollup.session_minutes + EXCLUDED.session_minutes,
+      timed_sessions = analytics_daily_rollup.timed_sessions + EXCLUDED.timed_sessions;
+
+    INSERT INTO user_last_activity (user_id, last_session_at)
+    SELECT user_id, MAX(session_start) FROM new_rows WHERE session_start IS NOT NULL GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET last_session_at = EXCLUDED.last_session_at
+    WHERE user_last_activity.last_session_at < EXCLUDED.last_session_at;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_insert ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_insert
+  AFTER INSERT ON public.user_sessions
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_update ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_update
+  AFTER UPDATE ON public.user_sessions
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_delete ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_delete
+  AFTER DELETE ON public.user_sessions
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+-- Move a user between histogram days when their latest session changes.
+CREATE OR REPLACE FUNCTION public.rollup_user_last_activity()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO analytics_daily_rollup (day, slot, last_active_users)
+    VALUES (analytics_day(OLD.last_session_at), rollup_slot(), -1)
+    ON CONFLICT (day, slot) DO UPDATE SET last_active_users = analytics_daily_rollup.last_active_users - 1;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO analytics_daily_rollup (day, slot, last_active_users)
+    VALUES (analytics_day(NEW.last_session_at), rollup_slot(), 1)
+    ON CONFLICT (day, slot) DO UPDATE SET last_active_users = analytics_daily_rollup.last_active_users + 1;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_user_last_activity ON public.user_last_activity;
+CREATE TRIGGER rollup_user_last_activity
+  AFTER INSERT OR UPDATE OR DELETE ON public.user_last_activity
+  FOR EACH ROW EXECUTE FUNCTION public.rollup_user_last_activity();
+
+-- Progress by category
+CREATE OR REPLACE FUNCTION public.rollup_user_progress()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO progress_category_rollup (category, slot, total_steps, completed_steps, in_progress_steps)
+    SELECT COALESCE(step_category, 'uncategorized'), rollup_slot(), -COUNT(*),
+           -COUNT(*) FILTER (WHERE status = 'completed'),
+           -COUNT(*) FILTER (WHERE status IN ('in_progress', 'in-progress'))
+    FROM old_rows GROUP BY 1
+    ON CONFLICT (category, slot) DO UPDATE SET
+      total_steps = progress_category_rollup.total_steps + EXCLUDED.total_steps,
+      completed_steps = progress_category_rollup.completed_steps + EXCLUDED.completed_steps,
+      in_progress_steps = progress_category_rollup.in_progress_steps + EXCLUDED.in_progress_steps;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO progress_category_rollup (category, slot, total_steps, completed_steps, in_progress_steps)
+    SELECT COALESCE(step_category, 'uncategorized'), rollup_slot(), COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'completed'),
+           COUNT(*) FILTER (WHERE status IN ('in_progress', 'in-progress'))
+    FROM new_rows GROUP BY 1
+    ON CONFLICT (category, slot) DO UPDATE SET
+      total_steps = progress_category_rollup.total_steps + EXCLUDED.total_steps,
+      completed_steps = progress_category_rollup.completed_steps + EXCLUDED.completed_steps,
+      in_progress_steps = progress_category_rollup.in_progress_steps + EXCLUDED.in_progress_steps;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_user_progress_insert ON public.user_progress;
+CREATE TRIGGER rollup_user_progress_insert
+  AFTER INSERT ON public.user_progress
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_progress();
+
+DROP TRIGGER IF EXISTS rollup_user_progress_update ON public.user_progress;
+CREATE TRIGGER rollup_user_progress_update
+  AFTER UPDATE ON public.user_progress
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_progress();
+
+DROP TRIGGER IF EXISTS rollup_user_progress_delete ON public.user_progress;
+CREATE TRIGGER rollup_user_progress_delete
+  AFTER DELETE ON public.user_progress
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_progress();
+
+-- Recompute every rollup from the base tables, into slot 0. Used once below
+-- to populate the rollups, and after bulk loads that bypass triggers.
+CREATE OR REPLACE FUNCTION public.rebuild_analytics_rollups()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  LOCK TABLE user_sessions, user_progress IN SHARE MODE;
+
+  TRUNCATE analytics_daily_rollup, progress_category_rollup;
+  -- Rebuilt directly, so skip the histogram trigger for these rows.
+  ALTER TABLE user_last_activity DISABLE TRIGGER rollup_user_last_activity;
+  DELETE FROM user_last_activity;
+  INSERT INTO user_last_activity (user_id, last_session_at)
+  SELECT user_id, MAX(session_start) FROM user_sessions WHERE session_start IS NOT NULL GROUP BY user_id;
+  ALTER TABLE user_last_activity ENABLE TRIGGER rollup_user_last_activity;
+
+  INSERT INTO analytics_daily_rollup (day, signups, sessions, session_minutes, timed_sessions, last_active_users)
+  SELECT day, SUM(signups), SUM(sessions), SUM(session_minutes), SUM(timed_sessions), SUM(last_active_users)
+  FROM (
+    SELECT analytics_day(created_at) AS day, COUNT(*) AS signups, 0 AS sessions, 0 AS session_minutes,
+           0 AS timed_sessions, 0 AS last_active_users
+    FROM auth.users GROUP BY 1
+    UNION ALL
+    SELECT analytics_day(session_start), 0, COUNT(*), COALESCE(SUM(duration_minutes), 0), COUNT(duration_minutes), 0
+    FROM user_sessions WHERE session_start IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT analytics_day(last_session_at), 0, 0, 0, 0, COUNT(*)
+    FROM user_last_activity GROUP BY 1
+  ) totals
+  GROUP BY day;
+
+  INSERT INTO progress_category_rollup (category, total_steps, completed_steps, in_progress_steps)
+  SELECT COALESCE(step_category, 'uncategorized'), COUNT(*),
+         COUNT(*) FILTER (WHERE status = 'completed'),
+         COUNT(*) FILTER (WHERE status IN ('in_progress', 'in-progress'))
+  FROM user_progress GROUP BY 1;
+END;
+$$;
+
+SELECT public.rebuild_analytics_rollups();
+
+-- Read paths: same signatures and columns as before, now served from rollups
+-- (summed over their slots).
+CREATE OR REPLACE FUNCTION public.get_progress_stats_by_category()
+RETURNS TABLE (
+  category TEXT,
+  total_steps BIGINT,
+  completed_steps BIGINT,
+  in_progress_steps BIGINT,
+  completion_rate NUMERIC
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    r.category,
+    r.total_steps,
+    r.completed_steps,
+    r.in_progress_steps,
+    CASE
+      WHEN r.total_steps > 0 THEN ROUND((r.completed_steps::NUMERIC / r.total_steps::NUMERIC) * 100, 2)
+      ELSE 0
+    END as completion_rate
+  FROM (
+    SELECT p.category, SUM(p.total_steps)::BIGINT AS total_steps, SUM(p.completed_steps)::BIGINT AS completed_steps,
+           SUM(p.in_progress_steps)::BIGINT AS in_progress_steps
+    FROM public.progress_category_rollup p
+    GROUP BY p.category
+  ) r
+  WHERE r.total_steps > 0
+  ORDER BY completion_rate DESC;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION public.get_user_engagement_metrics(days_back INTEGER DEFAULT 30)
+RETURNS TABLE (
+  total_users BIGINT,
+  active_users BIGINT,
+  avg_session_duration NUMERIC,
+  total_sessions BIGINT,
+  completion_rate NUMERIC
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    (SELECT COALESCE(SUM(signups), 0)::BIGINT FROM public.analytics_daily_rollup) as total_users,
+    COALESCE(SUM(w.last_active_users), 0)::BIGINT as active_users,
+    COALESCE(SUM(w.session_minutes)::NUMERIC / NULLIF(SUM(w.timed_sessions), 0), 0) as avg_session_duration,
+    COALESCE(SUM(w.sessions), 0)::BIGINT as total_sessions,
+    (SELECT
+       CASE
+         WHEN SUM(p.total_steps) > 0 THEN ROUND((SUM(p.completed_steps) / SUM(p.total_steps)) * 100, 2)
+         ELSE 0
+       END
+     FROM public.progress_category_rollup p) as completion_rate
+  FROM public.analytics_daily_rollup w
+  WHERE w.day >= public.analytics_day(NOW()) - days_back;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE VIEW public.admin_analytics_summary AS
+WITH daily AS (
+  SELECT
+    COALESCE(SUM(signups), 0) AS total_registered,
+    COALESCE(SUM(sessions), 0) AS total_sessions,
+    COALESCE(SUM(last_active_users) FILTER (WHERE day >= public.analytics_day(NOW()) - 7), 0) AS active_users_7d
+  FROM public.analytics_daily_rollup
+),
+progress AS (
+  SELECT COALESCE(SUM(total_steps), 0) AS total_steps, COALESCE(SUM(completed_steps), 0) AS completed_steps
+  FROM public.progress_category_rollup
+)
+SELECT 'users' as metric_type, 'total_registered' as metric_name, daily.total_registered::TEXT as metric_value, NOW() as calculated_at FROM daily
+UNION ALL
+SELECT 'progress', 'total_steps', progress.total_steps::TEXT, NOW() FROM progress
+UNION ALL
+SELECT 'progress', 'completed_steps', progress.completed_steps::TEXT, NOW() FROM progress
+UNION ALL
+SELECT 'sessions', 'total_sessions', daily.total_sessions::TEXT, NOW() FROM daily
+UNION ALL
+SELECT 'sessions', 'active_users_7d', daily.active_users_7d::TEXT, NOW() FROM daily;
+
+CREATE OR REPLACE VIEW public.admin_dashboard_stats AS
+SELECT
+  COALESCE(SUM(signups), 0)::BIGINT as total_users,
+  COALESCE(SUM(signups) FILTER (WHERE day >= public.analytics_day(NOW()) - 7), 0)::BIGINT as new_users_week,
+  COALESCE(SUM(signups) FILTER (WHERE day >= public.analytics_day(NOW()) - 30), 0)::BIGINT as new_users_month,
+  (SELECT COALESCE(SUM(completed_steps), 0)::BIGINT FROM public.progress_category_rollup) as total_completions,
+  COALESCE(SUM(last_active_users) FILTER (WHERE day >= public.analytics_day(NOW()) - 7), 0)::BIGINT as active_users_week,
+  COALESCE(SUM(last_active_users) FILTER (WHERE day >= public.analytics_day(NOW()) - 30), 0)::BIGINT as active_users_month
+FROM public.analytics_daily_rollup;
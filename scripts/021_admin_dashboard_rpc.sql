@@ -0,0 +1,86 @@
+-- Server-side aggregates for /api/admin/dashboard-data
+-- The route used to download every user_profiles and user_progress row and
+-- count them in JavaScript. Stats now come from one RPC call and the
+-- progress list is served in keyset-paginated pages.
+
+-- Supports the active-user count and the progress pages (newest first).
+CREATE INDEX IF NOT EXISTS idx_user_progress_updated_at_id ON public.user_progress(updated_at DESC, id DESC) INCLUDE (user_id);
+
+-- Supports the recent-users list.
+CREATE INDEX IF NOT EXISTS idx_user_profiles_created_at ON public.user_profiles(created_at DESC);
+
+-- Dashboard counters. User counts come from the analytics rollups; active
+-- users are those with a user_progress row updated in the window
+-- (user_progress.updated_at, not user_sessions), as the route counted them.
+CREATE OR REPLACE FUNCTION public.get_admin_dashboard_stats()
+RETURNS TABLE (
+  total_users BIGINT,
+  new_users_week BIGINT,
+  new_users_month BIGINT,
+  total_completions BIGINT,
+  active_users_week BIGINT,
+  active_users_month BIGINT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    COALESCE(SUM(r.signups), 0)::BIGINT,
+    COALESCE(SUM(r.signups) FILTER (WHERE r.day >= analytics_day(NOW()) - 7), 0)::BIGINT,
+    COALESCE(SUM(r.signups) FILTER (WHERE r.day >= analytics_day(NOW()) - 30), 0)::BIGINT,
+    (SELECT COALESCE(SUM(p.completed_steps), 0)::BIGINT FROM progress_category_rollup p),
+    (SELECT COUNT(DISTINCT up.user_id) FROM user_progress up WHERE up.updated_at >= NOW() - INTERVAL '7 days'),
+    (SELECT COUNT(DISTINCT up.user_id) FROM user_progress up WHERE up.updated_at >= NOW() - INTERVAL '30 days')
+  FROM analytics_daily_rollup r;
+END;
+$$;
+
+-- One page of the progress list, newest first. Pass the (updated_at, id) of
+-- the last row of the previous page to get the next one; NULLs start at the top.
+-- protocol_id and progress_percentage only exist in the 013 layout of
+-- user_progress, so they are read through to_jsonb. Under the 003 layout the
+-- row's step_name stands in for protocol_id and progress_percentage is NULL.
+CREATE OR REPLACE FUNCTION public.get_admin_progress_page(
+  after_updated_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  email TEXT,
+  display_name TEXT,
+  protocol_id TEXT,
+  status TEXT,
+  progress_percentage INTEGER,
+  updated_at TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT up.id, up.user_id, p.email, p.display_name,
+         COALESCE(to_jsonb(up) ->> 'protocol_id', to_jsonb(up) ->> 'step_name'),
+         up.status,
+         (to_jsonb(up) ->> 'progress_percentage')::INTEGER,
+         up.updated_at
+  FROM user_progress up
+  JOIN user_profiles p ON p.user_id = up.user_id
+  WHERE after_updated_at IS NULL
+     OR (up.updated_at, up.id) < (after_updated_at, after_id)
+  ORDER BY up.updated_at DESC, up.id DESC
+  LIMIT LEAST(GREATEST(page_size, 1), 500);
+END;
+$$;
+
+-- Only the server (service role) calls these; they expose every user.
+REVOKE ALL ON FUNCTION public.get_admin_dashboard_stats() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.get_admin_progress_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_admin_dashboard_stats() TO service_role;
+GRANT EXECUTE ON FUNCTION public.get_admin_progress_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER) TO service_role;
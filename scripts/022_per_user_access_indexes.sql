@@ -0,0 +1,39 @@
+-- Composite and covering indexes for the per-user access paths
+-- The dashboard, analytics, goals, reflections and modules pages always
+-- filter by user_id and usually sort by a date. Single-column user_id
+-- indexes find the rows but still need a separate sort; these indexes
+-- return rows already in page order, and the INCLUDE columns let the
+-- dashboard counters be answered from the index alone.
+--
+-- Built inside the migration transaction. On a large production table,
+-- create the index by hand with CREATE INDEX CONCURRENTLY first; the
+-- IF NOT EXISTS below then turns this into a no-op.
+
+-- goals: goals page and dashboard list, newest first
+CREATE INDEX IF NOT EXISTS idx_goals_user_created_at ON public.goals(user_id, created_at DESC) INCLUDE (status);
+
+-- habits: dashboard "active habits" counter
+CREATE INDEX IF NOT EXISTS idx_habits_user_active ON public.habits(user_id, is_active) INCLUDE (id);
+
+-- user_module_progress: dashboard / modules list, most recently accessed first
+CREATE INDEX IF NOT EXISTS idx_user_module_progress_user_accessed
+  ON public.user_module_progress(user_id, last_accessed_at DESC)
+  INCLUDE (module_id, status, progress_percentage);
+
+-- transformation_modules: the catalog only ever lists active modules in order
+CREATE INDEX IF NOT EXISTS idx_transformation_modules_active_order
+  ON public.transformation_modules(order_index) WHERE is_active = true;
+
+-- module_sections: a module's active sections in order
+CREATE INDEX IF NOT EXISTS idx_module_sections_active_order
+  ON public.module_sections(module_id, order_index) WHERE is_active = true;
+
+-- daily_reflections needs nothing new: UNIQUE(user_id, reflection_date)
+-- already returns a user's reflections in date order.
+
+-- Drop single-column indexes that are now a prefix of another index on the
+-- same table. They cost a write on every insert and serve no extra query.
+DROP INDEX IF EXISTS public.idx_goals_user_id;
+DROP INDEX IF EXISTS public.idx_habits_user_id;
+DROP INDEX IF EXISTS public.idx_daily_reflections_user_id;
+DROP INDEX IF EXISTS public.idx_user_module_progress_user_id;
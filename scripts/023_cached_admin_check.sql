@@ -0,0 +1,74 @@
+-- One admin check per statement instead of one per row
+-- The admin policies used to run EXISTS (SELECT 1 FROM admin_users ...) or
+-- the VOLATILE is_admin_user() for every row scanned, so admin listing pages
+-- got slower with every row they read. (The 013 policies also compared the
+-- *scanned row's* user_id with auth.uid(), because admin_users has no
+-- user_id column.) Every admin policy now calls the STABLE is_admin() wrapped
+-- in a scalar subquery, which the planner runs once as an InitPlan.
+
+-- An active admin, matched by id or by the e-mail in the JWT as the older
+-- policies did. Pass a role to require it (e.g. 'super_admin').
+CREATE OR REPLACE FUNCTION public.is_admin(required_role TEXT DEFAULT NULL)
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT EXISTS (
+    SELECT 1 FROM admin_users
+    WHERE (id = auth.uid() OR email = auth.jwt() ->> 'email')
+      AND is_active = true
+      AND (required_role IS NULL OR role = required_role)
+  );
+$$;
+
+-- Kept for existing callers.
+CREATE OR REPLACE FUNCTION public.is_admin_user()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT public.is_admin();
+$$;
+
+GRANT EXECUTE ON FUNCTION public.is_admin(TEXT) TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.is_admin_user() TO anon, authenticated, service_role;
+
+CREATE INDEX IF NOT EXISTS idx_admin_users_email ON public.admin_users(email);
+
+-- Recreate every admin policy in public with the cached check. Each of them
+-- is a pure admin test (the only role-specific one is the super_admin insert
+-- on admin_users), so name, command, roles and clauses are kept and only the
+-- expression changes.
+DO $$
+DECLARE
+  pol RECORD;
+  admin_check TEXT;
+  roles TEXT;
+BEGIN
+  FOR pol IN
+    SELECT schemaname, tablename, policyname, permissive, cmd, p.roles AS role_names, qual, with_check
+    FROM pg_policies p
+    WHERE schemaname = 'public'
+      AND (COALESCE(qual, '') || ' ' || COALESCE(with_check, '')) ~ '(admin_users|is_admin_user\(\))'
+  LOOP
+    admin_check := CASE
+      WHEN (COALESCE(pol.qual, '') || ' ' || COALESCE(pol.with_check, '')) LIKE '%super_admin%'
+        THEN '(SELECT public.is_admin(''super_admin''))'
+      ELSE '(SELECT public.is_admin())'
+    END;
+    SELECT string_agg(quote_ident(r), ', ') INTO roles FROM unnest(pol.role_names) AS r;
+
+    EXECUTE format('DROP POLICY %I ON %I.%I', pol.policyname, pol.schemaname, pol.tablename);
+    EXECUTE format(
+      'CREATE POLICY %I ON %I.%I AS %s FOR %s TO %s %s %s',
+      pol.policyname, pol.schemaname, pol.tablename, pol.permissive, pol.cmd, roles,
+      CASE WHEN pol.qual IS NOT NULL THEN 'USING (' || admin_check || ')' ELSE '' END,
+      CASE WHEN pol.with_check IS NOT NULL THEN 'WITH CHECK (' || admin_check || ')' ELSE '' END
+    );
+  END LOOP;
+END;
+$$;
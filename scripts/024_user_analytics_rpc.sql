@@ -0,0 +1,98 @@
+-- Per-user analytics in one round trip for /analytics
+-- The page used to download every goal, reflection, module progress row and
+-- habit of the user and bucket them per day in the browser. The counters,
+-- goals by category and the daily series now come from one call, with the
+-- days bucketed in the user's time zone.
+
+CREATE OR REPLACE FUNCTION public.get_user_analytics(days_back INTEGER DEFAULT 30, tz TEXT DEFAULT 'UTC')
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  uid UUID := auth.uid();
+  today DATE := (NOW() AT TIME ZONE tz)::DATE;
+  span INTEGER := LEAST(GREATEST(days_back, 1), 366);
+  result JSONB;
+BEGIN
+  IF uid IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT jsonb_build_object(
+    'total_goals', g.total,
+    'completed_goals', g.completed,
+    'active_goals', g.active,
+    'goals_by_category', g.by_category,
+    'total_reflections', r.total,
+    'average_mood_rating', r.average_mood,
+    'total_modules_completed', m.completed,
+    'total_habits', h.total,
+    'active_habits', h.active,
+    'series', s.days
+  )
+  INTO result
+  FROM
+    (
+      SELECT
+        COUNT(*) AS total,
+        COUNT(*) FILTER (WHERE status = 'completed') AS completed,
+        COUNT(*) FILTER (WHERE status = 'active') AS active,
+        COALESCE(
+          (SELECT jsonb_object_agg(category, n)
+           FROM (SELECT category, COUNT(*) AS n FROM goals WHERE user_id = uid GROUP BY category) c),
+          '{}'::JSONB
+        ) AS by_category
+      FROM goals
+      WHERE user_id = uid
+    ) g,
+    (
+      SELECT COUNT(*) AS total, COALESCE(ROUND(AVG(COALESCE(mood_rating, 0)), 1), 0) AS average_mood
+      FROM daily_reflections
+      WHERE user_id = uid
+    ) r,
+    (
+      SELECT COUNT(*) FILTER (WHERE status = 'completed') AS completed
+      FROM user_module_progress
+      WHERE user_id = uid
+    ) m,
+    (
+      SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE is_active) AS active
+      FROM habits
+      WHERE user_id = uid
+    ) h,
+    (
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'day', d.day,
+          'goals_completed', COALESCE(gc.n, 0),
+          'reflections', COALESCE(dr.n, 0),
+          'mood', COALESCE(dr.mood, 0)
+        ) ORDER BY d.day
+      ) AS days
+      FROM (
+        SELECT gs::DATE AS day
+        FROM generate_series((today - (span - 1))::TIMESTAMP, today::TIMESTAMP, INTERVAL '1 day') AS gs
+      ) d
+      LEFT JOIN (
+        SELECT reflection_date AS day, COUNT(*) AS n, MAX(mood_rating) AS mood
+        FROM daily_reflections
+        WHERE user_id = uid AND reflection_date > today - span AND reflection_date <= today
+        GROUP BY reflection_date
+      ) dr ON dr.day = d.day
+      LEFT JOIN (
+        SELECT (completed_at AT TIME ZONE tz)::DATE AS day, COUNT(*) AS n
+        FROM goals
+        WHERE user_id = uid AND completed_at >= (today - (span - 1))::TIMESTAMP AT TIME ZONE tz
+        GROUP BY 1
+      ) gc ON gc.day = d.day
+    ) s;
+
+  RETURN result;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.get_user_analytics(INTEGER, TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_user_analytics(INTEGER, TEXT) TO authenticated;
@@ -0,0 +1,257 @@
+-- Reflection and habit streaks, maintained on write
+-- One row per streak subject: the user's daily reflections, or one habit.
+-- Entry dates are the user's local calendar dates (reflection_date,
+-- entry_date), so the stored runs need no time zone; only "is the current
+-- run still alive today" depends on it and is decided at read time.
+--
+-- A statement that appends one new latest day to a subject extends its run
+-- in O(1). Anything else (backfilled days, edits, deletes, bulk loads)
+-- recomputes the touched subjects with one gaps-and-islands query.
+
+CREATE TABLE IF NOT EXISTS public.user_streaks (
+  kind TEXT NOT NULL CHECK (kind IN ('reflection', 'habit')),
+  subject_id UUID NOT NULL,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  current_start DATE NOT NULL,
+  last_date DATE NOT NULL,
+  current_length INTEGER NOT NULL,
+  longest_length INTEGER NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (kind, subject_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_streaks_user_id ON public.user_streaks(user_id);
+
+ALTER TABLE public.user_streaks ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own streaks" ON public.user_streaks;
+CREATE POLICY "Users can view their own streaks" ON public.user_streaks
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Recompute the streaks of the given subjects from their entries.
+-- Subjects without entries lose their row.
+CREATE OR REPLACE FUNCTION public.recompute_streaks(streak_kind TEXT, subject_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  DELETE FROM user_streaks WHERE kind = streak_kind AND subject_id = ANY(subject_ids);
+
+  INSERT INTO user_streaks (kind, subject_id, user_id, current_start, last_date, current_length, longest_length)
+  SELECT DISTINCT ON (subject_id)
+    streak_kind, subject_id, user_id, start_day, end_day, length,
+    MAX(length) OVER (PARTITION BY subject_id)
+  FROM (
+    SELECT subject_id, user_id, MIN(day) AS start_day, MAX(day) AS end_day, COUNT(*)::INTEGER AS length
+    FROM (
+      SELECT subject_id, user_id, day, day - (DENSE_RANK() OVER (PARTITION BY subject_id ORDER BY day))::INTEGER AS run
+      FROM (
+        SELECT DISTINCT r.user_id AS subject_id, r.user_id, r.reflection_date AS day
+        FROM daily_reflections r
+        WHERE streak_kind = 'reflection' AND r.user_id = ANY(subject_ids)
+        UNION
+        SELECT e.habit_id, h.user_id, e.entry_date
+        FROM habit_entries e
+        JOIN habits h ON h.id = e.habit_id
+        WHERE streak_kind = 'habit' AND e.habit_id = ANY(subject_ids) AND COALESCE(e.completed_count, 0) > 0
+      ) days
+    ) numbered
+    GROUP BY subject_id, user_id, run
+  ) runs
+  ORDER BY subject_id, end_day DESC;
+END;
+$$;
+
+-- Extend the run of each subject that got exactly one day later than its
+-- last recorded one; returns the subjects that still need a recompute.
+CREATE OR REPLACE FUNCTION public.append_streak_days(streak_kind TEXT, days JSONB)
+RETURNS UUID[]
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  WITH added AS (
+    SELECT (d->>'subject_id')::UUID AS subject_id, (d->>'user_id')::UUID AS user_id, (d->>'day')::DATE AS day
+    FROM jsonb_array_elements(days) d
+  ),
+  single AS (
+    SELECT subject_id, MIN(user_id::TEXT)::UUID AS user_id, MIN(day) AS day
+    FROM added GROUP BY subject_id HAVING COUNT(*) = 1
+  ),
+  appended AS (
+    INSERT INTO user_streaks AS s (kind, subject_id, user_id, current_start, last_date, current_length, longest_length)
+    SELECT streak_kind, subject_id, user_id, day, day, 1, 1 FROM single
+    ON CONFLICT (kind, subject_id) DO UPDATE SET
+      current_start = CASE WHEN EXCLUDED.last_date = s.last_date + 1 THEN s.current_start ELSE EXCLUDED.last_date END,
+      current_length = CASE WHEN EXCLUDED.last_date = s.last_date + 1 THEN s.current_length + 1 ELSE 1 END,
+      longest_length = GREATEST(s.longest_length, CASE WHEN EXCLUDED.last_date = s.last_date + 1 THEN s.current_length + 1 ELSE 1 END),
+      last_date = EXCLUDED.last_date,
+      updated_at = NOW()
+    WHERE EXCLUDED.last_date > s.last_date
+    RETURNING s.subject_id
+  )
+  SELECT array_agg(DISTINCT a.subject_id) INTO stale
+  FROM added a
+  WHERE a.subject_id NOT IN (SELECT subject_id FROM appended);
+
+  RETURN COALESCE(stale, '{}');
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.refresh_reflection_streaks()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    stale := append_streak_days('reflection', (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('subject_id', user_id, 'user_id', user_id, 'day', reflection_date)), '[]')
+      FROM new_rows
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    -- Only a moved date or owner changes the runs.
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM (
+      SELECT user_id, reflection_date FROM old_rows
+      EXCEPT ALL
+      SELECT user_id, reflection_date FROM new_rows
+      UNION ALL
+      (SELECT user_id, reflection_date FROM new_rows
+       EXCEPT ALL
+       SELECT user_id, reflection_date FROM old_rows)
+    ) changed;
+  ELSE
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM old_rows;
+  END IF;
+
+  IF cardinality(stale) > 0 THEN
+    PERFORM recompute_streaks('reflection', stale);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.refresh_habit_streaks()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    stale := append_streak_days('habit', (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('subject_id', n.habit_id, 'user_id', h.user_id, 'day', n.entry_date)), '[]')
+      FROM new_rows n
+      JOIN habits h ON h.id = n.habit_id
+      WHERE COALESCE(n.completed_count, 0) > 0
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT habit_id) INTO stale FROM (
+      SELECT habit_id, entry_date, COALESCE(completed_count, 0) > 0 AS done FROM old_rows
+      EXCEPT ALL
+      SELECT habit_id, entry_date, COALESCE(completed_count, 0) > 0 FROM new_rows
+      UNION ALL
+      (SELECT habit_id, entry_date, COALESCE(completed_count, 0) > 0 FROM new_rows
+       EXCEPT ALL
+       SELECT habit_id, entry_date, COALESCE(completed_count, 0) > 0 FROM old_rows)
+    ) changed;
+  ELSE
+    SELECT array_agg(DISTINCT habit_id) INTO stale FROM old_rows;
+  END IF;
+
+  IF cardinality(stale) > 0 THEN
+    PERFORM recompute_streaks('habit', stale);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS streaks_daily_reflections_insert ON public.daily_reflections;
+CREATE TRIGGER streaks_daily_reflections_insert
+  AFTER INSERT ON public.daily_reflections
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_reflection_streaks();
+
+DROP TRIGGER IF EXISTS streaks_daily_reflections_update ON public.daily_reflections;
+CREATE TRIGGER streaks_daily_reflections_update
+  AFTER UPDATE ON public.daily_reflections
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_reflection_streaks();
+
+DROP TRIGGER IF EXISTS streaks_daily_reflections_delete ON public.daily_reflections;
+CREATE TRIGGER streaks_daily_reflections_delete
+  AFTER DELETE ON public.daily_reflections
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_reflection_streaks();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_insert ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_insert
+  AFTER INSERT ON public.habit_entries
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_update ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_update
+  AFTER UPDATE ON public.habit_entries
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_delete ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_delete
+  AFTER DELETE ON public.habit_entries
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+-- Rebuild every streak from scratch (after bulk loads or to repair drift).
+CREATE OR REPLACE FUNCTION public.rebuild_user_streaks()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  TRUNCATE user_streaks;
+  PERFORM recompute_streaks('reflection', ARRAY(SELECT DISTINCT user_id FROM daily_reflections));
+  PERFORM recompute_streaks('habit', ARRAY(SELECT DISTINCT habit_id FROM habit_entries));
+END;
+$$;
+
+-- Streaks of the calling user. A run is current while its last day is today
+-- or yesterday in the user's time zone.
+CREATE OR REPLACE FUNCTION public.get_user_streaks(tz TEXT DEFAULT 'UTC')
+RETURNS TABLE (
+  kind TEXT,
+  subject_id UUID,
+  current_streak INTEGER,
+  longest_streak INTEGER,
+  last_date DATE
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT s.kind, s.subject_id,
+         CASE WHEN s.last_date >= (NOW() AT TIME ZONE tz)::DATE - 1 THEN s.current_length ELSE 0 END,
+         s.longest_length, s.last_date
+  FROM user_streaks s
+  WHERE s.user_id = auth.uid();
+$$;
+
+REVOKE ALL ON FUNCTION public.get_user_streaks(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_user_streaks(TEXT) TO authenticated;
+REVOKE ALL ON FUNCTION public.recompute_streaks(TEXT, UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.append_streak_days(TEXT, JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.rebuild_user_streaks() FROM PUBLIC;
+
+SELECT public.rebuild_user_streaks();
@@ -0,0 +1,95 @@
+-- Everything the dashboard renders, in one round trip
+-- The page used to chain seven requests (profile, goals, habits, modules,
+-- module progress, reflection ids, streaks), join modules to progress in the
+-- browser and create a new user's initial progress with one upsert per
+-- module. get_dashboard_bootstrap() returns the profile, counters, recent
+-- goals and the module list with the user's progress, creating the initial
+-- progress rows in a single INSERT the first time.
+
+CREATE OR REPLACE FUNCTION public.get_dashboard_bootstrap(tz TEXT DEFAULT 'UTC')
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  uid UUID := auth.uid();
+  result JSONB;
+BEGIN
+  IF uid IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  -- New users start with progress on the first three modules.
+  IF NOT EXISTS (SELECT 1 FROM user_module_progress WHERE user_id = uid) THEN
+    INSERT INTO user_module_progress (user_id, module_id, progress_percentage, status, last_accessed_at)
+    SELECT uid, m.id,
+           CASE m.order_index WHEN 1 THEN 75 WHEN 2 THEN 100 ELSE 25 END,
+           CASE WHEN m.order_index = 2 THEN 'completed' ELSE 'in_progress' END,
+           NOW()
+    FROM (
+      SELECT id, order_index FROM transformation_modules
+      WHERE is_active = true
+      ORDER BY order_index
+      LIMIT 3
+    ) m
+    ON CONFLICT (user_id, module_id) DO NOTHING;
+  END IF;
+
+  SELECT jsonb_build_object(
+    'email', (SELECT email FROM auth.users WHERE id = uid),
+    'profile', (
+      SELECT jsonb_build_object('display_name', p.display_name, 'language', p.language)
+      FROM user_profiles p WHERE p.user_id = uid
+    ),
+    'stats', jsonb_build_object(
+      'total_goals', (SELECT COUNT(*) FROM goals WHERE user_id = uid),
+      'completed_goals', (SELECT COUNT(*) FROM goals WHERE user_id = uid AND status = 'completed'),
+      'active_habits', (SELECT COUNT(*) FROM habits WHERE user_id = uid AND is_active = true),
+      'completed_modules', (
+        SELECT COUNT(*) FROM user_module_progress ump
+        JOIN transformation_modules m ON m.id = ump.module_id AND m.is_active = true
+        WHERE ump.user_id = uid AND ump.status = 'completed'
+      ),
+      'total_reflections', (SELECT COUNT(*) FROM daily_reflections WHERE user_id = uid),
+      'current_streak', COALESCE((
+        SELECT CASE WHEN s.last_date >= (NOW() AT TIME ZONE tz)::DATE - 1 THEN s.current_length ELSE 0 END
+        FROM user_streaks s WHERE s.kind = 'reflection' AND s.subject_id = uid
+      ), 0)
+    ),
+    'recent_goals', COALESCE((
+      SELECT jsonb_agg(g ORDER BY g.created_at DESC)
+      FROM (
+        SELECT id, title, status, target_date, created_at FROM goals
+        WHERE user_id = uid
+        ORDER BY created_at DESC
+        LIMIT 3
+      ) g
+    ), '[]'::JSONB),
+    'modules', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'id', m.id,
+          'title', m.title,
+          'description', m.description,
+          'category', m.category,
+          'difficulty_level', m.difficulty_level,
+          'estimated_duration_minutes', m.estimated_duration_minutes,
+          'progress_percentage', COALESCE(ump.progress_percentage, 0),
+          'status', COALESCE(ump.status, 'not_started'),
+          'last_accessed_at', ump.last_accessed_at
+        ) ORDER BY m.order_index
+      )
+      FROM transformation_modules m
+      LEFT JOIN user_module_progress ump ON ump.module_id = m.id AND ump.user_id = uid
+      WHERE m.is_active = true
+    ), '[]'::JSONB)
+  )
+  INTO result;
+
+  RETURN result;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.get_dashboard_bootstrap(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_dashboard_bootstrap(TEXT) TO authenticated;
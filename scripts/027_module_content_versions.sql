@@ -0,0 +1,126 @@
+-- Content versions for the module content cache
+-- /api/modules serves published module content from an in-memory cache keyed
+-- by module id and content version. Any write to a module, its sections or
+-- its configuration bumps that module's version here, so a cached copy is
+-- reused only while the version it was built from is still current.
+
+CREATE TABLE IF NOT EXISTS public.module_content_versions (
+  module_id UUID PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 1,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Read by the server with the service role only.
+ALTER TABLE public.module_content_versions ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.bump_module_content_versions(module_ids UUID[])
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO module_content_versions (module_id, version, updated_at)
+  SELECT DISTINCT id, 1, NOW() FROM unnest(module_ids) AS id WHERE id IS NOT NULL
+  ON CONFLICT (module_id) DO UPDATE SET
+    version = module_content_versions.version + 1,
+    updated_at = NOW();
+$$;
+
+CREATE OR REPLACE FUNCTION public.bump_module_version_from_modules()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM bump_module_content_versions(ARRAY(SELECT id FROM old_rows));
+  END IF;
+  IF TG_OP = 'INSERT' THEN
+    PERFORM bump_module_content_versions(ARRAY(SELECT id FROM new_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- module_sections and module_configurations both carry module_id.
+CREATE OR REPLACE FUNCTION public.bump_module_version_from_children()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    PERFORM bump_module_content_versions(
+      ARRAY(SELECT module_id FROM old_rows UNION SELECT module_id FROM new_rows)
+    );
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM bump_module_content_versions(ARRAY(SELECT module_id FROM old_rows));
+  ELSE
+    PERFORM bump_module_content_versions(ARRAY(SELECT module_id FROM new_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS content_version_modules_insert ON public.transformation_modules;
+CREATE TRIGGER content_version_modules_insert
+  AFTER INSERT ON public.transformation_modules
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_modules();
+
+DROP TRIGGER IF EXISTS content_version_modules_update ON public.transformation_modules;
+CREATE TRIGGER content_version_modules_update
+  AFTER UPDATE ON public.transformation_modules
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_modules();
+
+DROP TRIGGER IF EXISTS content_version_modules_delete ON public.transformation_modules;
+CREATE TRIGGER content_version_modules_delete
+  AFTER DELETE ON public.transformation_modules
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_modules();
+
+DROP TRIGGER IF EXISTS content_version_sections_insert ON public.module_sections;
+CREATE TRIGGER content_version_sections_insert
+  AFTER INSERT ON public.module_sections
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+DROP TRIGGER IF EXISTS content_version_sections_update ON public.module_sections;
+CREATE TRIGGER content_version_sections_update
+  AFTER UPDATE ON public.module_sections
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+DROP TRIGGER IF EXISTS content_version_sections_delete ON public.module_sections;
+CREATE TRIGGER content_version_sections_delete
+  AFTER DELETE ON public.module_sections
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+DROP TRIGGER IF EXISTS content_version_configurations_insert ON public.module_configurations;
+CREATE TRIGGER content_version_configurations_insert
+  AFTER INSERT ON public.module_configurations
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+DROP TRIGGER IF EXISTS content_version_configurations_update ON public.module_configurations;
+CREATE TRIGGER content_version_configurations_update
+  AFTER UPDATE ON public.module_configurations
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+DROP TRIGGER IF EXISTS content_version_configurations_delete ON public.module_configurations;
+CREATE TRIGGER content_version_configurations_delete
+  AFTER DELETE ON public.module_configurations
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.bump_module_version_from_children();
+
+-- Existing modules start at version 1.
+INSERT INTO public.module_content_versions (module_id)
+SELECT id FROM public.transformation_modules
+ON CONFLICT (module_id) DO NOTHING;
+
+REVOKE ALL ON FUNCTION public.bump_module_content_versions(UUID[]) FROM PUBLIC;
@@ -0,0 +1,49 @@
+-- Published module bundles
+-- scripts/publish_modules.py compiles a module's active sections into one
+-- pre-rendered JSON bundle named after its content hash and uploads it to
+-- the public "module-bundles" storage bucket. This table records the bundle
+-- that belongs to each module's content version; the module page fetches it
+-- only while its version is still current and otherwise falls back to the
+-- raw sections.
+
+CREATE TABLE IF NOT EXISTS public.module_bundles (
+  module_id UUID PRIMARY KEY REFERENCES public.transformation_modules(id) ON DELETE CASCADE,
+  version BIGINT NOT NULL,
+  content_hash TEXT NOT NULL,
+  path TEXT NOT NULL,
+  size_bytes INTEGER,
+  gzip_bytes INTEGER,
+  brotli_bytes INTEGER,
+  published_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Read by the server with the service role only.
+ALTER TABLE public.module_bundles ENABLE ROW LEVEL SECURITY;
+
+-- Tell the publisher (publish_modules.py --watch) which modules changed.
+CREATE OR REPLACE FUNCTION public.bump_module_content_versions(module_ids UUID[])
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO module_content_versions (module_id, version, updated_at)
+  SELECT DISTINCT id, 1, NOW() FROM unnest(module_ids) AS id WHERE id IS NOT NULL
+  ON CONFLICT (module_id) DO UPDATE SET
+    version = module_content_versions.version + 1,
+    updated_at = NOW();
+
+  SELECT pg_notify('module_content_changed', id::TEXT)
+  FROM (SELECT DISTINCT id FROM unnest(module_ids) AS id WHERE id IS NOT NULL) changed;
+$$;
+
+-- Public bucket for the bundles (Supabase only; skipped on plain Postgres).
+DO $$
+BEGIN
+  IF to_regclass('storage.buckets') IS NOT NULL THEN
+    INSERT INTO storage.buckets (id, name, public)
+    VALUES ('module-bundles', 'module-bundles', true)
+    ON CONFLICT (id) DO NOTHING;
+  END IF;
+END;
+$$;
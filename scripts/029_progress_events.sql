@@ -0,0 +1,28 @@
+-- Progress event queue for user_module_progress
+-- The module page used to update its user_module_progress row on every
+-- open, progress step and notes save, so hot rows took many tiny write
+-- transactions. Clients now append events through /api/progress/events and
+-- scripts/progress_worker.py drains them in micro-batches, coalescing the
+-- events of each (user_id, module_id) into one multi-row upsert.
+
+CREATE TABLE IF NOT EXISTS public.progress_events (
+  id BIGSERIAL PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  module_id UUID NOT NULL REFERENCES public.transformation_modules(id) ON DELETE CASCADE,
+  -- NULL means "not part of this event"; an event with only NULLs is a heartbeat.
+  status TEXT CHECK (status IN ('not_started', 'in_progress', 'completed')),
+  progress_percentage INTEGER CHECK (progress_percentage >= 0 AND progress_percentage <= 100),
+  notes TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+
+ALTER TABLE public.progress_events ENABLE ROW LEVEL SECURITY;
+
+-- Users may only enqueue events for themselves; nobody reads the queue but
+-- the worker, which connects as the owner.
+DROP POLICY IF EXISTS "Users can enqueue their own progress events" ON public.progress_events;
+CREATE POLICY "Users can enqueue their own progress events" ON public.progress_events
+  FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+GRANT INSERT ON public.progress_events TO authenticated;
+GRANT USAGE ON SEQUENCE public.progress_events_id_seq TO authenticated;
@@ -0,0 +1,91 @@
+-- Keyset-paged sources for the streaming admin exports
+-- /api/admin/export streams CSV or NDJSON by walking these functions page by
+-- page, so memory stays constant whatever the number of users; the exports
+-- used to load every row into the admin's browser first.
+
+-- user_progress has two layouts in the wild (003 and 013), so columns only
+-- one of them has are read through to_jsonb().
+
+-- Keyset order for the client export. Profiles without a created_at sort
+-- last, as -infinity: left as NULL they would sort first and could never be
+-- paged past, since a NULL cursor compares neither lower nor higher.
+CREATE INDEX IF NOT EXISTS idx_user_profiles_created_at_keyset
+  ON public.user_profiles((COALESCE(created_at, '-infinity')) DESC, id DESC);
+
+-- Clients, newest first, with their best progress percentage. Pass the
+-- (created_at, id) of the last row of the previous page to get the next one;
+-- a NULL after_id starts at the top.
+CREATE OR REPLACE FUNCTION public.export_clients_page(
+  after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  email TEXT,
+  display_name TEXT,
+  created_at TIMESTAMP WITH TIME ZONE,
+  progress_percentage INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT p.id, p.user_id, p.email, p.display_name, p.created_at,
+         COALESCE((
+           SELECT MAX((to_jsonb(up) ->> 'progress_percentage')::INTEGER)
+           FROM user_progress up WHERE up.user_id = p.user_id
+         ), 0)
+  FROM user_profiles p
+  WHERE after_id IS NULL
+     OR (COALESCE(p.created_at, '-infinity'), p.id) < (COALESCE(after_created_at, '-infinity'), after_id)
+  ORDER BY COALESCE(p.created_at, '-infinity') DESC, p.id DESC
+  LIMIT LEAST(GREATEST(page_size, 1), 5000);
+END;
+$$;
+
+-- Progress rows in id order, as JSON so the export carries whichever
+-- user_progress layout this database has, plus the owner's e-mail and name.
+CREATE OR REPLACE FUNCTION public.export_progress_page(
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 1000,
+  status_filter TEXT DEFAULT NULL,
+  category_filter TEXT DEFAULT NULL,
+  search TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  record JSONB
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT up.id, to_jsonb(up) || jsonb_build_object('email', p.email, 'display_name', p.display_name)
+  FROM user_progress up
+  LEFT JOIN user_profiles p ON p.user_id = up.user_id
+  WHERE (after_id IS NULL OR up.id > after_id)
+    AND (status_filter IS NULL OR up.status = status_filter)
+    AND (category_filter IS NULL OR to_jsonb(up) ->> 'step_category' = category_filter)
+    AND (
+      search IS NULL
+      OR p.email ILIKE '%' || search || '%'
+      OR p.display_name ILIKE '%' || search || '%'
+      OR to_jsonb(up) ->> 'step_name' ILIKE '%' || search || '%'
+    )
+  ORDER BY up.id
+  LIMIT LEAST(GREATEST(page_size, 1), 5000);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.export_clients_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.export_progress_page(UUID, INTEGER, TEXT, TEXT, TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.export_clients_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.export_progress_page(UUID, INTEGER, TEXT, TEXT, TEXT) TO service_role;
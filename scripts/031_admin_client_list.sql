@@ -0,0 +1,104 @@
+-- Keyset pagination, cheap counts and search for the admin client list
+-- /admin-panel paged clients with OFFSET and asked for an exact COUNT(*) of
+-- user_profiles on every page view, so both got slower as the table grew.
+-- Pages are now keyset pages over (created_at, id), the total is estimated
+-- from the planner statistics once the table is large, and search over
+-- e-mail and name uses trigram indexes.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Serves the plain created_at sorts idx_user_profiles_created_at was added
+-- for; the keyset pages below use idx_user_profiles_created_at_keyset (030).
+CREATE INDEX IF NOT EXISTS idx_user_profiles_created_at_id ON public.user_profiles(created_at DESC, id DESC);
+DROP INDEX IF EXISTS public.idx_user_profiles_created_at;
+
+-- ILIKE '%term%' search. Separate indexes so the planner can BitmapOr them.
+CREATE INDEX IF NOT EXISTS idx_user_profiles_email_trgm ON public.user_profiles USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_user_profiles_display_name_trgm ON public.user_profiles USING GIN (display_name gin_trgm_ops);
+
+-- One page of clients, newest first, in the export's keyset order (030):
+-- profiles without a created_at come last. Pass the (created_at, id) of the
+-- last row of the previous page to get the next one; a NULL after_id starts
+-- at the top.
+CREATE OR REPLACE FUNCTION public.get_admin_clients_page(
+  after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 20,
+  search TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  email TEXT,
+  display_name TEXT,
+  created_at TIMESTAMP WITH TIME ZONE,
+  progress_percentage INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  pattern TEXT := '%' || NULLIF(btrim(search), '') || '%';
+BEGIN
+  RETURN QUERY
+  SELECT p.id, p.user_id, p.email, p.display_name, p.created_at,
+         COALESCE((SELECT MAX(up.progress_percentage) FROM user_progress up WHERE up.user_id = p.user_id), 0)::INTEGER
+  FROM user_profiles p
+  WHERE (after_id IS NULL OR (COALESCE(p.created_at, '-infinity'), p.id) < (COALESCE(after_created_at, '-infinity'), after_id))
+    AND (pattern IS NULL OR p.email ILIKE pattern OR p.display_name ILIKE pattern)
+  ORDER BY COALESCE(p.created_at, '-infinity') DESC, p.id DESC
+  LIMIT LEAST(GREATEST(page_size, 1), 500);
+END;
+$$;
+
+-- Client total for the list header. Without a search, tables past
+-- exact_below rows report the planner's reltuples estimate (kept fresh by
+-- autovacuum) instead of counting. Searches count at most search_cap
+-- matches; is_estimate says whether the number is exact.
+CREATE OR REPLACE FUNCTION public.get_admin_clients_count(
+  search TEXT DEFAULT NULL,
+  exact_below BIGINT DEFAULT 10000,
+  search_cap INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+  total BIGINT,
+  is_estimate BOOLEAN
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  pattern TEXT := '%' || NULLIF(btrim(search), '') || '%';
+  estimate BIGINT;
+  matches BIGINT;
+BEGIN
+  IF pattern IS NOT NULL THEN
+    SELECT COUNT(*) INTO matches
+    FROM (
+      SELECT 1 FROM user_profiles p
+      WHERE p.email ILIKE pattern OR p.display_name ILIKE pattern
+      LIMIT search_cap + 1
+    ) capped;
+    RETURN QUERY SELECT LEAST(matches, search_cap::BIGINT), matches > search_cap;
+    RETURN;
+  END IF;
+
+  -- reltuples is -1 until the table has been analyzed once
+  SELECT c.reltuples::BIGINT INTO estimate FROM pg_class c WHERE c.oid = 'public.user_profiles'::regclass;
+  IF estimate >= exact_below THEN
+    RETURN QUERY SELECT estimate, TRUE;
+  ELSE
+    RETURN QUERY SELECT COUNT(*), FALSE FROM user_profiles;
+  END IF;
+END;
+$$;
+
+-- Only the server (service role) calls these; they expose every user.
+REVOKE ALL ON FUNCTION public.get_admin_clients_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER, TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.get_admin_clients_count(TEXT, BIGINT, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_admin_clients_page(TIMESTAMP WITH TIME ZONE, UUID, INTEGER, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION public.get_admin_clients_count(TEXT, BIGINT, INTEGER) TO service_role;
@@ -0,0 +1,303 @@
+-- Per-user progress summary, maintained on write
+-- Admin list views embedded user_progress(progress_percentage) for every
+-- profile and showed whichever child row came back first, and the progress
+-- page counted statuses by scanning every step in the browser. This keeps
+-- one narrow row per user, covering both the step log (user_progress) and
+-- the module progress (user_module_progress), so list views read one row
+-- per user instead of fanning out to child rows.
+--
+-- Statement-level triggers recompute only the users a statement touched,
+-- so a batch from scripts/progress_worker.py costs one refresh.
+
+CREATE TABLE IF NOT EXISTS public.user_progress_summary (
+  user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  -- Average progress over steps and modules; skipped steps don't count.
+  overall_percentage INTEGER NOT NULL DEFAULT 0,
+  steps_total INTEGER NOT NULL DEFAULT 0,
+  steps_completed INTEGER NOT NULL DEFAULT 0,
+  steps_in_progress INTEGER NOT NULL DEFAULT 0,
+  steps_skipped INTEGER NOT NULL DEFAULT 0,
+  modules_total INTEGER NOT NULL DEFAULT 0,
+  modules_completed INTEGER NOT NULL DEFAULT 0,
+  modules_in_progress INTEGER NOT NULL DEFAULT 0,
+  last_activity_at TIMESTAMP WITH TIME ZONE,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE public.user_progress_summary ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own progress summary" ON public.user_progress_summary;
+CREATE POLICY "Users can view their own progress summary" ON public.user_progress_summary
+  FOR SELECT USING (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Admins can view all progress summaries" ON public.user_progress_summary;
+CREATE POLICY "Admins can view all progress summaries" ON public.user_progress_summary
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+-- Recompute the summaries of the given users from their progress rows.
+-- Users left without any progress lose their row. user_progress has two
+-- layouts (003 and 013), so its percentage is read through to_jsonb() and
+-- falls back to 100 for completed steps. Callers must keep other writers of
+-- these users out (refresh_user_progress_summary below).
+CREATE OR REPLACE FUNCTION public.summarize_user_progress(user_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO user_progress_summary AS s (
+    user_id, overall_percentage, steps_total, steps_completed, steps_in_progress, steps_skipped,
+    modules_total, modules_completed, modules_in_progress, last_activity_at, updated_at
+  )
+  SELECT u.user_id,
+         COALESCE(ROUND((st.percentage_sum + mo.percentage_sum)::NUMERIC
+                        / NULLIF(st.scored + mo.total, 0)), 0)::INTEGER,
+         st.total, st.completed, st.in_progress, st.skipped,
+         mo.total, mo.completed, mo.in_progress,
+         GREATEST(st.last_activity_at, mo.last_activity_at),
+         NOW()
+  FROM unnest(user_ids) AS u(user_id)
+  CROSS JOIN LATERAL (
+    SELECT COUNT(*)::INTEGER AS total,
+           COUNT(*) FILTER (WHERE up.status = 'completed')::INTEGER AS completed,
+           COUNT(*) FILTER (WHERE up.status IN ('in_progress', 'in-progress'))::INTEGER AS in_progress,
+           COUNT(*) FILTER (WHERE up.status = 'skipped')::INTEGER AS skipped,
+           COUNT(*) FILTER (WHERE up.status IS DISTINCT FROM 'skipped')::INTEGER AS scored,
+           COALESCE(SUM(COALESCE(
+             (to_jsonb(up) ->> 'progress_percentage')::INTEGER,
+             CASE WHEN up.status = 'completed' THEN 100 ELSE 0 END
+           )) FILTER (WHERE up.status IS DISTINCT FROM 'skipped'), 0) AS percentage_sum,
+           MAX(up.updated_at) AS last_activity_at
+    FROM user_progress up
+    WHERE up.user_id = u.user_id
+  ) st
+  CROSS JOIN LATERAL (
+    SELECT COUNT(*)::INTEGER AS total,
+           COUNT(*) FILTER (WHERE ump.status = 'completed')::INTEGER AS completed,
+           COUNT(*) FILTER (WHERE ump.status = 'in_progress')::INTEGER AS in_progress,
+           COALESCE(SUM(COALESCE(ump.progress_percentage, 0)), 0) AS percentage_sum,
+           MAX(GREATEST(ump.last_accessed_at, ump.updated_at)) AS last_activity_at
+    FROM user_module_progress ump
+    WHERE ump.user_id = u.user_id
+  ) mo
+  WHERE st.total + mo.total > 0
+  ON CONFLICT (user_id) DO UPDATE SET
+    overall_percentage = EXCLUDED.overall_percentage,
+    steps_total = EXCLUDED.steps_total,
+    steps_completed = EXCLUDED.steps_completed,
+    steps_in_progress = EXCLUDED.steps_in_progress,
+    steps_skipped = EXCLUDED.steps_skipped,
+    modules_total = EXCLUDED.modules_total,
+    modules_completed = EXCLUDED.modules_completed,
+    modules_in_progress = EXCLUDED.modules_in_progress,
+    last_activity_at = EXCLUDED.last_activity_at,
+    updated_at = EXCLUDED.updated_at;
+
+  DELETE FROM user_progress_summary s
+  WHERE s.user_id = ANY(user_ids)
+    AND NOT EXISTS (SELECT 1 FROM user_progress up WHERE up.user_id = s.user_id)
+    AND NOT EXISTS (SELECT 1 FROM user_module_progress ump WHERE ump.user_id = s.user_id);
+END;
+$$;
+
+-- The recount runs inside the writer's transaction, so two transactions
+-- writing progress for the same user would each count without the other's
+-- uncommitted rows and the later upsert would stick. Each user is locked
+-- first, in sorted order, so the second writer waits for the first to commit
+-- and its recount (a new snapshot under READ COMMITTED) includes those rows.
+CREATE OR REPLACE FUNCTION public.refresh_user_progress_summary(user_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  target UUID;
+BEGIN
+  FOR target IN SELECT DISTINCT t.id FROM unnest(user_ids) AS t(id) ORDER BY t.id LOOP
+    PERFORM pg_advisory_xact_lock(hashtextextended('user_progress_summary:' || target::TEXT, 0));
+  END LOOP;
+  PERFORM summarize_user_progress(user_ids);
+END;
+$$;
+
+-- Shared by user_progress and user_module_progress: both have user_id.
+CREATE OR REPLACE FUNCTION public.refresh_progress_summary_rows()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM new_rows WHERE user_id IS NOT NULL;
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM (
+      SELECT user_id FROM old_rows
+      UNION
+      SELECT user_id FROM new_rows
+    ) touched
+    WHERE user_id IS NOT NULL;
+  ELSE
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM old_rows WHERE user_id IS NOT NULL;
+  END IF;
+
+  IF cardinality(stale) > 0 THEN
+    PERFORM refresh_user_progress_summary(stale);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS progress_summary_user_progress_insert ON public.user_progress;
+CREATE TRIGGER progress_summary_user_progress_insert
+  AFTER INSERT ON public.user_progress
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+DROP TRIGGER IF EXISTS progress_summary_user_progress_update ON public.user_progress;
+CREATE TRIGGER progress_summary_user_progress_update
+  AFTER UPDATE ON public.user_progress
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+DROP TRIGGER IF EXISTS progress_summary_user_progress_delete ON public.user_progress;
+CREATE TRIGGER progress_summary_user_progress_delete
+  AFTER DELETE ON public.user_progress
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+DROP TRIGGER IF EXISTS progress_summary_user_module_progress_insert ON public.user_module_progress;
+CREATE TRIGGER progress_summary_user_module_progress_insert
+  AFTER INSERT ON public.user_module_progress
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+DROP TRIGGER IF EXISTS progress_summary_user_module_progress_update ON public.user_module_progress;
+CREATE TRIGGER progress_summary_user_module_progress_update
+  AFTER UPDATE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+DROP TRIGGER IF EXISTS progress_summary_user_module_progress_delete ON public.user_module_progress;
+CREATE TRIGGER progress_summary_user_module_progress_delete
+  AFTER DELETE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_progress_summary_rows();
+
+-- Rebuild every summary from scratch (after bulk loads or to repair drift).
+-- TRUNCATE already keeps every writer out until the rebuild commits, so the
+-- per-user locks (one per user, more than the lock table holds) are skipped.
+CREATE OR REPLACE FUNCTION public.rebuild_user_progress_summary()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  TRUNCATE user_progress_summary;
+  PERFORM summarize_user_progress(ARRAY(
+    SELECT user_id FROM user_progress WHERE user_id IS NOT NULL
+    UNION
+    SELECT user_id FROM user_module_progress
+  ));
+END;
+$$;
+
+-- Step status totals for the admin progress page, summed from the summaries
+-- instead of counted over every step.
+CREATE OR REPLACE FUNCTION public.get_progress_status_totals()
+RETURNS TABLE (
+  completed BIGINT,
+  in_progress BIGINT,
+  not_started BIGINT,
+  skipped BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE(SUM(s.steps_completed), 0)::BIGINT,
+         COALESCE(SUM(s.steps_in_progress), 0)::BIGINT,
+         COALESCE(SUM(s.steps_total - s.steps_completed - s.steps_in_progress - s.steps_skipped), 0)::BIGINT,
+         COALESCE(SUM(s.steps_skipped), 0)::BIGINT
+  FROM user_progress_summary s
+  WHERE (SELECT public.is_admin()) OR auth.role() = 'service_role';
+$$;
+
+-- The client list and the client export now read the summary: one row per
+-- user, and the overall percentage instead of an arbitrary step's.
+CREATE OR REPLACE FUNCTION public.get_admin_clients_page(
+  after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 20,
+  search TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  email TEXT,
+  display_name TEXT,
+  created_at TIMESTAMP WITH TIME ZONE,
+  progress_percentage INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  pattern TEXT := '%' || NULLIF(btrim(search), '') || '%';
+BEGIN
+  RETURN QUERY
+  SELECT p.id, p.user_id, p.email, p.display_name, p.created_at, COALESCE(s.overall_percentage, 0)
+  FROM user_profiles p
+  LEFT JOIN user_progress_summary s ON s.user_id = p.user_id
+  WHERE (after_id IS NULL OR (COALESCE(p.created_at, '-infinity'), p.id) < (COALESCE(after_created_at, '-infinity'), after_id))
+    AND (pattern IS NULL OR p.email ILIKE pattern OR p.display_name ILIKE pattern)
+  ORDER BY COALESCE(p.created_at, '-infinity') DESC, p.id DESC
+  LIMIT LEAST(GREATEST(page_size, 1), 500);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.export_clients_page(
+  after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  email TEXT,
+  display_name TEXT,
+  created_at TIMESTAMP WITH TIME ZONE,
+  progress_percentage INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT p.id, p.user_id, p.email, p.display_name, p.created_at, COALESCE(s.overall_percentage, 0)
+  FROM user_profiles p
+  LEFT JOIN user_progress_summary s ON s.user_id = p.user_id
+  WHERE after_id IS NULL
+     OR (COALESCE(p.created_at, '-infinity'), p.id) < (COALESCE(after_created_at, '-infinity'), after_id)
+  ORDER BY COALESCE(p.created_at, '-infinity') DESC, p.id DESC
+  LIMIT LEAST(GREATEST(page_size, 1), 5000);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.summarize_user_progress(UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.refresh_user_progress_summary(UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.rebuild_user_progress_summary() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.get_progress_status_totals() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_progress_status_totals() TO authenticated, service_role;
+
+SELECT public.rebuild_user_progress_summary();
@@ -0,0 +1,59 @@
+-- Result tables for the offline analytics job
+-- scripts/analytics_job.py extracts activity incrementally, computes signup
+-- cohorts, retention, module funnels and mood trends off the database and
+-- replaces these tables in one transaction per run. Dashboards read the
+-- results; none of this work runs against the base tables at request time.
+
+-- Weekly signup cohorts (weeks start on Monday, UTC). dN_users counts the
+-- users of the cohort active exactly N days after signing up; rates are over
+-- the users old enough to have reached day N (NULL while none are).
+CREATE TABLE IF NOT EXISTS public.analytics_cohort_retention (
+  cohort_week DATE PRIMARY KEY,
+  cohort_size INTEGER NOT NULL,
+  d1_users INTEGER NOT NULL,
+  d7_users INTEGER NOT NULL,
+  d30_users INTEGER NOT NULL,
+  d1_rate NUMERIC(5, 4),
+  d7_rate NUMERIC(5, 4),
+  d30_rate NUMERIC(5, 4),
+  computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Per-module funnel over user_module_progress.
+CREATE TABLE IF NOT EXISTS public.analytics_module_funnel (
+  module_id UUID PRIMARY KEY,
+  opened_users INTEGER NOT NULL,
+  started_users INTEGER NOT NULL,
+  halfway_users INTEGER NOT NULL,
+  completed_users INTEGER NOT NULL,
+  median_days_to_complete NUMERIC(8, 2),
+  computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Daily mood across all reflections, with a trailing 7-day average.
+CREATE TABLE IF NOT EXISTS public.analytics_mood_daily (
+  day DATE PRIMARY KEY,
+  reflections INTEGER NOT NULL,
+  average_mood NUMERIC(4, 2),
+  average_mood_7d NUMERIC(4, 2),
+  computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.analytics_cohort_retention ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.analytics_module_funnel ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.analytics_mood_daily ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view cohort retention" ON public.analytics_cohort_retention;
+CREATE POLICY "Admins can view cohort retention" ON public.analytics_cohort_retention
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+DROP POLICY IF EXISTS "Admins can view module funnels" ON public.analytics_module_funnel;
+CREATE POLICY "Admins can view module funnels" ON public.analytics_module_funnel
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+DROP POLICY IF EXISTS "Admins can view mood trends" ON public.analytics_mood_daily;
+CREATE POLICY "Admins can view mood trends" ON public.analytics_mood_daily
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+GRANT SELECT ON public.analytics_cohort_retention, public.analytics_module_funnel, public.analytics_mood_daily
+  TO authenticated, service_role;
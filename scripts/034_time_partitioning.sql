@@ -0,0 +1,369 @@
+-- Monthly range partitions for user_sessions and habit_entries
+-- Both are append-only time series that every engagement metric reads by
+-- time window, yet they were single heaps with a plain created_at index.
+-- They are now partitioned by month (UTC) on the column the windows filter
+-- on, so time-window queries prune to the partitions they need, vacuum only
+-- ever works on the recent partitions, and old months can be compacted into
+-- daily aggregates and detached (scripts/partition_maintenance.py).
+--
+-- Partitions are created ahead of time by maintain_time_partitions(), daily
+-- through pg_cron when it is installed and on every maintenance-tool run.
+-- Rows for a month without a partition land in the default partition and
+-- are moved out the next time that month's partition is created. Rows for a
+-- month whose partition was detached but not dropped have nowhere to go and
+-- stay in the default partition; partition_maintenance.py reports them.
+--
+-- The conversion rewrites both tables and holds an exclusive lock on them
+-- while it runs.
+
+-- Create the partition of parent_table for the month containing month_start,
+-- moving that month's rows out of the default partition first. Returns
+-- false when the partition is already attached, or when a table of that
+-- name exists but is not attached (a detached month), in which case the
+-- month's rows stay in the default partition. Bounds are UTC months.
+CREATE OR REPLACE FUNCTION public.create_month_partition(parent_table TEXT, key_column TEXT, month_start DATE)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+SET TimeZone = 'UTC'
+AS $$
+DECLARE
+  first_day DATE := date_trunc('month', month_start)::DATE;
+  next_first_day DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::DATE;
+  partition_name TEXT := format('%s_%s', parent_table, to_char(month_start, 'YYYY_MM'));
+  default_name TEXT := parent_table || '_default';
+BEGIN
+  IF to_regclass(format('public.%I', partition_name)) IS NOT NULL THEN
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_inherits
+      WHERE inhrelid = format('public.%I', partition_name)::REGCLASS
+        AND inhparent = format('public.%I', parent_table)::REGCLASS
+    ) THEN
+      RAISE WARNING '% exists but is not a partition of %; rows for that month stay in %',
+        partition_name, parent_table, default_name;
+    END IF;
+    RETURN FALSE;
+  END IF;
+
+  EXECUTE format(
+    'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+    partition_name, parent_table
+  );
+
+  IF to_regclass(format('public.%I', default_name)) IS NOT NULL THEN
+    EXECUTE format(
+      'WITH moved AS (DELETE FROM public.%I WHERE %I >= %L AND %I < %L RETURNING *)
+       INSERT INTO public.%I SELECT * FROM moved',
+      default_name, key_column, first_day, key_column, next_first_day, partition_name
+    );
+  END IF;
+
+  EXECUTE format(
+    'ALTER TABLE public.%I ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+    parent_table, partition_name, first_day, next_first_day
+  );
+
+  -- Partitions are only meant to be read through the parent, whose policies
+  -- apply; locked down in case the API exposes them directly.
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', partition_name);
+  EXECUTE format('REVOKE ALL ON public.%I FROM anon, authenticated', partition_name);
+  RETURN TRUE;
+END;
+$$;
+
+-- Make sure partitions exist for the current month, months_ahead months
+-- after it, and every month that has rows waiting in the default partition.
+-- Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION public.ensure_monthly_partitions(parent_table TEXT, key_column TEXT, months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+SET TimeZone = 'UTC'
+AS $$
+DECLARE
+  waiting DATE;
+  created INTEGER := 0;
+BEGIN
+  IF to_regclass(format('public.%I', parent_table || '_default')) IS NOT NULL THEN
+    FOR waiting IN EXECUTE format(
+      'SELECT DISTINCT date_trunc(''month'', %I)::DATE FROM public.%I',
+      key_column, parent_table || '_default'
+    ) LOOP
+      created := created + create_month_partition(parent_table, key_column, waiting)::INTEGER;
+    END LOOP;
+  END IF;
+
+  FOR i IN 0..months_ahead LOOP
+    created := created + create_month_partition(
+      parent_table, key_column, (date_trunc('month', NOW()) + i * INTERVAL '1 month')::DATE
+    )::INTEGER;
+  END LOOP;
+  RETURN created;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.maintain_time_partitions()
+RETURNS INTEGER
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT ensure_monthly_partitions('user_sessions', 'session_start')
+       + ensure_monthly_partitions('habit_entries', 'entry_date');
+$$;
+
+-- Replace a plain table by a partitioned one with the same columns, data,
+-- policies, grants and foreign keys, and point dependent views at it.
+-- Indexes, unique constraints and triggers are recreated by the caller.
+-- Does nothing when the table is already partitioned.
+CREATE OR REPLACE FUNCTION public.convert_to_monthly_partitions(table_name TEXT, key_column TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+SET search_path = public
+SET TimeZone = 'UTC'
+AS $$
+DECLARE
+  original REGCLASS := format('public.%I', table_name)::REGCLASS;
+  legacy TEXT := table_name || '_unpartitioned';
+  statements TEXT[];
+  views JSONB;
+  month_start DATE;
+  view_name TEXT;
+  statement TEXT;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = original) = 'p' THEN
+    RETURN;
+  END IF;
+
+  -- Policies and views deparse with the current table name, so capture
+  -- them before the rename.
+  SELECT array_agg(format(
+    'CREATE POLICY %I ON public.%I AS %s FOR %s TO %s%s%s',
+    p.policyname, table_name, p.permissive, p.cmd,
+    (SELECT string_agg(CASE WHEN r = 'public' THEN 'PUBLIC' ELSE quote_ident(r) END, ', ') FROM unnest(p.roles) r),
+    COALESCE(' USING (' || p.qual || ')', ''),
+    COALESCE(' WITH CHECK (' || p.with_check || ')', '')
+  ))
+  INTO statements
+  FROM pg_policies p
+  WHERE p.schemaname = 'public' AND p.tablename = table_name;
+
+  SELECT statements || array_agg(format(
+    'GRANT %s ON public.%I TO %s',
+    a.privilege_type, table_name,
+    CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END
+  ))
+  INTO statements
+  FROM pg_class c, aclexplode(c.relacl) a
+  WHERE c.oid = original;
+
+  SELECT statements || array_agg(format(
+    'ALTER TABLE public.%I ADD CONSTRAINT %I %s', table_name, con.conname, pg_get_constraintdef(con.oid)
+  ))
+  INTO statements
+  FROM pg_constraint con
+  WHERE con.conrelid = original AND con.contype = 'f';
+
+  SELECT jsonb_object_agg(v.oid::REGCLASS::TEXT, pg_get_viewdef(v.oid))
+  INTO views
+  FROM pg_depend d
+  JOIN pg_rewrite rw ON rw.oid = d.objid
+  JOIN pg_class v ON v.oid = rw.ev_class
+  WHERE d.classid = 'pg_rewrite'::REGCLASS AND d.refobjid = original AND v.oid <> original AND v.relkind = 'v';
+
+  EXECUTE format('ALTER TABLE public.%I RENAME TO %I', table_name, legacy);
+  EXECUTE format(
+    'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS)
+     PARTITION BY RANGE (%I)',
+    table_name, legacy, key_column
+  );
+  EXECUTE format('ALTER TABLE public.%I ALTER COLUMN %I SET NOT NULL', table_name, key_column);
+  EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I DEFAULT', table_name || '_default', table_name);
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', table_name || '_default');
+  EXECUTE format('REVOKE ALL ON public.%I FROM anon, authenticated', table_name || '_default');
+
+  -- Partitions for the months present, then one pass over the data.
+  FOR month_start IN EXECUTE format('SELECT DISTINCT date_trunc(''month'', %I)::DATE FROM public.%I', key_column, legacy) LOOP
+    PERFORM create_month_partition(table_name, key_column, month_start);
+  END LOOP;
+  EXECUTE format('INSERT INTO public.%I SELECT * FROM public.%I', table_name, legacy);
+
+  IF (SELECT relrowsecurity FROM pg_class WHERE oid = format('public.%I', legacy)::REGCLASS) THEN
+    EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', table_name);
+  END IF;
+  FOREACH statement IN ARRAY COALESCE(statements, '{}') LOOP
+    EXECUTE statement;
+  END LOOP;
+  FOR view_name IN SELECT jsonb_object_keys(COALESCE(views, '{}')) LOOP
+    EXECUTE format('CREATE OR REPLACE VIEW %s AS %s', view_name, views ->> view_name);
+  END LOOP;
+
+  EXECUTE format('DROP TABLE public.%I', legacy);
+END;
+$$;
+
+-- The partition key must be NOT NULL; sessions without a start began when
+-- they were recorded.
+UPDATE public.user_sessions SET session_start = COALESCE(created_at, NOW()) WHERE session_start IS NULL;
+
+SELECT public.convert_to_monthly_partitions('user_sessions', 'session_start');
+SELECT public.convert_to_monthly_partitions('habit_entries', 'entry_date');
+
+-- Keys must include the partition column. habit_entries keeps its
+-- (habit_id, entry_date) upsert key, which also covers lookups by habit.
+ALTER TABLE public.user_sessions DROP CONSTRAINT IF EXISTS user_sessions_pkey;
+ALTER TABLE public.user_sessions ADD CONSTRAINT user_sessions_pkey PRIMARY KEY (id, session_start);
+ALTER TABLE public.habit_entries DROP CONSTRAINT IF EXISTS habit_entries_pkey;
+ALTER TABLE public.habit_entries ADD CONSTRAINT habit_entries_pkey PRIMARY KEY (id, entry_date);
+ALTER TABLE public.habit_entries DROP CONSTRAINT IF EXISTS habit_entries_habit_id_entry_date_key;
+ALTER TABLE public.habit_entries ADD CONSTRAINT habit_entries_habit_id_entry_date_key UNIQUE (habit_id, entry_date);
+
+-- Rows arrive in time order, so BRIN summarises each partition in a few
+-- pages; per-user reads keep a B-tree.
+CREATE INDEX IF NOT EXISTS idx_user_sessions_user_start ON public.user_sessions(user_id, session_start DESC);
+CREATE INDEX IF NOT EXISTS idx_user_sessions_session_start_brin ON public.user_sessions USING BRIN (session_start);
+CREATE INDEX IF NOT EXISTS idx_user_sessions_created_at_brin ON public.user_sessions USING BRIN (created_at);
+CREATE INDEX IF NOT EXISTS idx_habit_entries_entry_date_brin ON public.habit_entries USING BRIN (entry_date);
+
+-- Triggers from 015, 020 and 025, recreated on the partitioned tables.
+DROP TRIGGER IF EXISTS update_habit_entries_updated_at ON public.habit_entries;
+CREATE TRIGGER update_habit_entries_updated_at
+  BEFORE UPDATE ON public.habit_entries
+  FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_insert ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_insert
+  AFTER INSERT ON public.user_sessions
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_update ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_update
+  AFTER UPDATE ON public.user_sessions
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+DROP TRIGGER IF EXISTS rollup_user_sessions_delete ON public.user_sessions;
+CREATE TRIGGER rollup_user_sessions_delete
+  AFTER DELETE ON public.user_sessions
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_user_sessions();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_insert ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_insert
+  AFTER INSERT ON public.habit_entries
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_update ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_update
+  AFTER UPDATE ON public.habit_entries
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+DROP TRIGGER IF EXISTS streaks_habit_entries_delete ON public.habit_entries;
+CREATE TRIGGER streaks_habit_entries_delete
+  AFTER DELETE ON public.habit_entries
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_habit_streaks();
+
+-- Daily aggregates of detached months. Detaching fires no triggers, so the
+-- analytics rollups keep their counts; these tables keep the history that
+-- rebuild_analytics_rollups() and reports need once the rows are gone.
+CREATE TABLE IF NOT EXISTS public.user_sessions_daily_archive (
+  day DATE NOT NULL,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  sessions INTEGER NOT NULL,
+  session_minutes BIGINT NOT NULL,
+  timed_sessions INTEGER NOT NULL,
+  last_session_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  PRIMARY KEY (day, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS public.habit_entries_daily_archive (
+  day DATE NOT NULL,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  habits_logged INTEGER NOT NULL,
+  habits_completed INTEGER NOT NULL,
+  completions BIGINT NOT NULL,
+  PRIMARY KEY (day, user_id)
+);
+
+ALTER TABLE public.user_sessions_daily_archive ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.habit_entries_daily_archive ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view archived sessions" ON public.user_sessions_daily_archive;
+CREATE POLICY "Admins can view archived sessions" ON public.user_sessions_daily_archive
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+DROP POLICY IF EXISTS "Admins can view archived habit entries" ON public.habit_entries_daily_archive;
+CREATE POLICY "Admins can view archived habit entries" ON public.habit_entries_daily_archive
+  FOR SELECT USING ((SELECT public.is_admin()));
+
+-- Rebuilds now add the archived days back in.
+CREATE OR REPLACE FUNCTION public.rebuild_analytics_rollups()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  LOCK TABLE user_sessions, user_progress IN SHARE MODE;
+
+  TRUNCATE analytics_daily_rollup, progress_category_rollup;
+  -- Rebuilt directly, so skip the histogram trigger for these rows.
+  ALTER TABLE user_last_activity DISABLE TRIGGER rollup_user_last_activity;
+  DELETE FROM user_last_activity;
+  INSERT INTO user_last_activity (user_id, last_session_at)
+  SELECT user_id, MAX(last_session_at)
+  FROM (
+    SELECT user_id, MAX(session_start) AS last_session_at FROM user_sessions GROUP BY user_id
+    UNION ALL
+    SELECT user_id, MAX(last_session_at) FROM user_sessions_daily_archive GROUP BY user_id
+  ) latest
+  GROUP BY user_id;
+  ALTER TABLE user_last_activity ENABLE TRIGGER rollup_user_last_activity;
+
+  INSERT INTO analytics_daily_rollup (day, signups, sessions, session_minutes, timed_sessions, last_active_users)
+  SELECT day, SUM(signups), SUM(sessions), SUM(session_minutes), SUM(timed_sessions), SUM(last_active_users)
+  FROM (
+    SELECT analytics_day(created_at) AS day, COUNT(*) AS signups, 0 AS sessions, 0 AS session_minutes,
+           0 AS timed_sessions, 0 AS last_active_users
+    FROM auth.users GROUP BY 1
+    UNION ALL
+    SELECT analytics_day(session_start), 0, COUNT(*), COALESCE(SUM(duration_minutes), 0), COUNT(duration_minutes), 0
+    FROM user_sessions GROUP BY 1
+    UNION ALL
+    SELECT day, 0, SUM(sessions), SUM(session_minutes), SUM(timed_sessions), 0
+    FROM user_sessions_daily_archive GROUP BY 1
+    UNION ALL
+    SELECT analytics_day(last_session_at), 0, 0, 0, 0, COUNT(*)
+    FROM user_last_activity GROUP BY 1
+  ) totals
+  GROUP BY day;
+
+  INSERT INTO progress_category_rollup (category, total_steps, completed_steps, in_progress_steps)
+  SELECT COALESCE(step_category, 'uncategorized'), COUNT(*),
+         COUNT(*) FILTER (WHERE status = 'completed'),
+         COUNT(*) FILTER (WHERE status IN ('in_progress', 'in-progress'))
+  FROM user_progress GROUP BY 1;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.create_month_partition(TEXT, TEXT, DATE) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.ensure_monthly_partitions(TEXT, TEXT, INTEGER) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.maintain_time_partitions() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.convert_to_monthly_partitions(TEXT, TEXT) FROM PUBLIC;
+
+SELECT public.maintain_time_partitions();
+
+-- Keep partitions ahead of the calendar where pg_cron is available.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('maintain-time-partitions', '15 3 * * *', 'SELECT public.maintain_time_partitions()');
+  END IF;
+END;
+$$;
@@ -0,0 +1,253 @@
+-- Achievement engine
+-- achievements (015, seeded by 017_seed_achievements.sql) describe badges by
+-- criteria_type and threshold, but nothing awarded them. Each user now has
+-- one counters row, refreshed by statement-level triggers for the users a
+-- write touched (goals, reflections, module progress, streaks); crossed
+-- thresholds are then awarded with one INSERT ... ON CONFLICT DO NOTHING
+-- for the whole statement. Counts come from the per-user indexes of 022, so
+-- a write never scans a table, and badges, once earned, are kept.
+--
+-- Streak badges in the 'reflection' category need a run of daily
+-- reflections; other streak badges accept the longest run of either
+-- reflections or any one habit (user_streaks, 025).
+--
+-- backfill_achievements() evaluates every user in bulk; run it after
+-- changing thresholds or adding badges (scripts/achievements.py backfill).
+
+CREATE TABLE IF NOT EXISTS public.user_achievement_counters (
+  user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  goals_completed INTEGER NOT NULL DEFAULT 0,
+  reflections INTEGER NOT NULL DEFAULT 0,
+  modules_completed INTEGER NOT NULL DEFAULT 0,
+  reflection_streak INTEGER NOT NULL DEFAULT 0,
+  best_streak INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE public.user_achievement_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own achievement counters" ON public.user_achievement_counters;
+CREATE POLICY "Users can view their own achievement counters" ON public.user_achievement_counters
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Badges are only awarded here now, not claimed by the client.
+DROP POLICY IF EXISTS "Users can insert their own achievements" ON public.user_achievements;
+
+-- Award every active achievement whose threshold the given users' counters
+-- have reached (every user when user_ids is NULL). Returns the number of
+-- badges newly awarded.
+CREATE OR REPLACE FUNCTION public.award_achievements(user_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  awarded INTEGER;
+BEGIN
+  INSERT INTO user_achievements (user_id, achievement_id)
+  SELECT c.user_id, a.id
+  FROM user_achievement_counters c
+  JOIN achievements a ON a.is_active AND a.criteria_value IS NOT NULL
+  WHERE (user_ids IS NULL OR c.user_id = ANY(user_ids))
+    AND a.criteria_value <= CASE a.criteria_type
+      WHEN 'goal_completion' THEN c.goals_completed
+      WHEN 'reflection_count' THEN c.reflections
+      WHEN 'module_completion' THEN c.modules_completed
+      WHEN 'streak' THEN CASE WHEN a.category = 'reflection' THEN c.reflection_streak ELSE c.best_streak END
+    END
+  ON CONFLICT (user_id, achievement_id) DO NOTHING;
+
+  GET DIAGNOSTICS awarded = ROW_COUNT;
+  RETURN awarded;
+END;
+$$;
+
+-- Recount the given users and award what they crossed. Only counters that
+-- changed are written, and only their users are evaluated.
+CREATE OR REPLACE FUNCTION public.refresh_achievements(user_ids UUID[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  changed UUID[];
+BEGIN
+  WITH counted AS (
+    INSERT INTO user_achievement_counters AS c (
+      user_id, goals_completed, reflections, modules_completed, reflection_streak, best_streak, updated_at
+    )
+    SELECT u.user_id,
+           (SELECT COUNT(*) FROM goals g WHERE g.user_id = u.user_id AND g.status = 'completed'),
+           (SELECT COUNT(*) FROM daily_reflections r WHERE r.user_id = u.user_id),
+           (SELECT COUNT(*) FROM user_module_progress m WHERE m.user_id = u.user_id AND m.status = 'completed'),
+           (SELECT COALESCE(MAX(s.longest_length), 0) FROM user_streaks s
+            WHERE s.user_id = u.user_id AND s.kind = 'reflection'),
+           (SELECT COALESCE(MAX(s.longest_length), 0) FROM user_streaks s WHERE s.user_id = u.user_id),
+           NOW()
+    FROM (SELECT DISTINCT unnest(user_ids) AS user_id) u
+    -- Cascading deletes of a removed user still fire these triggers.
+    WHERE EXISTS (SELECT 1 FROM auth.users au WHERE au.id = u.user_id)
+    ON CONFLICT (user_id) DO UPDATE SET
+      goals_completed = EXCLUDED.goals_completed,
+      reflections = EXCLUDED.reflections,
+      modules_completed = EXCLUDED.modules_completed,
+      reflection_streak = EXCLUDED.reflection_streak,
+      best_streak = EXCLUDED.best_streak,
+      updated_at = NOW()
+    WHERE (c.goals_completed, c.reflections, c.modules_completed, c.reflection_streak, c.best_streak)
+      IS DISTINCT FROM (EXCLUDED.goals_completed, EXCLUDED.reflections, EXCLUDED.modules_completed,
+                        EXCLUDED.reflection_streak, EXCLUDED.best_streak)
+    RETURNING c.user_id
+  )
+  SELECT array_agg(user_id) INTO changed FROM counted;
+
+  IF cardinality(changed) > 0 THEN
+    RETURN award_achievements(changed);
+  END IF;
+  RETURN 0;
+END;
+$$;
+
+-- Shared by the triggers below: refresh the users a statement touched.
+CREATE OR REPLACE FUNCTION public.refresh_achievement_rows()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM new_rows;
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM (
+      SELECT user_id FROM old_rows
+      UNION
+      SELECT user_id FROM new_rows
+    ) touched;
+  ELSE
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM old_rows;
+  END IF;
+
+  IF cardinality(stale) > 0 THEN
+    PERFORM refresh_achievements(stale);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS achievements_goals_insert ON public.goals;
+CREATE TRIGGER achievements_goals_insert
+  AFTER INSERT ON public.goals
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_goals_update ON public.goals;
+CREATE TRIGGER achievements_goals_update
+  AFTER UPDATE ON public.goals
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_goals_delete ON public.goals;
+CREATE TRIGGER achievements_goals_delete
+  AFTER DELETE ON public.goals
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+-- Editing a reflection changes no count, so updates are left out.
+DROP TRIGGER IF EXISTS achievements_daily_reflections_insert ON public.daily_reflections;
+CREATE TRIGGER achievements_daily_reflections_insert
+  AFTER INSERT ON public.daily_reflections
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_daily_reflections_delete ON public.daily_reflections;
+CREATE TRIGGER achievements_daily_reflections_delete
+  AFTER DELETE ON public.daily_reflections
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_user_module_progress_insert ON public.user_module_progress;
+CREATE TRIGGER achievements_user_module_progress_insert
+  AFTER INSERT ON public.user_module_progress
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_user_module_progress_update ON public.user_module_progress;
+CREATE TRIGGER achievements_user_module_progress_update
+  AFTER UPDATE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_user_module_progress_delete ON public.user_module_progress;
+CREATE TRIGGER achievements_user_module_progress_delete
+  AFTER DELETE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+-- Streak runs change whenever reflection or habit days do (025).
+DROP TRIGGER IF EXISTS achievements_user_streaks_insert ON public.user_streaks;
+CREATE TRIGGER achievements_user_streaks_insert
+  AFTER INSERT ON public.user_streaks
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_user_streaks_update ON public.user_streaks;
+CREATE TRIGGER achievements_user_streaks_update
+  AFTER UPDATE ON public.user_streaks
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+DROP TRIGGER IF EXISTS achievements_user_streaks_delete ON public.user_streaks;
+CREATE TRIGGER achievements_user_streaks_delete
+  AFTER DELETE ON public.user_streaks
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_achievement_rows();
+
+-- Recount every user with one grouped pass per source table and award in
+-- bulk. Returns the number of badges newly awarded.
+CREATE OR REPLACE FUNCTION public.backfill_achievements()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  DELETE FROM user_achievement_counters;
+
+  INSERT INTO user_achievement_counters (
+    user_id, goals_completed, reflections, modules_completed, reflection_streak, best_streak
+  )
+  SELECT u.id, COALESCE(g.completed, 0), COALESCE(r.total, 0), COALESCE(m.completed, 0),
+         COALESCE(s.reflection_streak, 0), COALESCE(s.best_streak, 0)
+  FROM auth.users u
+  LEFT JOIN (
+    SELECT user_id, COUNT(*) AS completed FROM goals WHERE status = 'completed' GROUP BY user_id
+  ) g ON g.user_id = u.id
+  LEFT JOIN (
+    SELECT user_id, COUNT(*) AS total FROM daily_reflections GROUP BY user_id
+  ) r ON r.user_id = u.id
+  LEFT JOIN (
+    SELECT user_id, COUNT(*) AS completed FROM user_module_progress WHERE status = 'completed' GROUP BY user_id
+  ) m ON m.user_id = u.id
+  LEFT JOIN (
+    SELECT user_id,
+           MAX(longest_length) FILTER (WHERE kind = 'reflection') AS reflection_streak,
+           MAX(longest_length) AS best_streak
+    FROM user_streaks GROUP BY user_id
+  ) s ON s.user_id = u.id
+  WHERE g.user_id IS NOT NULL OR r.user_id IS NOT NULL OR m.user_id IS NOT NULL OR s.user_id IS NOT NULL;
+
+  RETURN award_achievements(NULL);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.award_achievements(UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.refresh_achievements(UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.backfill_achievements() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.backfill_achievements() TO service_role;
+
+SELECT public.backfill_achievements();
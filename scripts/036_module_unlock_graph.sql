@@ -0,0 +1,342 @@
+-- Compiled module prerequisite graph and per-user unlocked modules
+-- module_configurations.prerequisites (017) lists the module ids that must be
+-- completed before a module opens. Resolving that per user per request means
+-- walking the graph on every catalog read, so it is compiled instead:
+--
+-- * module_unlock_graph keeps each active module's direct prerequisites
+--   (active modules only; unknown ids are dropped) and its depth. It is
+--   recompiled by statement triggers when prerequisites change or a module
+--   is added, removed, activated or deactivated, and a save that would
+--   create a cycle is rejected.
+-- * user_unlocked_modules keeps, per user, the modules with prerequisites
+--   that the user has unlocked. It is refreshed only when a module flips to
+--   or from completed, or when the compiled graph actually changes.
+--
+-- get_module_lock_state() then answers the modules page with one join.
+-- Only prerequisites are compiled: unlock_criteria and
+-- completion_requirements have no defined format yet.
+
+CREATE TABLE IF NOT EXISTS public.module_unlock_graph (
+  module_id UUID PRIMARY KEY REFERENCES public.transformation_modules(id) ON DELETE CASCADE,
+  prerequisites UUID[] NOT NULL DEFAULT '{}',
+  -- Longest prerequisite chain below the module; 0 without prerequisites.
+  depth INTEGER NOT NULL DEFAULT 0,
+  compiled_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.user_unlocked_modules (
+  user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  module_ids UUID[] NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE public.module_unlock_graph ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.user_unlocked_modules ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anyone can view the module unlock graph" ON public.module_unlock_graph;
+CREATE POLICY "Anyone can view the module unlock graph" ON public.module_unlock_graph
+  FOR SELECT USING (true);
+
+DROP POLICY IF EXISTS "Users can view their own unlocked modules" ON public.user_unlocked_modules;
+CREATE POLICY "Users can view their own unlocked modules" ON public.user_unlocked_modules
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Prerequisite edges between active modules. Ids are matched as text, so a
+-- malformed entry is ignored instead of failing the cast.
+CREATE OR REPLACE FUNCTION public.module_prerequisite_edges()
+RETURNS TABLE (module_id UUID, prerequisite_id UUID)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT DISTINCT c.module_id, pm.id
+  FROM module_configurations c
+  JOIN transformation_modules m ON m.id = c.module_id AND m.is_active
+  CROSS JOIN LATERAL unnest(c.prerequisites) AS p(id)
+  JOIN transformation_modules pm ON pm.id::TEXT = lower(trim(p.id)) AND pm.is_active;
+$$;
+
+-- Recompute the unlocked modules of the given users from their completed
+-- modules. Users who unlocked nothing lose their row. Upserting instead of
+-- deleting and re-inserting lets two transactions refresh the same user at
+-- once (two completions, or one during a rebuild) without a key violation.
+CREATE OR REPLACE FUNCTION public.refresh_unlocked_modules(user_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  WITH computed AS (
+    SELECT done.user_id, unlocked.ids
+    FROM (
+      SELECT p.user_id, array_agg(p.module_id) AS completed
+      FROM user_module_progress p
+      WHERE p.user_id = ANY(user_ids) AND p.status = 'completed'
+      GROUP BY p.user_id
+    ) done
+    CROSS JOIN LATERAL (
+      SELECT array_agg(g.module_id ORDER BY g.module_id) AS ids
+      FROM module_unlock_graph g
+      WHERE cardinality(g.prerequisites) > 0 AND g.prerequisites <@ done.completed
+    ) unlocked
+    WHERE unlocked.ids IS NOT NULL
+  ),
+  upserted AS (
+    INSERT INTO user_unlocked_modules AS u (user_id, module_ids)
+    SELECT c.user_id, c.ids FROM computed c
+    ON CONFLICT (user_id) DO UPDATE SET
+      module_ids = EXCLUDED.module_ids,
+      updated_at = NOW()
+    WHERE u.module_ids IS DISTINCT FROM EXCLUDED.module_ids
+  )
+  DELETE FROM user_unlocked_modules u
+  WHERE u.user_id = ANY(user_ids)
+    AND NOT EXISTS (SELECT 1 FROM computed c WHERE c.user_id = u.user_id);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.rebuild_unlocked_modules()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  PERFORM refresh_unlocked_modules(ARRAY(
+    SELECT user_id FROM user_module_progress WHERE status = 'completed'
+    UNION
+    SELECT user_id FROM user_unlocked_modules
+  ));
+END;
+$$;
+
+-- Rebuild module_unlock_graph from module_configurations, rejecting cycles,
+-- and refresh every user's unlocked modules when any prerequisite list
+-- changed. Returns whether it did.
+CREATE OR REPLACE FUNCTION public.compile_module_unlock_graph()
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  cycle_path UUID[];
+  previous_graph JSONB;
+  compiled_graph JSONB;
+BEGIN
+  WITH RECURSIVE edges AS (
+    SELECT * FROM module_prerequisite_edges()
+  ),
+  walk(current_id, path, is_cycle) AS (
+    SELECT e.prerequisite_id, ARRAY[e.module_id, e.prerequisite_id], e.module_id = e.prerequisite_id
+    FROM edges e
+    UNION ALL
+    SELECT e.prerequisite_id, w.path || e.prerequisite_id, e.prerequisite_id = ANY(w.path)
+    FROM walk w
+    JOIN edges e ON e.module_id = w.current_id
+    WHERE NOT w.is_cycle
+  )
+  SELECT path INTO cycle_path FROM walk WHERE is_cycle LIMIT 1;
+
+  IF cycle_path IS NOT NULL THEN
+    RAISE EXCEPTION 'Module prerequisites form a cycle: %', (
+      SELECT string_agg(COALESCE(m.title, c.id::TEXT), ' -> ' ORDER BY c.ord)
+      FROM unnest(cycle_path) WITH ORDINALITY AS c(id, ord)
+      LEFT JOIN transformation_modules m ON m.id = c.id
+    ) USING ERRCODE = 'check_violation';
+  END IF;
+
+  SELECT jsonb_object_agg(module_id, prerequisites) INTO previous_graph FROM module_unlock_graph;
+
+  DELETE FROM module_unlock_graph;
+  WITH RECURSIVE edges AS (
+    SELECT * FROM module_prerequisite_edges()
+  ),
+  levels(module_id, depth) AS (
+    SELECT id, 0 FROM transformation_modules WHERE is_active
+    UNION
+    SELECT e.module_id, l.depth + 1
+    FROM levels l
+    JOIN edges e ON e.prerequisite_id = l.module_id
+  )
+  INSERT INTO module_unlock_graph (module_id, prerequisites, depth)
+  SELECT m.id,
+         ARRAY(SELECT e.prerequisite_id FROM edges e WHERE e.module_id = m.id ORDER BY 1),
+         (SELECT MAX(l.depth) FROM levels l WHERE l.module_id = m.id)
+  FROM transformation_modules m
+  WHERE m.is_active;
+
+  SELECT jsonb_object_agg(module_id, prerequisites) INTO compiled_graph FROM module_unlock_graph;
+
+  IF previous_graph IS DISTINCT FROM compiled_graph THEN
+    PERFORM rebuild_unlocked_modules();
+    RETURN TRUE;
+  END IF;
+  RETURN FALSE;
+END;
+$$;
+
+-- Statement triggers fire for every write, including title-only edits and
+-- the ON CONFLICT upserts of save_module_bundle() (which fire both the INSERT
+-- and the UPDATE trigger), so the transition tables are checked first and the
+-- graph is only recompiled when a module's is_active or a configuration's
+-- prerequisites actually changed. UPDATE OF is_active would not help: it
+-- fires whenever the column is named in SET, changed or not.
+CREATE OR REPLACE FUNCTION public.recompile_module_unlock_graph()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  changed BOOLEAN;
+BEGIN
+  IF TG_TABLE_NAME = 'transformation_modules' THEN
+    IF TG_OP = 'INSERT' THEN
+      changed := EXISTS (SELECT 1 FROM new_rows WHERE is_active);
+    ELSIF TG_OP = 'UPDATE' THEN
+      changed := EXISTS (
+        SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE n.is_active IS DISTINCT FROM o.is_active
+      );
+    ELSE
+      changed := EXISTS (SELECT 1 FROM old_rows WHERE is_active);
+    END IF;
+  ELSE
+    IF TG_OP = 'INSERT' THEN
+      changed := EXISTS (SELECT 1 FROM new_rows WHERE cardinality(prerequisites) > 0);
+    ELSIF TG_OP = 'UPDATE' THEN
+      changed := EXISTS (
+        SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE n.prerequisites IS DISTINCT FROM o.prerequisites OR n.module_id <> o.module_id
+      );
+    ELSE
+      changed := EXISTS (SELECT 1 FROM old_rows WHERE cardinality(prerequisites) > 0);
+    END IF;
+  END IF;
+
+  IF changed THEN
+    PERFORM compile_module_unlock_graph();
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS unlock_graph_module_configurations ON public.module_configurations;
+DROP TRIGGER IF EXISTS unlock_graph_module_configurations_insert ON public.module_configurations;
+CREATE TRIGGER unlock_graph_module_configurations_insert
+  AFTER INSERT ON public.module_configurations
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+DROP TRIGGER IF EXISTS unlock_graph_module_configurations_update ON public.module_configurations;
+CREATE TRIGGER unlock_graph_module_configurations_update
+  AFTER UPDATE ON public.module_configurations
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+DROP TRIGGER IF EXISTS unlock_graph_module_configurations_delete ON public.module_configurations;
+CREATE TRIGGER unlock_graph_module_configurations_delete
+  AFTER DELETE ON public.module_configurations
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+-- Activating, deactivating or removing a module changes the graph too.
+DROP TRIGGER IF EXISTS unlock_graph_transformation_modules ON public.transformation_modules;
+DROP TRIGGER IF EXISTS unlock_graph_transformation_modules_insert ON public.transformation_modules;
+CREATE TRIGGER unlock_graph_transformation_modules_insert
+  AFTER INSERT ON public.transformation_modules
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+DROP TRIGGER IF EXISTS unlock_graph_transformation_modules_update ON public.transformation_modules;
+CREATE TRIGGER unlock_graph_transformation_modules_update
+  AFTER UPDATE ON public.transformation_modules
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+DROP TRIGGER IF EXISTS unlock_graph_transformation_modules_delete ON public.transformation_modules;
+CREATE TRIGGER unlock_graph_transformation_modules_delete
+  AFTER DELETE ON public.transformation_modules
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.recompile_module_unlock_graph();
+
+-- Only modules flipping to or from completed change what a user unlocked;
+-- heartbeats and progress updates are skipped.
+CREATE OR REPLACE FUNCTION public.refresh_unlocked_module_rows()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  stale UUID[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM new_rows WHERE status = 'completed';
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM (
+      SELECT user_id, module_id FROM old_rows WHERE status = 'completed'
+      EXCEPT
+      SELECT user_id, module_id FROM new_rows WHERE status = 'completed'
+      UNION
+      (SELECT user_id, module_id FROM new_rows WHERE status = 'completed'
+       EXCEPT
+       SELECT user_id, module_id FROM old_rows WHERE status = 'completed')
+    ) flipped;
+  ELSE
+    SELECT array_agg(DISTINCT user_id) INTO stale FROM old_rows WHERE status = 'completed';
+  END IF;
+
+  IF cardinality(stale) > 0 THEN
+    PERFORM refresh_unlocked_modules(stale);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS unlocked_modules_progress_insert ON public.user_module_progress;
+CREATE TRIGGER unlocked_modules_progress_insert
+  AFTER INSERT ON public.user_module_progress
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_unlocked_module_rows();
+
+DROP TRIGGER IF EXISTS unlocked_modules_progress_update ON public.user_module_progress;
+CREATE TRIGGER unlocked_modules_progress_update
+  AFTER UPDATE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_unlocked_module_rows();
+
+DROP TRIGGER IF EXISTS unlocked_modules_progress_delete ON public.user_module_progress;
+CREATE TRIGGER unlocked_modules_progress_delete
+  AFTER DELETE ON public.user_module_progress
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_unlocked_module_rows();
+
+-- Lock state of every module that has prerequisites, for the current user.
+-- Modules not listed are open to everyone.
+CREATE OR REPLACE FUNCTION public.get_module_lock_state()
+RETURNS TABLE (module_id UUID, prerequisites UUID[], is_locked BOOLEAN)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT g.module_id, g.prerequisites, NOT (g.module_id = ANY(COALESCE(u.module_ids, '{}')))
+  FROM module_unlock_graph g
+  LEFT JOIN user_unlocked_modules u ON u.user_id = auth.uid()
+  WHERE cardinality(g.prerequisites) > 0
+  ORDER BY g.depth, g.module_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.module_prerequisite_edges() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.refresh_unlocked_modules(UUID[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.rebuild_unlocked_modules() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.compile_module_unlock_graph() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.get_module_lock_state() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_module_lock_state() TO authenticated;
+GRANT EXECUTE ON FUNCTION public.compile_module_unlock_graph() TO service_role;
+
+SELECT public.compile_module_unlock_graph();
@@ -0,0 +1,162 @@
+-- Full-text search over module content and reflections
+-- Nothing searched module_sections.content, module titles and descriptions or
+-- a learner's reflections; the pages that filter at all do it client-side
+-- over everything they loaded. Each table now keeps a stored, generated
+-- tsvector and search_content() ranks matches and highlights the best ones.
+--
+-- * Content is not tagged with a language, so every vector holds the stems
+--   of both app languages (lib/i18n.ts: pt and es), built with accent-folding
+--   copies of the Portuguese and Spanish configurations. A query is parsed
+--   with both and matches either.
+-- * Titles weigh A, module descriptions B, section bodies and reflections C.
+-- * daily_reflections has no single content column; its four free-text
+--   columns are indexed together, joined with || (generated columns need
+--   immutable expressions, which concat_ws is not).
+--
+-- Adding the generated columns rewrites the three tables once.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'search_pt' AND cfgnamespace = 'public'::regnamespace) THEN
+    CREATE TEXT SEARCH CONFIGURATION public.search_pt (COPY = pg_catalog.portuguese);
+    ALTER TEXT SEARCH CONFIGURATION public.search_pt
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'search_es' AND cfgnamespace = 'public'::regnamespace) THEN
+    CREATE TEXT SEARCH CONFIGURATION public.search_es (COPY = pg_catalog.spanish);
+    ALTER TEXT SEARCH CONFIGURATION public.search_es
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+  END IF;
+END
+$$;
+
+ALTER TABLE public.transformation_modules
+  ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('public.search_pt', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('public.search_es', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('public.search_pt', COALESCE(description, '')), 'B') ||
+    setweight(to_tsvector('public.search_es', COALESCE(description, '')), 'B')
+  ) STORED;
+
+ALTER TABLE public.module_sections
+  ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('public.search_pt', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('public.search_es', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('public.search_pt', COALESCE(content, '')), 'C') ||
+    setweight(to_tsvector('public.search_es', COALESCE(content, '')), 'C')
+  ) STORED;
+
+ALTER TABLE public.daily_reflections
+  ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('public.search_pt',
+      COALESCE(gratitude_notes, '') || ' ' || COALESCE(challenges_faced, '') || ' ' ||
+      COALESCE(achievements, '') || ' ' || COALESCE(tomorrow_intentions, '')), 'C') ||
+    setweight(to_tsvector('public.search_es',
+      COALESCE(gratitude_notes, '') || ' ' || COALESCE(challenges_faced, '') || ' ' ||
+      COALESCE(achievements, '') || ' ' || COALESCE(tomorrow_intentions, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_transformation_modules_search ON public.transformation_modules USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_module_sections_search ON public.module_sections USING GIN (search_vector);
+-- Reflections are only ever searched by their owner, whose rows the
+-- (user_id, reflection_date) unique index already finds; a GIN index over
+-- every user's reflections would mostly return other people's matches.
+
+-- Ranked matches across modules, sections and the caller's own reflections,
+-- best first. headline is an excerpt of the matching text with the hits
+-- wrapped in <mark></mark>; everything else in it is the stored text
+-- unescaped, so render it as text and only turn the markers into tags.
+-- search_kinds limits the result to some of 'module', 'section' and
+-- 'reflection' (NULL: all three). search_language picks the highlighting
+-- rules (defaults to the caller's profile language). Admins also see
+-- inactive modules and sections.
+CREATE OR REPLACE FUNCTION public.search_content(
+  search_query TEXT,
+  search_language TEXT DEFAULT NULL,
+  max_results INTEGER DEFAULT 20,
+  search_kinds TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+  kind TEXT,
+  id UUID,
+  module_id UUID,
+  title TEXT,
+  headline TEXT,
+  rank REAL,
+  reflection_date DATE
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  search_terms TSQUERY := websearch_to_tsquery('public.search_pt', COALESCE(search_query, ''))
+    || websearch_to_tsquery('public.search_es', COALESCE(search_query, ''));
+  result_limit INTEGER := LEAST(GREATEST(COALESCE(max_results, 20), 1), 100);
+  include_inactive BOOLEAN := public.is_admin();
+  headline_config REGCONFIG;
+BEGIN
+  -- Empty, or nothing but stop words.
+  IF numnode(search_terms) = 0 THEN
+    RETURN;
+  END IF;
+
+  headline_config := CASE COALESCE(
+    search_language,
+    (SELECT p.language FROM user_profiles p WHERE p.user_id = auth.uid() LIMIT 1)
+  )
+    WHEN 'es' THEN 'public.search_es'::REGCONFIG
+    ELSE 'public.search_pt'::REGCONFIG
+  END;
+
+  -- ts_headline re-parses the whole text, so only the rows that make the
+  -- final cut are highlighted.
+  RETURN QUERY
+  WITH hits AS (
+    (SELECT 'module'::TEXT AS kind, m.id, m.id AS module_id, m.title, COALESCE(m.description, '') AS body,
+            NULL::DATE AS reflection_date, ts_rank_cd(m.search_vector, search_terms) AS score
+     FROM transformation_modules m
+     WHERE (search_kinds IS NULL OR 'module' = ANY(search_kinds))
+       AND m.search_vector @@ search_terms
+       AND (include_inactive OR m.is_active)
+     ORDER BY score DESC
+     LIMIT result_limit)
+    UNION ALL
+    (SELECT 'section'::TEXT, s.id, s.module_id, s.title, s.content,
+            NULL::DATE, ts_rank_cd(s.search_vector, search_terms) AS score
+     FROM module_sections s
+     JOIN transformation_modules m ON m.id = s.module_id
+     WHERE (search_kinds IS NULL OR 'section' = ANY(search_kinds))
+       AND s.search_vector @@ search_terms
+       AND (include_inactive OR (s.is_active AND m.is_active))
+     ORDER BY score DESC
+     LIMIT result_limit)
+    UNION ALL
+    (SELECT 'reflection'::TEXT, r.id, NULL::UUID, to_char(r.reflection_date, 'YYYY-MM-DD'),
+            concat_ws(E'\n', r.gratitude_notes, r.challenges_faced, r.achievements, r.tomorrow_intentions),
+            r.reflection_date, ts_rank_cd(r.search_vector, search_terms) AS score
+     FROM daily_reflections r
+     WHERE (search_kinds IS NULL OR 'reflection' = ANY(search_kinds))
+       AND r.user_id = auth.uid()
+       AND r.search_vector @@ search_terms
+     ORDER BY score DESC
+     LIMIT result_limit)
+  ),
+  best AS (
+    SELECT h.* FROM hits h ORDER BY h.score DESC, h.id LIMIT result_limit
+  )
+  SELECT b.kind, b.id, b.module_id, b.title,
+         ts_headline(headline_config, b.body, search_terms,
+                     'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=24, MinWords=8'),
+         b.score, b.reflection_date
+  FROM best b
+  ORDER BY b.score DESC, b.id;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.search_content(TEXT, TEXT, INTEGER, TEXT[]) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.search_content(TEXT, TEXT, INTEGER, TEXT[]) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.search_content(TEXT, TEXT, INTEGER, TEXT[]) TO service_role;
@@ -0,0 +1,196 @@
+-- Transactional module saves for the content editor
+-- The editor wrote every section create, update and delete as its own
+-- module_sections call, so a large edit took dozens of round trips, a failure
+-- halfway left the module half saved, and two admins editing the same module
+-- silently overwrote each other. save_module_bundle() applies a module, its
+-- full ordered list of sections and its configuration in one transaction:
+--
+-- * sections missing from the list are deleted, the rest are upserted in one
+--   statement that also rewrites order_index from their position; rows that
+--   did not change are left alone and keep their updated_at;
+-- * a configuration that would make the prerequisites cycle (036) fails the
+--   whole save, sections included;
+-- * the module's content version (027) is the concurrency token: a save
+--   that names the version it was loaded at is rejected with SQLSTATE PT409
+--   (HTTP 409 through PostgREST) when someone saved the module since.
+--
+-- get_module_bundle() loads the same shape, version included, in one call.
+
+CREATE OR REPLACE FUNCTION public.get_module_bundle(target_module_id UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NOT (public.is_admin() OR auth.role() = 'service_role') THEN
+    RAISE EXCEPTION 'Only admins can edit modules' USING ERRCODE = 'insufficient_privilege';
+  END IF;
+
+  RETURN (
+    SELECT jsonb_build_object(
+      'module', to_jsonb(m) - 'search_vector',
+      'sections', COALESCE((
+        SELECT jsonb_agg(to_jsonb(s) - 'search_vector' ORDER BY s.order_index, s.created_at)
+        FROM module_sections s
+        WHERE s.module_id = m.id
+      ), '[]'::JSONB),
+      'config', (SELECT to_jsonb(c) FROM module_configurations c WHERE c.module_id = m.id),
+      'version', COALESCE((SELECT v.version FROM module_content_versions v WHERE v.module_id = m.id), 0)
+    )
+    FROM transformation_modules m
+    WHERE m.id = target_module_id
+  );
+END;
+$$;
+
+-- module: transformation_modules fields; without an id a new module is
+-- created, with one the module must exist and only the given fields change.
+-- sections: every section of the module, in display order, each with all of
+-- its fields; an element without an id (or with one the module does not have
+-- yet) is inserted. NULL leaves the sections as they are.
+-- config: module_configurations fields; NULL leaves the configuration alone.
+-- expected_version: the version get_module_bundle() returned; NULL skips the
+-- check. Returns the module id and its new version.
+CREATE OR REPLACE FUNCTION public.save_module_bundle(
+  module JSONB,
+  sections JSONB DEFAULT NULL,
+  config JSONB DEFAULT NULL,
+  expected_version BIGINT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  target_id UUID := NULLIF(module->>'id', '')::UUID;
+  current_module transformation_modules%ROWTYPE;
+  merged transformation_modules%ROWTYPE;
+  current_version BIGINT;
+  kept_ids UUID[];
+BEGIN
+  IF NOT (public.is_admin() OR auth.role() = 'service_role') THEN
+    RAISE EXCEPTION 'Only admins can edit modules' USING ERRCODE = 'insufficient_privilege';
+  END IF;
+  IF sections IS NOT NULL AND jsonb_typeof(sections) <> 'array' THEN
+    RAISE EXCEPTION 'sections must be a JSON array' USING ERRCODE = 'invalid_parameter_value';
+  END IF;
+
+  IF target_id IS NULL THEN
+    merged := jsonb_populate_record(NULL::transformation_modules, module);
+    INSERT INTO transformation_modules (
+      title, description, category, estimated_duration_minutes, difficulty_level,
+      content_type, content_url, is_active, order_index
+    )
+    VALUES (
+      merged.title, merged.description, COALESCE(merged.category, 'personal'),
+      merged.estimated_duration_minutes, merged.difficulty_level, merged.content_type,
+      merged.content_url, COALESCE(merged.is_active, TRUE),
+      COALESCE(merged.order_index, (SELECT COALESCE(MAX(m.order_index), 0) + 1 FROM transformation_modules m))
+    )
+    RETURNING id INTO target_id;
+  ELSE
+    -- The row lock serializes saves of the same module, so the version read
+    -- next cannot change until this transaction ends.
+    SELECT * INTO current_module FROM transformation_modules m WHERE m.id = target_id FOR UPDATE;
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'Module % does not exist', target_id USING ERRCODE = 'no_data_found';
+    END IF;
+
+    SELECT v.version INTO current_version FROM module_content_versions v WHERE v.module_id = target_id;
+    IF expected_version IS NOT NULL AND COALESCE(current_version, 0) <> expected_version THEN
+      RAISE EXCEPTION 'Module "%" was changed by someone else', current_module.title
+        USING ERRCODE = 'PT409',
+              DETAIL = format('Current version is %s, the save was based on %s.', COALESCE(current_version, 0), expected_version),
+              HINT = 'Reload the module and apply the changes again.';
+    END IF;
+
+    merged := jsonb_populate_record(current_module, module);
+    UPDATE transformation_modules m SET
+      title = merged.title,
+      description = merged.description,
+      category = merged.category,
+      estimated_duration_minutes = merged.estimated_duration_minutes,
+      difficulty_level = merged.difficulty_level,
+      content_type = merged.content_type,
+      content_url = merged.content_url,
+      is_active = merged.is_active,
+      order_index = merged.order_index
+    WHERE m.id = target_id
+      AND (m.title, m.description, m.category, m.estimated_duration_minutes, m.difficulty_level,
+           m.content_type, m.content_url, m.is_active, m.order_index)
+        IS DISTINCT FROM
+          (merged.title, merged.description, merged.category, merged.estimated_duration_minutes,
+           merged.difficulty_level, merged.content_type, merged.content_url, merged.is_active, merged.order_index);
+  END IF;
+
+  IF sections IS NOT NULL THEN
+    kept_ids := ARRAY(
+      SELECT (e.section->>'id')::UUID
+      FROM jsonb_array_elements(sections) AS e(section)
+      WHERE NULLIF(e.section->>'id', '') IS NOT NULL
+    );
+
+    -- The upsert below would otherwise move another module's section here.
+    IF EXISTS (SELECT 1 FROM module_sections s WHERE s.id = ANY(kept_ids) AND s.module_id <> target_id) THEN
+      RAISE EXCEPTION 'Sections of another module cannot be saved with module %', target_id
+        USING ERRCODE = 'invalid_parameter_value';
+    END IF;
+
+    DELETE FROM module_sections s
+    WHERE s.module_id = target_id
+      AND s.id <> ALL(kept_ids);
+
+    INSERT INTO module_sections AS s (
+      id, module_id, title, content, section_type, order_index, estimated_duration_minutes, is_active
+    )
+    SELECT COALESCE(r.id, gen_random_uuid()), target_id, r.title, COALESCE(r.content, ''),
+           COALESCE(r.section_type, 'text'), e.ord, COALESCE(r.estimated_duration_minutes, 5),
+           COALESCE(r.is_active, TRUE)
+    FROM jsonb_array_elements(sections) WITH ORDINALITY AS e(section, ord)
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::module_sections, e.section) r
+    ON CONFLICT (id) DO UPDATE SET
+      title = EXCLUDED.title,
+      content = EXCLUDED.content,
+      section_type = EXCLUDED.section_type,
+      order_index = EXCLUDED.order_index,
+      estimated_duration_minutes = EXCLUDED.estimated_duration_minutes,
+      is_active = EXCLUDED.is_active
+    WHERE (s.title, s.content, s.section_type, s.order_index, s.estimated_duration_minutes, s.is_active)
+      IS DISTINCT FROM
+        (EXCLUDED.title, EXCLUDED.content, EXCLUDED.section_type, EXCLUDED.order_index,
+         EXCLUDED.estimated_duration_minutes, EXCLUDED.is_active);
+  END IF;
+
+  IF config IS NOT NULL THEN
+    INSERT INTO module_configurations AS c (
+      module_id, prerequisites, unlock_criteria, completion_requirements, tags, featured
+    )
+    SELECT target_id, r.prerequisites, r.unlock_criteria, r.completion_requirements, r.tags,
+           COALESCE(r.featured, FALSE)
+    FROM jsonb_populate_record(NULL::module_configurations, config) r
+    ON CONFLICT (module_id) DO UPDATE SET
+      prerequisites = EXCLUDED.prerequisites,
+      unlock_criteria = EXCLUDED.unlock_criteria,
+      completion_requirements = EXCLUDED.completion_requirements,
+      tags = EXCLUDED.tags,
+      featured = EXCLUDED.featured
+    WHERE (c.prerequisites, c.unlock_criteria, c.completion_requirements, c.tags, c.featured)
+      IS DISTINCT FROM
+        (EXCLUDED.prerequisites, EXCLUDED.unlock_criteria, EXCLUDED.completion_requirements,
+         EXCLUDED.tags, EXCLUDED.featured);
+  END IF;
+
+  RETURN jsonb_build_object(
+    'module_id', target_id,
+    'version', COALESCE((SELECT v.version FROM module_content_versions v WHERE v.module_id = target_id), 0)
+  );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.get_module_bundle(UUID) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.save_module_bundle(JSONB, JSONB, JSONB, BIGINT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_module_bundle(UUID) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.save_module_bundle(JSONB, JSONB, JSONB, BIGINT) TO authenticated, service_role;
@@ -0,0 +1,14 @@
+-- Ordering guard for the progress event worker
+-- Several progress_worker.py processes claim disjoint batches of
+-- progress_events and may commit them in any order, so a batch holding older
+-- events could overwrite what a newer batch already wrote. Each
+-- user_module_progress row now records, per field the worker writes, the id
+-- of the last event that set it, and the worker's upsert only overwrites a
+-- field with a newer event. Tracking this per field rather than per row keeps
+-- a late batch's notes save when a newer batch only carried a heartbeat.
+-- Writes made outside the queue leave the columns alone.
+
+ALTER TABLE public.user_module_progress
+  ADD COLUMN IF NOT EXISTS status_event_id BIGINT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS progress_event_id BIGINT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS notes_event_id BIGINT NOT NULL DEFAULT 0;
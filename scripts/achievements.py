@@ -0,0 +1,101 @@
+"""Backfill and inspect the achievement engine (035_achievement_engine.sql).
+
+Writes keep ``user_achievement_counters`` and ``user_achievements`` up to
+date through triggers. ``backfill`` recounts every user with one grouped
+query per source table and awards every crossed threshold in one statement;
+run it after changing thresholds, adding badges or loading data with
+triggers disabled.
+
+Usage:
+    python scripts/achievements.py backfill
+    python scripts/achievements.py backfill --dry-run   # report, then roll back
+    python scripts/achievements.py status
+"""
+
+import argparse
+import sys
+import time
+
+import psycopg2
+
+from db import close_pool, connection
+
+# Badges awarded by the current transaction carry its start time.
+NEW_AWARDS_SQL = """
+SELECT a.name, a.criteria_type, a.criteria_value, COUNT(*)
+FROM public.user_achievements ua
+JOIN public.achievements a ON a.id = ua.achievement_id
+WHERE ua.earned_at = transaction_timestamp()
+GROUP BY a.id, a.name, a.criteria_type, a.criteria_value
+ORDER BY a.criteria_type, a.criteria_value, a.name
+"""
+
+STATUS_SQL = """
+SELECT a.name, a.criteria_type, a.criteria_value, COUNT(ua.user_id), a.is_active
+FROM public.achievements a
+LEFT JOIN public.user_achievements ua ON ua.achievement_id = a.id
+GROUP BY a.id, a.name, a.criteria_type, a.criteria_value, a.is_active
+ORDER BY a.criteria_type, a.criteria_value, a.name
+"""
+
+
+def print_badges(rows):
+    """Print ``(name, criteria_type, criteria_value, users[, is_active])`` rows."""
+    for name, criteria_type, criteria_value, users, *active in rows:
+        threshold = "-" if criteria_value is None else criteria_value
+        inactive = "  (inactive)" if active and not active[0] else ""
+        print(f"   {name:<32} {criteria_type:<18} {threshold:>4}  {users:>8} users{inactive}")
+
+
+def backfill(conn, dry_run=False):
+    """Recount and award everyone; return ``(users counted, badges awarded)``."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT public.backfill_achievements()")
+        awarded = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM public.user_achievement_counters")
+        counted = cursor.fetchone()[0]
+        cursor.execute(NEW_AWARDS_SQL)
+        print_badges(cursor.fetchall())
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    return counted, awarded
+
+
+def show_status(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(STATUS_SQL)
+        rows = cursor.fetchall()
+    conn.rollback()
+    print(f"🏆 {len(rows)} achievements")
+    print_badges(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill or inspect awarded achievements")
+    parser.add_argument("command", choices=("backfill", "status"))
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--dry-run", action="store_true", help="backfill: report new awards and roll back")
+    args = parser.parse_args(argv)
+
+    try:
+        with connection(args.database_url) as conn:
+            if args.command == "status":
+                show_status(conn)
+                return 0
+            started = time.perf_counter()
+            counted, awarded = backfill(conn, args.dry_run)
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    verb = "Would award" if args.dry_run else "Awarded"
+    print(f"🎉 {verb} {awarded} badges across {counted} users ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
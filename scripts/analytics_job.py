@@ -0,0 +1,352 @@
+"""Offline cohort, retention, funnel and mood analytics.
+
+Activity is extracted incrementally with ``COPY ... TO STDOUT`` into a local
+cache (one gzipped CSV per run and source, compacted as it is read), so each
+run only reads the rows written since the previous one. Everything is then
+computed in memory with vectorized pandas and written back to the
+``analytics_*`` result tables (033_analytics_results.sql) in one transaction:
+
+* weekly signup cohorts with D1/D7/D30 retention, where a user is active on
+  a day if they had a session, a reflection, a completed habit entry or a
+  progress update that day (UTC);
+* per-module funnels: opened, started, halfway, completed and the median
+  days from start to completion;
+* daily average mood with a trailing 7-day average.
+
+Deleted rows are only noticed by ``--full``, which re-extracts everything.
+The extract is one read-only snapshot and the write-back a few hundred rows,
+so nothing here competes with request traffic for long.
+
+Usage:
+    python scripts/analytics_job.py                # incremental run
+    python scripts/analytics_job.py --full         # re-extract everything
+    python scripts/analytics_job.py --dry-run      # compute and print only
+
+Needs pandas (``pip install pandas``).
+"""
+
+import argparse
+import gzip
+import io
+import json
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psycopg2
+
+from db import close_pool, connection
+
+DEFAULT_CACHE = Path(__file__).resolve().parent / "analytics_cache"
+RETENTION_DAYS = (1, 7, 30)
+
+# Rows committed late by a long transaction can carry an older timestamp than
+# the previous watermark; re-reading a short overlap picks them up again and
+# the duplicates are dropped by id.
+WATERMARK_OVERLAP = "10 minutes"
+
+# ``watermark`` is the output column used for incremental extracts and
+# ``timestamps`` the columns parsed as dates when loading.
+Source = namedtuple("Source", ["sql", "watermark", "timestamps"])
+
+SOURCES = {
+    "users": Source(
+        "SELECT id, created_at FROM auth.users",
+        "created_at",
+        ("created_at",),
+    ),
+    "sessions": Source(
+        "SELECT id, user_id, session_start, created_at FROM public.user_sessions",
+        "created_at",
+        ("session_start", "created_at"),
+    ),
+    "progress": Source(
+        "SELECT id, user_id, status, updated_at FROM public.user_progress",
+        "updated_at",
+        ("updated_at",),
+    ),
+    "module_progress": Source(
+        "SELECT id, user_id, module_id, status, progress_percentage, started_at, completed_at,"
+        " last_accessed_at, updated_at FROM public.user_module_progress",
+        "updated_at",
+        ("started_at", "completed_at", "last_accessed_at", "updated_at"),
+    ),
+    "reflections": Source(
+        "SELECT id, user_id, reflection_date, mood_rating, updated_at FROM public.daily_reflections",
+        "updated_at",
+        ("reflection_date", "updated_at"),
+    ),
+    "habit_entries": Source(
+        "SELECT e.id, h.user_id, e.entry_date, e.completed_count, e.updated_at"
+        " FROM public.habit_entries e JOIN public.habits h ON h.id = e.habit_id",
+        "updated_at",
+        ("entry_date", "updated_at"),
+    ),
+}
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+def load_pandas():
+    try:
+        import pandas as pd
+    except ImportError:
+        raise AnalyticsError("The analytics job needs pandas (pip install pandas)")
+    return pd
+
+
+def load_state(cache_dir):
+    path = cache_dir / "state.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_state(cache_dir, state):
+    (cache_dir / "state.json").write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def extract(conn, cache_dir, full=False):
+    """COPY every source's new rows into the cache; return rows per source.
+
+    All sources are read in one REPEATABLE READ snapshot, so the watermark
+    (the snapshot's NOW()) is the same for all of them.
+    """
+    state = {} if full else load_state(cache_dir)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    counts = {}
+
+    with conn.cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        cursor.execute("SET LOCAL TimeZone = 'UTC'")
+        cursor.execute("SELECT NOW()")
+        snapshot_at = cursor.fetchone()[0]
+
+        for name, source in SOURCES.items():
+            directory = cache_dir / name
+            directory.mkdir(parents=True, exist_ok=True)
+            since = state.get(name)
+            if since:
+                sql = cursor.mogrify(
+                    f"SELECT * FROM ({source.sql}) s"
+                    f" WHERE s.{source.watermark} > %s::TIMESTAMPTZ - INTERVAL '{WATERMARK_OVERLAP}'",
+                    (since,),
+                ).decode()
+            else:
+                sql = source.sql
+
+            path = directory / f"{stamp}.csv.gz"
+            with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", out)
+            counts[name] = cursor.rowcount
+
+            if not since:
+                # A full extract replaces whatever was cached before it.
+                for old in directory.glob("*.csv.gz"):
+                    if old != path:
+                        old.unlink()
+            state[name] = snapshot_at.isoformat()
+    conn.rollback()
+
+    save_state(cache_dir, state)
+    return counts
+
+
+def load_source(pd, cache_dir, name):
+    """Read a source's cached chunks, keeping the newest copy of each row.
+
+    Several chunks are compacted into one so the cache doesn't grow with the
+    number of runs.
+    """
+    source = SOURCES[name]
+    files = sorted((cache_dir / name).glob("*.csv.gz"))
+    frame = pd.concat([pd.read_csv(path) for path in files], ignore_index=True)
+    frame = frame.drop_duplicates("id", keep="last").reset_index(drop=True)
+
+    if len(files) > 1:
+        frame.to_csv(files[-1], index=False, compression="gzip")
+        for path in files[:-1]:
+            path.unlink()
+
+    for column in source.timestamps:
+        frame[column] = pd.to_datetime(frame[column], utc=True, format="ISO8601")
+    return frame
+
+
+def to_day(series):
+    """UTC timestamps to midnight-aligned naive datetimes."""
+    return series.dt.tz_convert("UTC").dt.tz_localize(None).dt.normalize()
+
+
+def activity_days(pd, frames):
+    """Distinct ``(user_id, day)`` pairs on which each user did anything."""
+    entries = frames["habit_entries"]
+    done = entries.completed_count.fillna(0) > 0
+    parts = [
+        (frames["sessions"].user_id, frames["sessions"].session_start),
+        (frames["progress"].user_id, frames["progress"].updated_at),
+        (frames["module_progress"].user_id, frames["module_progress"].last_accessed_at),
+        (frames["reflections"].user_id, frames["reflections"].reflection_date),
+        (entries.user_id[done], entries.entry_date[done]),
+    ]
+    activity = pd.concat(
+        [pd.DataFrame({"user_id": user_ids.values, "day": to_day(days).values}) for user_ids, days in parts],
+        ignore_index=True,
+    )
+    return activity.dropna().drop_duplicates()
+
+
+def cohort_retention(pd, users, activity, today):
+    users = users.assign(signup_day=to_day(users.created_at))
+    users["cohort_week"] = users.signup_day - pd.to_timedelta(users.signup_day.dt.weekday, unit="D")
+    age = (today - users.signup_day).dt.days
+
+    active = activity.merge(users[["id", "signup_day", "cohort_week"]], left_on="user_id", right_on="id")
+    offset = (active.day - active.signup_day).dt.days
+
+    result = users.groupby("cohort_week").size().rename("cohort_size").to_frame()
+    for n in RETENTION_DAYS:
+        retained = active[offset == n].groupby("cohort_week").user_id.nunique()
+        eligible = users[age >= n].groupby("cohort_week").size()
+        result[f"d{n}_users"] = retained.reindex(result.index, fill_value=0).astype(int)
+        # NaN (written as NULL) while nobody in the cohort is N days old
+        result[f"d{n}_rate"] = (result[f"d{n}_users"] / eligible.reindex(result.index)).round(4)
+
+    result = result.reset_index()
+    result["cohort_week"] = result.cohort_week.dt.date
+    return result
+
+
+def module_funnel(pd, module_progress):
+    progress = module_progress.progress_percentage.fillna(0)
+    completed = module_progress.status.eq("completed")
+    flags = pd.DataFrame(
+        {
+            "module_id": module_progress.module_id,
+            "opened_users": 1,
+            "started_users": (progress > 0) | completed | module_progress.status.eq("in_progress"),
+            "halfway_users": (progress >= 50) | completed,
+            "completed_users": completed,
+        }
+    )
+    result = flags.groupby("module_id").sum().astype(int)
+
+    days = (module_progress.completed_at - module_progress.started_at).dt.total_seconds() / 86400
+    finished = completed & days.notna()
+    result["median_days_to_complete"] = (
+        days[finished].groupby(module_progress.module_id[finished]).median().reindex(result.index).round(2)
+    )
+    return result.reset_index()
+
+
+def mood_daily(pd, reflections):
+    if reflections.empty:
+        return pd.DataFrame(columns=["day", "reflections", "average_mood", "average_mood_7d"])
+
+    frame = pd.DataFrame({"day": to_day(reflections.reflection_date), "mood": reflections.mood_rating})
+    daily = frame.groupby("day").agg(reflections=("mood", "size"), mood_sum=("mood", "sum"), rated=("mood", "count"))
+    daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq="D"), fill_value=0)
+
+    # Weighted by the number of rated reflections, not an average of averages
+    window = daily[["mood_sum", "rated"]].rolling(7, min_periods=1).sum()
+    result = pd.DataFrame(
+        {
+            "day": daily.index.date,
+            "reflections": daily.reflections.astype(int).values,
+            "average_mood": (daily.mood_sum / daily.rated.where(daily.rated > 0)).round(2).values,
+            "average_mood_7d": (window.mood_sum / window.rated.where(window.rated > 0)).round(2).values,
+        }
+    )
+    return result
+
+
+RESULT_TABLES = {
+    "analytics_cohort_retention": (
+        "cohort_week",
+        "cohort_size",
+        "d1_users",
+        "d7_users",
+        "d30_users",
+        "d1_rate",
+        "d7_rate",
+        "d30_rate",
+    ),
+    "analytics_module_funnel": (
+        "module_id",
+        "opened_users",
+        "started_users",
+        "halfway_users",
+        "completed_users",
+        "median_days_to_complete",
+    ),
+    "analytics_mood_daily": ("day", "reflections", "average_mood", "average_mood_7d"),
+}
+
+
+def replace_results(conn, results):
+    """Swap every result table's contents in one transaction.
+
+    DELETE rather than TRUNCATE, so dashboards keep reading the previous
+    results until the commit.
+    """
+    with conn.cursor() as cursor:
+        for table, columns in RESULT_TABLES.items():
+            buffer = io.StringIO()
+            results[table].to_csv(buffer, columns=list(columns), index=False, header=False, na_rep="")
+            buffer.seek(0)
+            cursor.execute(f"DELETE FROM public.{table}")
+            cursor.copy_expert(f"COPY public.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute cohort, retention, funnel and mood analytics offline")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE, help="where extracted rows are kept")
+    parser.add_argument("--full", action="store_true", help="re-extract every row instead of the new ones")
+    parser.add_argument("--dry-run", action="store_true", help="print the results instead of writing them")
+    args = parser.parse_args(argv)
+
+    try:
+        pd = load_pandas()
+        args.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        with connection(args.database_url) as conn:
+            started = time.perf_counter()
+            counts = extract(conn, args.cache_dir, full=args.full)
+            extracted = ", ".join(f"{name} {count}" for name, count in counts.items())
+            print(f"📦 Extracted {extracted} rows ({time.perf_counter() - started:.1f}s)")
+
+            started = time.perf_counter()
+            frames = {name: load_source(pd, args.cache_dir, name) for name in SOURCES}
+            today = pd.Timestamp.now(tz="UTC").tz_localize(None).normalize()
+            activity = activity_days(pd, frames)
+            results = {
+                "analytics_cohort_retention": cohort_retention(pd, frames["users"], activity, today),
+                "analytics_module_funnel": module_funnel(pd, frames["module_progress"]),
+                "analytics_mood_daily": mood_daily(pd, frames["reflections"]),
+            }
+            print(f"✅ Computed from {len(activity)} active user-days ({time.perf_counter() - started:.1f}s)")
+
+            if args.dry_run:
+                for table, frame in results.items():
+                    print(f"\n{table} ({len(frame)} rows)")
+                    print(frame.tail(10).to_string(index=False))
+                return 0
+
+            replace_results(conn, results)
+    except (psycopg2.Error, RuntimeError, AnalyticsError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    rows = ", ".join(f"{table} {len(frame)}" for table, frame in results.items())
+    print(f"🎉 Wrote {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""Benchmark the analytics functions, admin views and dashboard queries.
+
+Each benchmark is run ``--warmup`` times, then timed ``--iterations`` times
+from the client (execute plus fetch, so payload size counts). p50/p95 are
+reported along with the ``EXPLAIN (ANALYZE, BUFFERS)`` plan of one extra run.
+Every iteration is rolled back, so benchmarks may also exercise write paths.
+
+Results are compared with a JSON baseline stored per dataset (by default the
+number of rows in ``auth.users``); the run fails when a p95 regresses by more
+than ``--tolerance``. Record a new baseline with ``--update-baseline``.
+
+Usage:
+    python scripts/generate_load_data.py --users 50000
+    python scripts/benchmark.py
+    python scripts/benchmark.py --only engagement_metrics_30d --explain
+    python scripts/benchmark.py --prepared     # parse and plan once per query
+    python scripts/benchmark.py --update-baseline
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import psycopg2
+
+from db import close_pool, connection, execute_prepared
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmarks" / "baseline.json"
+
+# Differences below this are noise on any machine, whatever the percentage.
+NOISE_FLOOR_MS = 2.0
+
+# ``as_admin`` benchmarks run as the ``authenticated`` role with the JWT
+# claims of an admin, so row-level security applies as it does for the
+# admin pages; the others run as the connecting (owner) role.
+Benchmark = namedtuple("Benchmark", ["name", "sql", "params", "as_admin"], defaults=(False,))
+
+# Placeholder in ``params``, replaced by the id of the user with the most
+# reflections, so per-user benchmarks read a realistic amount of rows.
+SAMPLE_USER = "<sample-user>"
+
+BENCHMARKS = [
+    Benchmark("progress_stats_by_category", "SELECT * FROM public.get_progress_stats_by_category()", ()),
+    Benchmark("engagement_metrics_7d", "SELECT * FROM public.get_user_engagement_metrics(%s)", (7,)),
+    Benchmark("engagement_metrics_30d", "SELECT * FROM public.get_user_engagement_metrics(%s)", (30,)),
+    Benchmark("admin_analytics_summary", "SELECT * FROM public.admin_analytics_summary", ()),
+    Benchmark("admin_dashboard_stats", "SELECT * FROM public.admin_dashboard_stats", ()),
+    # What /api/admin/dashboard-data runs for its first page.
+    Benchmark("dashboard_data_stats", "SELECT * FROM public.get_admin_dashboard_stats()", ()),
+    Benchmark(
+        "dashboard_data_recent_users",
+        "SELECT * FROM public.user_profiles ORDER BY created_at DESC LIMIT 10",
+        (),
+    ),
+    Benchmark("dashboard_data_progress_page", "SELECT * FROM public.get_admin_progress_page(NULL, NULL, 50)", ()),
+    # What /api/admin/clients runs for the /admin-panel client list.
+    Benchmark("admin_clients_page", "SELECT * FROM public.get_admin_clients_page(NULL, NULL, 20)", ()),
+    Benchmark("admin_clients_count", "SELECT * FROM public.get_admin_clients_count()", ()),
+    Benchmark("admin_clients_search", "SELECT * FROM public.get_admin_clients_page(NULL, NULL, 20, %s)", ("silva",)),
+    Benchmark("admin_clients_search_count", "SELECT * FROM public.get_admin_clients_count(%s)", ("silva",)),
+    # Time-window reads that should touch only the recent partitions.
+    Benchmark(
+        "sessions_last_7d",
+        "SELECT COUNT(*) FROM public.user_sessions WHERE session_start >= NOW() - INTERVAL '7 days'",
+        (),
+    ),
+    # Per-user page queries (dashboard, goals, reflections, modules).
+    Benchmark(
+        "user_goals",
+        "SELECT * FROM public.goals WHERE user_id = %s ORDER BY created_at DESC",
+        (SAMPLE_USER,),
+    ),
+    Benchmark(
+        "user_active_habits",
+        "SELECT id FROM public.habits WHERE user_id = %s AND is_active = true",
+        (SAMPLE_USER,),
+    ),
+    Benchmark(
+        "user_reflections",
+        "SELECT * FROM public.daily_reflections WHERE user_id = %s ORDER BY reflection_date DESC",
+        (SAMPLE_USER,),
+    ),
+    Benchmark(
+        "user_module_progress",
+        "SELECT module_id, progress_percentage, status, last_accessed_at FROM public.user_module_progress"
+        " WHERE user_id = %s ORDER BY last_accessed_at DESC",
+        (SAMPLE_USER,),
+    ),
+    # /analytics, with the JWT claims of the sample user.
+    Benchmark(
+        "user_analytics_30d",
+        "SELECT public.get_user_analytics(30)"
+        " FROM (SELECT set_config('request.jwt.claims', json_build_object('sub', %s)::text, true)) AS claims",
+        (SAMPLE_USER,),
+    ),
+    # /dashboard, with the JWT claims of the sample user.
+    Benchmark(
+        "dashboard_bootstrap",
+        "SELECT public.get_dashboard_bootstrap()"
+        " FROM (SELECT set_config('request.jwt.claims', json_build_object('sub', %s)::text, true)) AS claims",
+        (SAMPLE_USER,),
+    ),
+    # Full-text search (037): content only, then the sample user's reflections.
+    Benchmark("content_search", "SELECT * FROM public.search_content(%s, 'pt', 20)", ("gratidão",)),
+    Benchmark(
+        "user_reflection_search",
+        "SELECT s.* FROM (SELECT set_config('request.jwt.claims', json_build_object('sub', %s)::text, true)) AS claims,"
+        " public.search_content(%s, 'pt', 20, ARRAY['reflection']) s",
+        (SAMPLE_USER, "gratidão"),
+    ),
+    # Admin listing through row-level security: cost grows with the rows the
+    # policies are evaluated for.
+    Benchmark("admin_rls_user_progress_count", "SELECT COUNT(*) FROM public.user_progress", (), True),
+    Benchmark(
+        "admin_rls_user_progress_page",
+        "SELECT * FROM public.user_progress ORDER BY updated_at DESC LIMIT 50",
+        (),
+        True,
+    ),
+    Benchmark("admin_progress_status_totals", "SELECT * FROM public.get_progress_status_totals()", (), True),
+]
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a non-empty list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def impersonate_admin(cursor):
+    """Make the current transaction an active admin as seen by RLS.
+
+    The first synthetic user is promoted inside the transaction, which every
+    benchmark rolls back, so nothing is left behind.
+    """
+    cursor.execute("SELECT id, email FROM auth.users ORDER BY id LIMIT 1")
+    user_id, email = cursor.fetchone()
+    cursor.execute(
+        "INSERT INTO public.admin_users (id, email, role, is_active) VALUES (%s, %s, 'admin', true)"
+        " ON CONFLICT (id) DO UPDATE SET is_active = true",
+        (user_id, email),
+    )
+    claims = json.dumps({"sub": str(user_id), "email": email, "role": "authenticated"})
+    cursor.execute("SELECT set_config('request.jwt.claims', %s, true)", (claims,))
+    cursor.execute("SET LOCAL ROLE authenticated")
+
+
+def explain(cursor, benchmark):
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + benchmark.sql, benchmark.params)
+    return cursor.fetchone()[0][0]
+
+
+def run_benchmark(conn, benchmark, iterations, warmup, with_plan, prepared=False):
+    """Time one benchmark and return its result dict."""
+    samples = []
+    rows = 0
+    with conn.cursor() as cursor:
+        for i in range(warmup + iterations):
+            if benchmark.as_admin:
+                impersonate_admin(cursor)
+            started = time.perf_counter()
+            if prepared:
+                execute_prepared(cursor, benchmark.name, benchmark.sql, benchmark.params)
+            else:
+                cursor.execute(benchmark.sql, benchmark.params)
+            rows = len(cursor.fetchall())
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            conn.rollback()
+            if i >= warmup:
+                samples.append(elapsed_ms)
+
+        result = {
+            "p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(percentile(samples, 0.95), 3),
+            "min_ms": round(min(samples), 3),
+            "rows": rows,
+        }
+        if with_plan:
+            if benchmark.as_admin:
+                impersonate_admin(cursor)
+            plan = explain(cursor, benchmark)
+            conn.rollback()
+            top = plan["Plan"]
+            result["plan"] = plan
+            result["shared_hit_blocks"] = top.get("Shared Hit Blocks", 0)
+            result["shared_read_blocks"] = top.get("Shared Read Blocks", 0)
+    return result
+
+
+def sample_user(conn):
+    """Return the id of the user with the most reflections, or None."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT user_id FROM public.daily_reflections GROUP BY user_id ORDER BY COUNT(*) DESC, user_id LIMIT 1"
+        )
+        row = cursor.fetchone()
+    conn.rollback()
+    return str(row[0]) if row else None
+
+
+def bind_params(benchmarks, user_id):
+    return [b._replace(params=tuple(user_id if p == SAMPLE_USER else p for p in b.params)) for b in benchmarks]
+
+
+def dataset_label(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM auth.users")
+        users = cursor.fetchone()[0]
+    conn.rollback()
+    return f"{users}-users"
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of ``(name, message)`` for every regression."""
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        if "error" in actual:
+            regressions.append((name, f"failed: {actual['error']}"))
+            continue
+        limit = expected["p95_ms"] * (1 + tolerance)
+        if actual["p95_ms"] > limit and actual["p95_ms"] - expected["p95_ms"] > NOISE_FLOOR_MS:
+            regressions.append(
+                (name, f"p95 {actual['p95_ms']:.1f} ms > baseline {expected['p95_ms']:.1f} ms (+{tolerance:.0%})")
+            )
+    return regressions
+
+
+def print_result(name, result):
+    if "error" in result:
+        print(f"❌ {name:<40} {result['error']}")
+        return
+    buffers = ""
+    if "shared_hit_blocks" in result:
+        buffers = f"  buffers hit={result['shared_hit_blocks']} read={result['shared_read_blocks']}"
+    print(
+        f"⏱️  {name:<40} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms"
+        f"  rows {result['rows']:>8}{buffers}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark analytics SQL and admin queries")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--dataset", help="baseline key (default: '<auth.users count>-users')")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 regression (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--explain", action="store_true", help="print the EXPLAIN (ANALYZE, BUFFERS) plans")
+    parser.add_argument("--output", type=Path, help="write full results, plans included, as JSON")
+    parser.add_argument("--prepared", action="store_true", help="run each query as a server-side prepared statement")
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+    if not selected:
+        print(f"❌ No benchmarks match: {', '.join(args.only)}")
+        return 1
+
+    results = {}
+    try:
+        with connection(args.database_url) as conn:
+            dataset = args.dataset or dataset_label(conn)
+            print(f"📊 Dataset {dataset}, {args.iterations} iterations")
+            if any(SAMPLE_USER in b.params for b in selected):
+                selected = bind_params(selected, sample_user(conn))
+            for benchmark in selected:
+                try:
+                    results[benchmark.name] = run_benchmark(
+                        conn, benchmark, args.iterations, args.warmup, True, args.prepared
+                    )
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    results[benchmark.name] = {"error": str(e).strip().splitlines()[0]}
+                print_result(benchmark.name, results[benchmark.name])
+                if args.explain and "plan" in results[benchmark.name]:
+                    print(json.dumps(results[benchmark.name]["plan"], indent=2))
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    if args.output:
+        args.output.write_text(json.dumps({"dataset": dataset, "results": results}, indent=2, default=str))
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        stored[dataset] = {
+            name: {key: result[key] for key in ("p50_ms", "p95_ms", "rows")}
+            for name, result in results.items()
+            if "error" not in result
+        }
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"📌 Baseline for {dataset} written to {args.baseline}")
+        return 0
+
+    if dataset not in stored:
+        print(f"ℹ️  No baseline for {dataset}; run with --update-baseline to record one")
+        return 1 if any("error" in r for r in results.values()) else 0
+
+    regressions = compare(results, stored[dataset], args.tolerance)
+    for name, message in regressions:
+        print(f"📉 {name}: {message}")
+    if regressions:
+        return 1
+    print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Prewarm and validate the module content cache behind /api/modules.
+
+The app caches published modules and their sections in memory, keyed by the
+content version in ``module_content_versions``. This tool requests every
+active module through the API so a fresh instance starts warm, and checks
+what the API serves against the database.
+
+Usage:
+    python scripts/content_cache.py prewarm --base-url https://app.example.com
+    python scripts/content_cache.py validate --invalidate
+
+``--invalidate`` first asks the instance to re-read the content versions, so
+edits made in the last few seconds are not reported as stale. It sends
+``$CONTENT_CACHE_SECRET``, which must match the app's.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+import requests
+
+from db import close_pool, connection, http_session
+
+# Fields compared between the API and the database.
+MODULE_FIELDS = ("id", "title", "description", "category", "order_index")
+SECTION_FIELDS = ("id", "title", "content", "section_type", "order_index")
+
+
+def load_published(cursor):
+    """Return ``{module_id: {"version", "module", "sections"}}`` for active modules."""
+    cursor.execute(
+        """
+        SELECT m.id::text, COALESCE(v.version, 0), m.title, m.description, m.category, m.order_index
+        FROM public.transformation_modules m
+        LEFT JOIN public.module_content_versions v ON v.module_id = m.id
+        WHERE m.is_active = true
+        ORDER BY m.order_index
+        """
+    )
+    published = {}
+    for module_id, version, *values in cursor.fetchall():
+        published[module_id] = {
+            "version": version,
+            "module": dict(zip(MODULE_FIELDS, [module_id, *values])),
+            "sections": [],
+        }
+
+    cursor.execute(
+        """
+        SELECT module_id::text, id::text, title, content, section_type, order_index
+        FROM public.module_sections
+        WHERE is_active = true AND module_id = ANY(%s::uuid[])
+        ORDER BY module_id, order_index
+        """,
+        (list(published),),
+    )
+    for module_id, *values in cursor.fetchall():
+        published[module_id]["sections"].append(dict(zip(SECTION_FIELDS, values)))
+    return published
+
+
+def fetch(session, url):
+    started = time.perf_counter()
+    response = session.get(url, timeout=30)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    return response.json(), elapsed_ms
+
+
+def prewarm(session, base_url, published):
+    _, elapsed_ms = fetch(session, f"{base_url}/api/modules")
+    print(f"🔥 catalog ({elapsed_ms:.0f} ms)")
+    for module_id, expected in published.items():
+        _, elapsed_ms = fetch(session, f"{base_url}/api/modules/{module_id}")
+        print(f"🔥 {expected['module']['title']} ({elapsed_ms:.0f} ms)")
+    return 0
+
+
+def diff_entry(expected, served):
+    """List the differences between a database entry and a served one."""
+    problems = []
+    if served.get("version") != expected["version"]:
+        problems.append(f"version {served.get('version')} != {expected['version']}")
+
+    module = served.get("module") or {}
+    for field in MODULE_FIELDS:
+        if module.get(field) != expected["module"][field]:
+            problems.append(f"module.{field} differs")
+
+    # Sections are left out when a current pre-rendered bundle is served;
+    # the publisher owns those (scripts/publish_modules.py).
+    if served.get("bundle"):
+        return problems
+
+    sections = served.get("sections") or []
+    if [s.get("id") for s in sections] != [s["id"] for s in expected["sections"]]:
+        problems.append(f"sections {len(sections)} served, {len(expected['sections'])} in the database")
+    else:
+        for served_section, expected_section in zip(sections, expected["sections"]):
+            for field in SECTION_FIELDS:
+                if served_section.get(field) != expected_section[field]:
+                    problems.append(f"section {expected_section['id']} {field} differs")
+    return problems
+
+
+def validate(session, base_url, published):
+    catalog, _ = fetch(session, f"{base_url}/api/modules")
+    served_ids = [m.get("id") for m in catalog.get("modules", [])]
+    failures = 0
+    if served_ids != list(published):
+        print(f"❌ catalog lists {len(served_ids)} modules, the database {len(published)}")
+        failures += 1
+
+    for module_id, expected in published.items():
+        served, _ = fetch(session, f"{base_url}/api/modules/{module_id}")
+        problems = diff_entry(expected, served)
+        if problems:
+            failures += 1
+            print(f"❌ {expected['module']['title']}: {'; '.join(problems)}")
+        else:
+            print(f"✅ {expected['module']['title']} (version {expected['version']})")
+
+    if failures:
+        print(f"⚠️  {failures} stale or inconsistent cache entries")
+        return 1
+    print("🎉 Cache matches the database")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prewarm or validate the module content cache")
+    parser.add_argument("command", choices=["prewarm", "validate"])
+    parser.add_argument("--base-url", default=os.getenv("APP_URL", "http://localhost:3000"))
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--invalidate", action="store_true", help="make the instance re-read versions first")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip("/")
+    try:
+        with connection(args.database_url) as conn:
+            with conn.cursor() as cursor:
+                published = load_published(cursor)
+            conn.rollback()
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    print(f"📦 {len(published)} active modules in the database")
+    with http_session() as session:
+        try:
+            if args.invalidate:
+                session.post(
+                    f"{base_url}/api/modules/invalidate",
+                    headers={"x-cache-secret": os.environ.get("CONTENT_CACHE_SECRET", "")},
+                    timeout=30,
+                ).raise_for_status()
+            if args.command == "prewarm":
+                return prewarm(session, base_url, published)
+            return validate(session, base_url, published)
+        except requests.RequestException as e:
+            print(f"❌ {e}")
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
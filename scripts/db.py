@@ -0,0 +1,307 @@
+"""Shared Postgres and HTTP access for the Python tooling in this folder.
+
+Every script used to call ``psycopg2.connect()`` on its own. Scripts should
+instead borrow connections from the pool kept here, so one process reuses the
+same server connections for all of its work. On top of the pool:
+
+* ``run_with_retry`` reruns a unit of work after transient failures (dropped
+  connections, serialization failures, deadlocks), with jittered backoff;
+* ``execute_prepared`` prepares a statement once per connection and from
+  then on only sends ``EXECUTE``;
+* ``add_query_hook`` registers callbacks that get every statement run on a
+  pooled connection and how long it took;
+* ``http_session`` and ``supabase_session`` return keep-alive HTTP sessions
+  with retries, for PostgREST and Storage calls.
+
+``DB_POOL_SIZE`` bounds the pool (default 4); callers wait up to
+``DB_POOL_TIMEOUT`` seconds for a free connection. Set ``PGBOUNCER=1`` when
+POSTGRES_URL points at pgbouncer in transaction mode, where server-side
+prepared statements do not survive between transactions.
+"""
+
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import connection as BaseConnection
+from psycopg2.extensions import cursor as BaseCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_POOL_TIMEOUT = 30.0
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 5.0
+
+# SQLSTATEs worth retrying besides connection exceptions (class 08):
+# the server shutting down or not accepting connections yet.
+TRANSIENT_SQLSTATES = {"57P01", "57P02", "57P03"}
+
+STATEMENT_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+PLACEHOLDER = re.compile(r"%(s|%)")
+
+_pool = None
+_query_hooks = []
+
+
+def get_database_url(database_url=None):
+    """Return the connection string, falling back to POSTGRES_URL."""
+    database_url = database_url or os.environ.get("POSTGRES_URL")
+    if not database_url:
+        raise RuntimeError("POSTGRES_URL environment variable not found")
+    return database_url
+
+
+def pgbouncer_mode():
+    return os.environ.get("PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+
+def is_transient(error):
+    """Whether ``error`` is worth retrying on a fresh transaction."""
+    if isinstance(error, psycopg2.extensions.TransactionRollbackError):
+        return True
+    if isinstance(error, psycopg2.OperationalError):
+        code = error.pgcode
+        return code is None or code.startswith("08") or code in TRANSIENT_SQLSTATES
+    return False
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter for retry number ``attempt`` (0-based)."""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt) * random.uniform(0.5, 1.0)
+
+
+def _retrying(call, attempts):
+    for attempt in range(attempts):
+        try:
+            return call()
+        except psycopg2.Error as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+def add_query_hook(hook):
+    """Call ``hook(query, seconds)`` after every statement on a pooled connection."""
+    _query_hooks.append(hook)
+
+
+def remove_query_hook(hook):
+    _query_hooks.remove(hook)
+
+
+def _notify(query, started):
+    elapsed = time.perf_counter() - started
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    for hook in list(_query_hooks):
+        hook(str(query), elapsed)
+
+
+class TimedCursor(BaseCursor):
+    """Cursor that reports each statement to the registered query hooks."""
+
+    def execute(self, query, vars=None):
+        if not _query_hooks:
+            return super().execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _notify(query, started)
+
+    def executemany(self, query, vars_list):
+        if not _query_hooks:
+            return super().executemany(query, vars_list)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _notify(query, started)
+
+    def copy_expert(self, sql, file, size=8192):
+        if not _query_hooks:
+            return super().copy_expert(sql, file, size)
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            _notify(sql, started)
+
+
+class Connection(BaseConnection):
+    """Connection that remembers which statements it has prepared."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        self.cursor_factory = TimedCursor
+
+
+class BoundedPool(ThreadedConnectionPool):
+    """Thread-safe pool that waits for a free connection once ``maxconn``
+    are checked out, instead of raising straight away."""
+
+    def __init__(self, minconn, maxconn, *args, timeout=DEFAULT_POOL_TIMEOUT, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PoolError(f"no database connection free after {self._timeout:.0f}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def get_pool(database_url=None, maxconn=None):
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None or _pool.closed:
+        maxconn = maxconn or int(os.environ.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+        timeout = float(os.environ.get("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT))
+        _pool = _retrying(
+            lambda: BoundedPool(
+                1, maxconn, get_database_url(database_url), timeout=timeout, connection_factory=Connection
+            ),
+            RETRY_ATTEMPTS,
+        )
+    return _pool
+
+
+@contextmanager
+def connection(database_url=None):
+    """Borrow a pooled connection and give it back when the block exits.
+
+    Connecting is retried with backoff. A connection that is left inside a
+    failed or open transaction is rolled back before it goes back to the
+    pool, and one that was closed underneath us is discarded.
+    """
+    pool = get_pool(database_url)
+    conn = _retrying(pool.getconn, RETRY_ATTEMPTS)
+    try:
+        yield conn
+    finally:
+        if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def run_with_retry(work, database_url=None, attempts=RETRY_ATTEMPTS):
+    """Run ``work(conn)`` on a pooled connection, retrying transient failures.
+
+    ``work`` is rerun from the start, on a fresh connection when the old one
+    dropped, so it must be a complete unit that commits its own transaction
+    and does nothing outside the database before that commit.
+    """
+
+    def attempt():
+        with connection(database_url) as conn:
+            return work(conn)
+
+    return _retrying(attempt, attempts)
+
+
+def connect(database_url=None):
+    """Open a dedicated connection outside the pool (e.g. for LISTEN)."""
+    return _retrying(
+        lambda: psycopg2.connect(get_database_url(database_url), connection_factory=Connection),
+        RETRY_ATTEMPTS,
+    )
+
+
+def execute_prepared(cursor, name, sql, params=()):
+    """Execute ``sql`` (``%s`` placeholders) as the prepared statement ``name``.
+
+    The statement is parsed and planned once per connection; later calls only
+    send ``EXECUTE name(...)``. ``name`` must always stand for the same SQL.
+    Under PGBOUNCER=1, or on connections not opened here, ``sql`` is simply
+    executed.
+    """
+    if not STATEMENT_NAME.match(name):
+        raise ValueError(f"invalid prepared statement name: {name!r}")
+    prepared = getattr(cursor.connection, "prepared", None)
+    if prepared is None or pgbouncer_mode():
+        return cursor.execute(sql, params)
+    if name not in prepared:
+        numbers = itertools.count(1)
+        body = PLACEHOLDER.sub(lambda m: f"${next(numbers)}" if m.group(1) == "s" else "%", sql)
+        cursor.execute(f"PREPARE {name} AS {body}")
+        prepared.add(name)
+    if not params:
+        return cursor.execute(f"EXECUTE {name}")
+    return cursor.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params)
+
+
+def close_pool():
+    """Close every pooled connection. Safe to call more than once."""
+    global _pool
+    if _pool is not None and not _pool.closed:
+        _pool.closeall()
+    _pool = None
+
+
+def http_session(headers=None, retries=RETRY_ATTEMPTS, pool_size=10, retry_post=False):
+    """Return a keep-alive ``requests.Session`` that retries transient failures.
+
+    Connections stay open across calls. Connection errors, 429 and 502-504
+    responses are retried with backoff (honouring Retry-After); the final
+    response is returned either way, so callers still check the status.
+    Only urllib3's idempotent methods are retried: a POST or PATCH that timed
+    out may have been applied. Pass ``retry_post=True`` when every POST sent
+    through the session is an idempotent upsert (PostgREST ``on_conflict``
+    with ``resolution=merge-duplicates``, Storage ``x-upsert``).
+    """
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except ImportError:
+        raise RuntimeError("HTTP calls need requests (pip install requests)")
+
+    methods = Retry.DEFAULT_ALLOWED_METHODS | {"POST"} if retry_post else Retry.DEFAULT_ALLOWED_METHODS
+    retry = Retry(
+        total=retries,
+        backoff_factor=RETRY_BASE_DELAY,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=methods,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def supabase_session(headers=None, retry_post=False):
+    """Return ``(SUPABASE_URL, session)`` with service-role credentials set.
+
+    ``retry_post`` is passed on to ``http_session``.
+    """
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+    return url.rstrip("/"), http_session(
+        {"apikey": key, "Authorization": f"Bearer {key}", **(headers or {})}, retry_post=retry_post
+    )
@@ -0,0 +1,168 @@
+"""Export clients or progress rows straight from Postgres.
+
+The offline counterpart of /api/admin/export, for exports too large or too
+frequent for the admin panel. Nothing is held in memory beyond one batch:
+
+* ``csv`` is produced by ``COPY (...) TO STDOUT`` and written as it arrives;
+* ``ndjson`` and ``parquet`` read through a server-side cursor, ``parquet``
+  writing one row group per batch (needs ``pyarrow``).
+
+Usage:
+    python scripts/export_data.py clients --output clientes.csv
+    python scripts/export_data.py progress --format parquet --output progress.parquet
+    python scripts/export_data.py progress --format ndjson --status completed > done.ndjson
+"""
+
+import argparse
+import json
+import sys
+
+import psycopg2
+
+from db import close_pool, connection
+
+FORMATS = ("csv", "ndjson", "parquet")
+BATCH_SIZE = 5000
+
+CLIENTS_SQL = """
+SELECT p.id, p.user_id, p.email, p.display_name, p.created_at,
+       COALESCE(s.overall_percentage, 0) AS progress_percentage
+FROM public.user_profiles p
+LEFT JOIN public.user_progress_summary s ON s.user_id = p.user_id
+ORDER BY p.created_at DESC, p.id DESC
+"""
+
+# user_progress has two layouts (003 and 013); columns only one of them has
+# are read through to_jsonb().
+PROGRESS_SQL = """
+SELECT up.*, p.email, p.display_name
+FROM public.user_progress up
+LEFT JOIN public.user_profiles p ON p.user_id = up.user_id
+WHERE (%(status)s::TEXT IS NULL OR up.status = %(status)s)
+  AND (%(category)s::TEXT IS NULL OR to_jsonb(up) ->> 'step_category' = %(category)s)
+  AND (
+    %(search)s::TEXT IS NULL
+    OR p.email ILIKE '%%' || %(search)s || '%%'
+    OR p.display_name ILIKE '%%' || %(search)s || '%%'
+    OR to_jsonb(up) ->> 'step_name' ILIKE '%%' || %(search)s || '%%'
+  )
+ORDER BY up.id
+"""
+
+
+class ExportError(Exception):
+    pass
+
+
+def build_query(dataset, status=None, category=None, search=None):
+    if dataset == "clients":
+        return CLIENTS_SQL, {}
+    return PROGRESS_SQL, {"status": status, "category": category, "search": search}
+
+
+def plain(value):
+    """JSON columns become strings so every batch has the same flat schema."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_batches(conn, sql, params, batch_size):
+    """Yield ``(columns, rows)`` batches from a named (server-side) cursor."""
+    with conn.cursor(name="export_data") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [column.name for column in cursor.description], rows
+
+
+def export_csv(conn, sql, params, out):
+    with conn.cursor() as cursor:
+        query = cursor.mogrify(sql, params).decode()
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", out)
+        return cursor.rowcount
+
+
+def export_ndjson(conn, sql, params, out, batch_size):
+    total = 0
+    for columns, rows in iter_batches(conn, sql, params, batch_size):
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+            out.write("\n")
+        total += len(rows)
+    return total
+
+
+def export_parquet(conn, sql, params, path, batch_size):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet output needs pyarrow (pip install pyarrow)")
+
+    writer = None
+    total = 0
+    try:
+        for columns, rows in iter_batches(conn, sql, params, batch_size):
+            records = [{column: plain(value) for column, value in zip(columns, row)} for row in rows]
+            if writer is None:
+                table = pa.Table.from_pylist(records)
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            else:
+                table = pa.Table.from_pylist(records, schema=writer.schema)
+            writer.write_table(table)
+            total += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export clients or progress data as CSV, NDJSON or Parquet")
+    parser.add_argument("dataset", choices=("clients", "progress"))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output", help="file to write (defaults to stdout; required for parquet)")
+    parser.add_argument("--status", help="progress only: keep rows with this status")
+    parser.add_argument("--category", help="progress only: keep rows with this step category")
+    parser.add_argument("--search", help="progress only: match e-mail, name or step name")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows fetched per round trip")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for parquet")
+
+    sql, params = build_query(args.dataset, args.status, args.category, args.search)
+    # Progress goes to stderr so stdout can carry the export itself.
+    log = sys.stderr
+
+    try:
+        with connection(args.database_url) as conn:
+            if args.format == "parquet":
+                total = export_parquet(conn, sql, params, args.output, args.batch_size)
+            else:
+                out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+                try:
+                    if args.format == "csv":
+                        total = export_csv(conn, sql, params, out)
+                    else:
+                        total = export_ndjson(conn, sql, params, out, args.batch_size)
+                finally:
+                    if args.output:
+                        out.close()
+    except (psycopg2.Error, RuntimeError, ExportError, OSError) as e:
+        print(f"❌ {e}", file=log)
+        return 1
+    finally:
+        close_pool()
+
+    print(f"✅ Exported {total} {args.dataset} rows as {args.format}", file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
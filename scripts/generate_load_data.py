@@ -0,0 +1,432 @@
+"""Generate synthetic users and activity for load and benchmark databases.
+
+Builds N users with skewed, realistic activity across ``auth.users``,
+``user_profiles``, ``user_progress``, ``user_sessions``, ``goals``,
+``habits``, ``habit_entries``, ``daily_reflections`` and
+``user_module_progress``, and streams them into Postgres with COPY.
+
+Users are generated in chunks by a pool of worker processes. Each chunk draws
+from its own random stream seeded by ``(seed, chunk)``, so the same ``--seed``
+and ``--as-of`` always produce the same rows whatever the worker count.
+
+Only columns that exist in the target database are written, so the generator
+follows whichever version of a table the migrations left behind. Run the
+migrations first (``scripts/migrate.py --with-local-shim`` on plain Postgres)
+and seed some modules so module progress has something to point at.
+
+Usage:
+    python scripts/generate_load_data.py --users 20000 --seed 42
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from multiprocessing import Pool
+
+from db import close_pool, connection
+from seed import copy_into, table_columns
+
+# (schema, table) in insert order; children after their parents.
+TABLES = [
+    ("auth", "users"),
+    ("public", "user_profiles"),
+    ("public", "user_progress"),
+    ("public", "user_sessions"),
+    ("public", "goals"),
+    ("public", "habits"),
+    ("public", "habit_entries"),
+    ("public", "daily_reflections"),
+    ("public", "user_module_progress"),
+]
+
+# Maintenance functions run after a load when the migrations have created
+# them. auth.users is loaded without triggers, so anything they feed is
+# rebuilt here; back-dated sessions and habit entries wait in the default
+# partitions until their monthly partitions are created.
+POST_LOAD_FUNCTIONS = ["maintain_time_partitions", "rebuild_analytics_rollups"]
+
+LANGUAGES = [("pt", 0.6), ("es", 0.3), ("en", 0.1)]
+GOAL_CATEGORIES = ["relationship", "personal", "health", "career", "spiritual"]
+GOAL_STATUSES = [("active", 0.5), ("completed", 0.3), ("paused", 0.15), ("cancelled", 0.05)]
+PRIORITIES = [("low", 0.25), ("medium", 0.5), ("high", 0.25)]
+HABIT_FREQUENCIES = [("daily", 0.75), ("weekly", 0.2), ("monthly", 0.05)]
+PROTOCOLS = ["renovacao-protocol", "autoestima-protocol", "comunicacao-protocol", "proposito-protocol"]
+ONBOARDING_STEPS = [
+    ("registro_completado", "onboarding"),
+    ("perfil_basico", "onboarding"),
+    ("evaluacion_inicial", "assessment"),
+    ("objetivos_definidos", "program"),
+    ("primer_plan", "program"),
+]
+PAGES = ["/dashboard", "/modules", "/goals", "/reflections", "/analytics", "/protocol"]
+GOAL_TITLES = [
+    "Meditar todas as manhãs",
+    "Melhorar a comunicação com meu parceiro",
+    "Ler um livro por mês",
+    "Praticar gratidão diariamente",
+    "Definir limites no trabalho",
+    "Cuidar da minha saúde emocional",
+]
+HABIT_NAMES = ["Meditação", "Diário", "Caminhada", "Leitura", "Respiração consciente", "Gratidão"]
+GRATITUDE = [
+    "Sou grata pela minha família",
+    "Agradeço pelo apoio dos meus amigos",
+    "Hoje consegui descansar bem",
+    "Tive uma conversa sincera e leve",
+]
+CHALLENGES = [
+    "Ansiedade antes de uma reunião",
+    "Dificuldade em dizer não",
+    "Pouco tempo para mim",
+    "Discussão difícil em casa",
+]
+INTENTIONS = [
+    "Respirar antes de reagir",
+    "Reservar um tempo para mim",
+    "Praticar a escuta ativa",
+    "Caminhar por 20 minutos",
+]
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def new_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def random_time(rng, start, end):
+    if end <= start:
+        return start
+    return start + timedelta(seconds=rng.uniform(0, (end - start).total_seconds()))
+
+
+def generate_user(rng, index, as_of, days, module_ids, progress_layout):
+    """Return ``{table: [rows]}`` for one user and their activity."""
+    rows = {name: [] for _, name in TABLES}
+    user_id = new_uuid(rng)
+    # Signups grow over time: more users joined recently than at the start.
+    signed_up = as_of - timedelta(days=days * rng.random() ** 1.6, seconds=rng.uniform(0, 86400))
+    # Heavy-tailed engagement: most users are light, a few are very active.
+    engagement = min(rng.paretovariate(1.3) - 1, 20) / 20
+    churned = rng.random() < 0.35
+    last_active = (
+        random_time(rng, signed_up, min(as_of, signed_up + timedelta(days=14))) if churned else as_of
+    )
+    email = f"user{index:07d}@example.test"
+    display_name = f"user{index:07d}"
+
+    rows["users"].append(
+        {
+            "id": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "raw_user_meta_data": {"display_name": display_name},
+            "created_at": signed_up,
+            "updated_at": last_active,
+        }
+    )
+    rows["user_profiles"].append(
+        {
+            "id": new_uuid(rng),
+            "user_id": user_id,
+            "email": email,
+            "display_name": display_name,
+            "language": weighted(rng, LANGUAGES),
+            "created_at": signed_up,
+            "updated_at": last_active,
+        }
+    )
+
+    if progress_layout == "protocol":
+        for protocol_id in rng.sample(PROTOCOLS, rng.randint(1, len(PROTOCOLS))):
+            total = rng.randint(4, 12)
+            done = min(total, int(total * engagement * 3 * rng.random()))
+            status = "completed" if done == total else ("in-progress" if done else "new")
+            started = random_time(rng, signed_up, last_active)
+            rows["user_progress"].append(
+                {
+                    "id": new_uuid(rng),
+                    "user_id": user_id,
+                    "protocol_id": protocol_id,
+                    "status": status,
+                    "progress_percentage": round(done * 100 / total),
+                    "completed_sections": done,
+                    "total_sections": total,
+                    "started_at": started,
+                    "completed_at": random_time(rng, started, last_active) if status == "completed" else None,
+                    "updated_at": random_time(rng, started, last_active),
+                }
+            )
+    else:
+        reached = rng.randint(1, len(ONBOARDING_STEPS))
+        for position, (step_name, step_category) in enumerate(ONBOARDING_STEPS):
+            status = "completed" if position < reached else ("in_progress" if position == reached else "not_started")
+            rows["user_progress"].append(
+                {
+                    "id": new_uuid(rng),
+                    "user_id": user_id,
+                    "step_name": step_name,
+                    "step_category": step_category,
+                    "status": status,
+                    "completion_date": random_time(rng, signed_up, last_active) if status == "completed" else None,
+                    "created_at": signed_up,
+                    "updated_at": random_time(rng, signed_up, last_active),
+                }
+            )
+
+    for _ in range(int(1 + engagement * 120 * rng.random())):
+        start = random_time(rng, signed_up, last_active)
+        duration = max(1, int(rng.lognormvariate(2.3, 0.8)))
+        rows["user_sessions"].append(
+            {
+                "id": new_uuid(rng),
+                "user_id": user_id,
+                "created_at": start,
+                "session_start": start,
+                "session_end": start + timedelta(minutes=duration),
+                "duration_minutes": duration,
+                "pages_visited": rng.sample(PAGES, rng.randint(1, 4)),
+            }
+        )
+
+    for _ in range(rng.randint(0, 2 + int(engagement * 8))):
+        created = random_time(rng, signed_up, last_active)
+        status = weighted(rng, GOAL_STATUSES)
+        rows["goals"].append(
+            {
+                "id": new_uuid(rng),
+                "user_id": user_id,
+                "title": rng.choice(GOAL_TITLES),
+                "category": rng.choice(GOAL_CATEGORIES),
+                "target_date": (created + timedelta(days=rng.randint(14, 180))).date(),
+                "status": status,
+                "priority": weighted(rng, PRIORITIES),
+                "created_at": created,
+                "updated_at": random_time(rng, created, last_active),
+                "completed_at": random_time(rng, created, last_active) if status == "completed" else None,
+            }
+        )
+
+    for _ in range(rng.randint(0, 1 + int(engagement * 5))):
+        habit_id = new_uuid(rng)
+        created = random_time(rng, signed_up, last_active)
+        rows["habits"].append(
+            {
+                "id": habit_id,
+                "user_id": user_id,
+                "name": rng.choice(HABIT_NAMES),
+                "title": rng.choice(HABIT_NAMES),
+                "category": rng.choice(GOAL_CATEGORIES),
+                "frequency": weighted(rng, HABIT_FREQUENCIES),
+                "is_active": not churned and rng.random() < 0.85,
+                "created_at": created,
+                "updated_at": created,
+            }
+        )
+        for entry_date in _streaky_days(rng, created.date(), last_active.date(), 0.4 + engagement * 0.5):
+            rows["habit_entries"].append(
+                {
+                    "id": new_uuid(rng),
+                    "habit_id": habit_id,
+                    "entry_date": entry_date,
+                    "completed_count": 1,
+                    "created_at": datetime.combine(entry_date, dt_time(21), timezone.utc),
+                }
+            )
+
+    mood = rng.gauss(6.5, 1.2)
+    for reflection_date in _streaky_days(rng, signed_up.date(), last_active.date(), 0.3 + engagement * 0.6):
+        mood = min(10, max(1, mood + rng.gauss(0, 0.8)))
+        written = datetime.combine(reflection_date, dt_time(22), timezone.utc)
+        rows["daily_reflections"].append(
+            {
+                "id": new_uuid(rng),
+                "user_id": user_id,
+                "reflection_date": reflection_date,
+                "mood_rating": round(mood),
+                "gratitude_notes": rng.choice(GRATITUDE),
+                "challenges_faced": rng.choice(CHALLENGES) if rng.random() < 0.6 else None,
+                "tomorrow_intentions": rng.choice(INTENTIONS),
+                "created_at": written,
+                "updated_at": written,
+            }
+        )
+
+    # Learners work through the catalog in order and drop off along the way.
+    for position, module_id in enumerate(module_ids):
+        if rng.random() > 0.2 + engagement * 0.8 or (position and rng.random() < 0.25):
+            break
+        started = random_time(rng, signed_up, last_active)
+        completed = rng.random() < 0.4 + engagement * 0.5
+        rows["user_module_progress"].append(
+            {
+                "id": new_uuid(rng),
+                "user_id": user_id,
+                "module_id": module_id,
+                "status": "completed" if completed else "in_progress",
+                "progress_percentage": 100 if completed else rng.randint(5, 95),
+                "started_at": started,
+                "completed_at": random_time(rng, started, last_active) if completed else None,
+                "last_accessed_at": random_time(rng, started, last_active),
+                "created_at": started,
+                "updated_at": random_time(rng, started, last_active),
+            }
+        )
+
+    return rows
+
+
+def _streaky_days(rng, first, last, keep_going):
+    """Yield dates in runs: each day continues the run with ``keep_going`` odds."""
+    day = first
+    active = rng.random() < keep_going
+    while day <= last:
+        if active:
+            yield day
+        active = rng.random() < (keep_going if active else (1 - keep_going) / 3)
+        day += timedelta(days=1)
+
+
+def generate_chunk(task):
+    """Generate and COPY one chunk of users in a single transaction."""
+    chunk, first_index, count, options = task
+    rng = random.Random(f"{options['seed']}:{chunk}")
+    tables = {name: [] for _, name in TABLES}
+    for index in range(first_index, first_index + count):
+        user = generate_user(
+            rng, index, options["as_of"], options["days"], options["module_ids"], options["progress_layout"]
+        )
+        for name, rows in user.items():
+            tables[name].extend(rows)
+
+    from psycopg2 import sql
+
+    counts = Counter()
+    with connection(options["database_url"]) as conn:
+        with conn.cursor() as cursor:
+            for schema, name in TABLES:
+                present = options["columns"].get((schema, name))
+                rows = tables[name]
+                if not present or not rows:
+                    continue
+                if (schema, name) == ("auth", "users"):
+                    # Profiles are generated here, so skip the signup trigger.
+                    cursor.execute("SET LOCAL session_replication_role = replica")
+                columns = [c for c in rows[0] if c in present]
+                array_columns = [c for c in columns if present[c] == "ARRAY"]
+                copy_into(cursor, sql.Identifier(schema, name), columns, rows, array_columns)
+                if (schema, name) == ("auth", "users"):
+                    cursor.execute("SET LOCAL session_replication_role = origin")
+                counts[f"{schema}.{name}"] += len(rows)
+        conn.commit()
+    return counts
+
+
+def inspect_database(database_url):
+    """Read table layouts and module ids once, before the workers start."""
+    with connection(database_url) as conn:
+        with conn.cursor() as cursor:
+            columns = {(schema, name): table_columns(cursor, name, schema) for schema, name in TABLES}
+            module_ids = []
+            cursor.execute("SELECT to_regclass('public.transformation_modules') IS NOT NULL")
+            if cursor.fetchone()[0]:
+                cursor.execute(
+                    "SELECT id::TEXT FROM public.transformation_modules WHERE is_active ORDER BY order_index, id"
+                )
+                module_ids = [module_id for (module_id,) in cursor.fetchall()]
+    return columns, module_ids
+
+
+def refresh_derived_tables(database_url):
+    """Run the post-load maintenance functions, then refresh planner statistics."""
+    from psycopg2 import sql
+
+    with connection(database_url) as conn:
+        with conn.cursor() as cursor:
+            for name in POST_LOAD_FUNCTIONS:
+                cursor.execute("SELECT to_regprocedure(%s) IS NOT NULL", (f"public.{name}()",))
+                if cursor.fetchone()[0]:
+                    cursor.execute(sql.SQL("SELECT public.{}()").format(sql.Identifier(name)))
+                    print(f"🔄 {name}()")
+            cursor.execute("ANALYZE")
+        conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic load data")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="date the data ends at")
+    parser.add_argument("--days", type=int, default=365, help="how far back signups go")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=500, help="users per worker task")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        columns, module_ids = inspect_database(args.database_url)
+    except Exception as e:
+        print(f"❌ Error inspecting database: {e}")
+        return 1
+    finally:
+        # Workers open their own pools; never hand them a forked connection.
+        close_pool()
+
+    for (schema, name), present in columns.items():
+        if not present:
+            print(f"⚠️  {schema}.{name} does not exist, skipping")
+    if not module_ids:
+        print("⚠️  No active transformation_modules, skipping module progress")
+
+    options = {
+        "seed": args.seed,
+        "as_of": datetime.combine(args.as_of, dt_time(), timezone.utc),
+        "days": args.days,
+        "module_ids": module_ids,
+        "progress_layout": "protocol" if "protocol_id" in columns[("public", "user_progress")] else "steps",
+        "columns": columns,
+        "database_url": args.database_url,
+    }
+    tasks = [
+        (chunk, first, min(args.chunk_size, args.users - first), options)
+        for chunk, first in enumerate(range(0, args.users, args.chunk_size))
+    ]
+
+    totals = Counter()
+    try:
+        with Pool(args.workers) as pool:
+            for done, counts in enumerate(pool.imap_unordered(generate_chunk, tasks), 1):
+                totals.update(counts)
+                print(f"📦 {done}/{len(tasks)} chunks, {sum(totals.values()):,} rows", end="\r", flush=True)
+    except Exception as e:
+        print(f"\n❌ Error generating data: {e}")
+        return 1
+
+    print()
+    try:
+        refresh_derived_tables(args.database_url)
+    except Exception as e:
+        print(f"❌ Error refreshing derived tables: {e}")
+        return 1
+    finally:
+        close_pool()
+
+    elapsed = time.perf_counter() - started
+    for table, count in totals.items():
+        print(f"✅ {table}: {count:,} rows")
+    print(f"🎉 {sum(totals.values()):,} rows in {elapsed:.1f}s ({sum(totals.values()) / elapsed:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
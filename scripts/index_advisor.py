@@ -0,0 +1,282 @@
+"""Report missing and unused indexes from the statistics of a running workload.
+
+Reads ``pg_stat_statements`` together with the table and index usage counters.
+Run it against a local database after loading synthetic data and exercising
+the app (or the benchmarks):
+
+    python scripts/generate_load_data.py --users 50000
+    python scripts/index_advisor.py --reset
+    python scripts/benchmark.py
+    python scripts/index_advisor.py
+
+Three reports are printed:
+
+* slow statements: the statements with the highest total time, with the
+  sequential scans and sorts in their (generic) plan and the columns those
+  scans filter on, which are the candidates for a new index;
+* sequential-scan hot spots: large tables read mostly by sequential scans;
+* unused and redundant indexes: non-unique indexes never scanned since the
+  last reset, and indexes whose columns are a prefix of another index.
+
+The tool only reports; it never creates or drops an index.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+import psycopg2
+
+from db import close_pool, connection
+
+# Tables smaller than this are cheap to scan whatever the plan says.
+MIN_TABLE_ROWS = 10_000
+
+# Column names in plan filter expressions, e.g. "(user_id = $1)".
+FILTER_COLUMN = re.compile(r"\(?(?:\w+\.)?(\w+)\)?\s*(?:=|<|>|<=|>=|IS|~~|ANY)\s")
+
+SLOW_STATEMENTS_SQL = """
+SELECT query, calls, total_exec_time, mean_exec_time, rows
+FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+  AND calls >= %s
+  AND query !~* '^\\s*(BEGIN|COMMIT|ROLLBACK|SET|SHOW|RESET|EXPLAIN|ANALYZE|VACUUM|CREATE|ALTER|DROP|COPY)'
+  AND query !~* 'pg_stat_|pg_catalog\\.'
+ORDER BY total_exec_time DESC
+LIMIT %s
+"""
+
+SEQ_SCAN_SQL = """
+SELECT schemaname, relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup,
+       pg_size_pretty(pg_relation_size(relid))
+FROM pg_stat_user_tables
+WHERE n_live_tup >= %s
+  AND seq_scan > COALESCE(idx_scan, 0)
+ORDER BY seq_tup_read DESC
+"""
+
+UNUSED_INDEXES_SQL = """
+SELECT s.schemaname, s.relname, s.indexrelname, pg_relation_size(s.indexrelid),
+       pg_size_pretty(pg_relation_size(s.indexrelid))
+FROM pg_stat_user_indexes s
+JOIN pg_index i ON i.indexrelid = s.indexrelid
+WHERE s.idx_scan = 0
+  AND NOT i.indisunique
+  AND NOT i.indisprimary
+  AND s.schemaname NOT IN ('pg_catalog', 'information_schema')
+ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+INDEX_COLUMNS_SQL = """
+SELECT n.nspname, t.relname, c.relname, i.indisunique,
+       (i.indkey::int2[])[0:i.indnkeyatts - 1]::int[], i.indpred IS NOT NULL, pg_get_indexdef(i.indexrelid)
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_class t ON t.oid = i.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+"""
+
+
+def has_pg_stat_statements(cursor):
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    return cursor.fetchone() is not None
+
+
+def reset_statistics(cursor):
+    """Start a fresh measurement window."""
+    if has_pg_stat_statements(cursor):
+        cursor.execute("SELECT pg_stat_statements_reset()")
+    cursor.execute("SELECT pg_stat_reset()")
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def filter_columns(expression):
+    return sorted(set(FILTER_COLUMN.findall(expression or "")))
+
+
+def generic_plan(cursor, query):
+    """EXPLAIN a normalized statement (``$1`` placeholders), or None.
+
+    GENERIC_PLAN needs PostgreSQL 16; on older servers only statements
+    without parameters can be explained.
+    """
+    options = "FORMAT JSON, GENERIC_PLAN" if "$1" in query else "FORMAT JSON"
+    cursor.execute("SAVEPOINT advisor_explain")
+    try:
+        cursor.execute(f"EXPLAIN ({options}) {query}")
+        plan = cursor.fetchone()[0][0]["Plan"]
+    except psycopg2.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT advisor_explain")
+        return None
+    cursor.execute("RELEASE SAVEPOINT advisor_explain")
+    return plan
+
+
+def plan_findings(plan, large_tables):
+    """Sequential scans of large tables and explicit sorts in a plan."""
+    findings = []
+    for node in plan_nodes(plan):
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in large_tables:
+            columns = filter_columns(node.get("Filter"))
+            hint = f" filtering on {', '.join(columns)}" if columns else ""
+            findings.append(f"seq scan on {node['Relation Name']}{hint}")
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            findings.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+    return findings
+
+
+def slow_statements(cursor, top, min_calls, large_tables):
+    cursor.execute(SLOW_STATEMENTS_SQL, (min_calls, top))
+    report = []
+    for query, calls, total_ms, mean_ms, rows in cursor.fetchall():
+        plan = generic_plan(cursor, query)
+        report.append({
+            "query": " ".join(query.split()),
+            "calls": calls,
+            "total_ms": round(total_ms, 1),
+            "mean_ms": round(mean_ms, 3),
+            "rows": rows,
+            "findings": plan_findings(plan, large_tables) if plan else ["plan unavailable"],
+        })
+    return report
+
+
+def seq_scan_hot_spots(cursor, min_rows):
+    cursor.execute(SEQ_SCAN_SQL, (min_rows,))
+    return [
+        {
+            "table": f"{schema}.{table}",
+            "seq_scan": seq_scan,
+            "avg_rows_per_seq_scan": seq_tup_read // max(seq_scan, 1),
+            "idx_scan": idx_scan,
+            "live_rows": live_rows,
+            "size": size,
+        }
+        for schema, table, seq_scan, seq_tup_read, idx_scan, live_rows, size in cursor.fetchall()
+    ]
+
+
+def unused_indexes(cursor):
+    cursor.execute(UNUSED_INDEXES_SQL)
+    return [
+        {"index": f"{schema}.{index}", "table": table, "bytes": size_bytes, "size": size}
+        for schema, table, index, size_bytes, size in cursor.fetchall()
+    ]
+
+
+def redundant_indexes(cursor):
+    """Non-unique, non-partial indexes whose key columns prefix another index."""
+    cursor.execute(INDEX_COLUMNS_SQL)
+    by_table = {}
+    for schema, table, index, unique, columns, partial, definition in cursor.fetchall():
+        by_table.setdefault((schema, table), []).append((index, unique, columns, partial, definition))
+
+    report = []
+    for (schema, table), indexes in by_table.items():
+        for index, unique, columns, partial, _ in indexes:
+            if unique or partial or 0 in columns:
+                continue
+            for other, other_unique, other_columns, other_partial, definition in indexes:
+                if other == index or other_partial or other_columns[: len(columns)] != columns:
+                    continue
+                # Identical column lists: keep the unique one, else the first by name.
+                if len(other_columns) > len(columns) or other_unique or other < index:
+                    report.append({"index": f"{schema}.{index}", "covered_by": definition})
+                    break
+    return report
+
+
+def print_report(report):
+    print("\n🐢 Slowest statements")
+    if report["statements"] is None:
+        print("   ⚠️  pg_stat_statements is not installed; add it to shared_preload_libraries and")
+        print("      run CREATE EXTENSION pg_stat_statements")
+    elif not report["statements"]:
+        print("   (no statements recorded yet)")
+    for statement in report["statements"] or []:
+        print(
+            f"   {statement['total_ms']:>10.1f} ms total  {statement['mean_ms']:>8.2f} ms mean"
+            f"  {statement['calls']:>7} calls  {statement['query'][:100]}"
+        )
+        for finding in statement["findings"]:
+            print(f"      ↳ {finding}")
+
+    print("\n🔍 Large tables read mostly by sequential scans (missing index?)")
+    if not report["seq_scans"]:
+        print("   (none)")
+    for table in report["seq_scans"]:
+        print(
+            f"   {table['table']:<40} seq {table['seq_scan']:>8}  idx {table['idx_scan']:>8}"
+            f"  ~{table['avg_rows_per_seq_scan']} rows/scan  {table['size']}"
+        )
+
+    print("\n🗑️  Indexes never scanned since the last reset")
+    if not report["unused"]:
+        print("   (none)")
+    for index in report["unused"]:
+        print(f"   {index['index']:<50} on {index['table']:<30} {index['size']}")
+
+    print("\n♻️  Redundant indexes (a prefix of another index)")
+    if not report["redundant"]:
+        print("   (none)")
+    for index in report["redundant"]:
+        print(f"   {index['index']:<50} covered by: {index['covered_by']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report missing and unused indexes")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--top", type=int, default=20, help="number of statements to report")
+    parser.add_argument("--min-calls", type=int, default=5, help="ignore statements called fewer times")
+    parser.add_argument("--min-rows", type=int, default=MIN_TABLE_ROWS, help="smallest table worth an index")
+    parser.add_argument("--reset", action="store_true", help="reset the statistics and exit")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        with connection(args.database_url) as conn:
+            with conn.cursor() as cursor:
+                if args.reset:
+                    reset_statistics(cursor)
+                    conn.commit()
+                    print("✅ Statistics reset; run the workload, then run this tool again")
+                    return 0
+
+                seq_scans = seq_scan_hot_spots(cursor, args.min_rows)
+                cursor.execute(
+                    "SELECT relname FROM pg_stat_user_tables WHERE n_live_tup >= %s", (args.min_rows,)
+                )
+                large_tables = {row[0] for row in cursor.fetchall()}
+                report = {
+                    "statements": (
+                        slow_statements(cursor, args.top, args.min_calls, large_tables)
+                        if has_pg_stat_statements(cursor)
+                        else None
+                    ),
+                    "seq_scans": seq_scans,
+                    "unused": unused_indexes(cursor),
+                    "redundant": redundant_indexes(cursor),
+                }
+            conn.rollback()
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
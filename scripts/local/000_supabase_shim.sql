@@ -0,0 +1,56 @@
+-- Minimal stand-in for the Supabase auth schema on a plain local Postgres.
+-- Lets the numbered migrations, the load-data generator and the benchmarks
+-- run without a Supabase stack. Never apply this to a Supabase project.
+-- Applied by: python scripts/migrate.py --with-local-shim
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    CREATE ROLE service_role NOLOGIN BYPASSRLS;
+  END IF;
+END
+$$;
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE SCHEMA IF NOT EXISTS auth;
+GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  aud TEXT DEFAULT 'authenticated',
+  role TEXT DEFAULT 'authenticated',
+  email TEXT,
+  raw_user_meta_data JSONB DEFAULT '{}',
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Same contract as Supabase: claims come from the request.jwt.claims setting,
+-- e.g. SET LOCAL request.jwt.claims = '{"sub": "<uuid>", "role": "authenticated"}'
+CREATE OR REPLACE FUNCTION auth.jwt()
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT COALESCE(NULLIF(current_setting('request.jwt.claims', true), ''), '{}')::JSONB
+$$;
+
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS UUID
+LANGUAGE sql STABLE
+AS $$
+  SELECT NULLIF(auth.jwt() ->> 'sub', '')::UUID
+$$;
+
+CREATE OR REPLACE FUNCTION auth.role()
+RETURNS TEXT
+LANGUAGE sql STABLE
+AS $$
+  SELECT auth.jwt() ->> 'role'
+$$;
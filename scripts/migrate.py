@@ -0,0 +1,259 @@
+"""Apply the numbered ``scripts/0NN_*.sql`` files to a Postgres database.
+
+Applied files are recorded in ``public.schema_migrations``. Each pending file
+is sent to the server as a single batch and committed in the same transaction
+as its ledger row, so a fresh database is provisioned in a few round trips
+per file and a failing file leaves nothing half-applied.
+
+One-off scripts from before the runner (diagnostics, hand-written data
+fixes, a default admin login) live in ``scripts/legacy/`` and are never
+applied. The remaining early files were made re-runnable on top of each
+other, so ``--with-local-shim`` on an empty Postgres applies every file.
+
+A database provisioned by running the scripts by hand has no ledger yet.
+Record what it already has once with ``--baseline <last script applied>``
+(usually ``019_simple_modules_table``) before the first normal run; without
+that the runner would replay every file against it. ``--status`` reports
+files edited since they were applied as "changed since applied"; they are
+not re-run.
+
+Usage:
+    python scripts/migrate.py                 # apply pending migrations
+    python scripts/migrate.py --dry-run       # apply, time and roll back
+    python scripts/migrate.py --status        # list applied / pending files
+    python scripts/migrate.py --baseline 019_simple_modules_table
+    python scripts/migrate.py --with-local-shim   # plain Postgres, no Supabase
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from db import close_pool, connection
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+LOCAL_SHIM_DIR = SCRIPTS_DIR / "local"
+MIGRATION_PATTERN = re.compile(r"^\d{3}_[\w-]+\.sql$")
+
+# Arbitrary constant shared by every runner so two deploys never interleave.
+ADVISORY_LOCK_KEY = 72_010_001
+
+LEDGER_SQL = """
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+  version TEXT PRIMARY KEY,
+  checksum TEXT NOT NULL,
+  duration_ms INTEGER,
+  applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+Migration = namedtuple("Migration", ["version", "path", "sql", "checksum"])
+
+
+def discover_migrations(directory=SCRIPTS_DIR):
+    """Return every migration file in ``directory`` in apply order.
+
+    Several files share a number (``005_``, ``006_``, ``017_``), so the full
+    file stem is the version and files are ordered by name.
+    """
+    migrations = []
+    for path in sorted(directory.iterdir()):
+        if not MIGRATION_PATTERN.match(path.name):
+            continue
+        sql = path.read_text(encoding="utf-8")
+        checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+        migrations.append(Migration(path.stem, path, sql, checksum))
+    return migrations
+
+
+def fetch_applied(cursor):
+    """Return ``{version: checksum}`` for every migration in the ledger."""
+    cursor.execute("SELECT version, checksum FROM public.schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def pending_migrations(migrations, applied, target=None):
+    """Return the migrations not yet in the ledger, stopping at ``target``."""
+    pending = []
+    for migration in migrations:
+        if migration.version not in applied:
+            pending.append(migration)
+        if target and migration.version == target:
+            break
+    return pending
+
+
+def apply_pending(conn, pending):
+    """Apply each migration in its own transaction and record it.
+
+    Stops at the first failure and returns ``(results, error)``.
+    """
+    results = []
+    with conn.cursor() as cursor:
+        for migration in pending:
+            started = time.perf_counter()
+            try:
+                cursor.execute(migration.sql)
+                elapsed_ms = int((time.perf_counter() - started) * 1000)
+                cursor.execute(
+                    "INSERT INTO public.schema_migrations (version, checksum, duration_ms) VALUES (%s, %s, %s)",
+                    (migration.version, migration.checksum, elapsed_ms),
+                )
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                return results, (migration, e)
+            results.append((migration, elapsed_ms, None))
+    return results, None
+
+
+def dry_run_pending(conn, pending):
+    """Apply every pending migration inside one transaction, then roll back.
+
+    Each file runs under its own savepoint so a failure is reported and the
+    remaining files are still timed against the schema built so far.
+    """
+    results = []
+    with conn.cursor() as cursor:
+        for migration in pending:
+            cursor.execute("SAVEPOINT migration")
+            started = time.perf_counter()
+            try:
+                cursor.execute(migration.sql)
+                error = None
+            except psycopg2.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT migration")
+                error = e
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute("RELEASE SAVEPOINT migration")
+            results.append((migration, elapsed_ms, error))
+    conn.rollback()
+    return results
+
+
+def record_baseline(conn, migrations, baseline):
+    """Mark every migration up to ``baseline`` as applied without running it.
+
+    For databases where the scripts were run by hand before the ledger existed.
+    """
+    versions = [m.version for m in migrations]
+    if baseline not in versions:
+        raise ValueError(f"Unknown migration: {baseline}")
+    rows = [(m.version, m.checksum, None) for m in migrations[: versions.index(baseline) + 1]]
+    with conn.cursor() as cursor:
+        execute_values(
+            cursor,
+            "INSERT INTO public.schema_migrations (version, checksum, duration_ms) VALUES %s "
+            "ON CONFLICT (version) DO NOTHING",
+            rows,
+        )
+    conn.commit()
+    return len(rows)
+
+
+def print_results(results):
+    for migration, elapsed_ms, error in results:
+        status = "❌" if error else "✅"
+        print(f"{status} {migration.version:<45} {elapsed_ms:>7} ms")
+        if error:
+            print(f"   {str(error).strip()}")
+
+
+def print_status(migrations, applied):
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is None:
+            state = "pending"
+        elif checksum != migration.checksum:
+            state = "changed since applied"
+        else:
+            state = "applied"
+        print(f"{migration.version:<45} {state}")
+
+
+def migrate(database_url=None, dry_run=False, status=False, target=None, baseline=None, local_shim=False):
+    migrations = discover_migrations()
+    if local_shim:
+        migrations = discover_migrations(LOCAL_SHIM_DIR) + migrations
+    if target and target not in {m.version for m in migrations}:
+        print(f"❌ Unknown migration: {target}")
+        return False
+
+    with connection(database_url) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+            cursor.execute(LEDGER_SQL)
+            applied = fetch_applied(cursor)
+        conn.commit()
+
+        try:
+            if status:
+                print_status(migrations, applied)
+                return True
+
+            if baseline:
+                count = record_baseline(conn, migrations, baseline)
+                print(f"📌 Marked {count} migrations as applied")
+                return True
+
+            pending = pending_migrations(migrations, applied, target)
+            if not pending:
+                print("✅ Database is up to date")
+                return True
+
+            if dry_run:
+                print(f"🧪 Dry run of {len(pending)} migrations (rolled back)")
+                results = dry_run_pending(conn, pending)
+                print_results(results)
+                total_ms = sum(elapsed for _, elapsed, _ in results)
+                print(f"⏱️  Total: {total_ms} ms")
+                return not any(error for _, _, error in results)
+
+            print(f"🚀 Applying {len(pending)} migrations")
+            results, failure = apply_pending(conn, pending)
+            print_results(results)
+            if failure:
+                migration, error = failure
+                print_results([(migration, 0, error)])
+                return False
+            print("🎉 Migrations applied successfully!")
+            return True
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+            conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--dry-run", action="store_true", help="apply pending migrations, report timings and roll back")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--target", help="stop after this migration version")
+    parser.add_argument("--baseline", metavar="VERSION", help="mark migrations up to VERSION as applied without running them")
+    parser.add_argument(
+        "--with-local-shim",
+        action="store_true",
+        help="first apply scripts/local/*.sql (auth schema stand-in for plain Postgres)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        ok = migrate(args.database_url, args.dry_run, args.status, args.target, args.baseline, args.with_local_shim)
+    except (psycopg2.Error, RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        ok = False
+    finally:
+        close_pool()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Maintain the monthly partitions of user_sessions and habit_entries.
+
+034_time_partitioning.sql partitions both tables by month (UTC). This tool
+keeps them in shape:
+
+* ``status`` lists every partition with its size and estimated rows, and how
+  many rows are waiting in the default partition;
+* ``ensure`` creates the partitions for the coming months and moves waiting
+  rows out of the default partition (pg_cron does the same daily, where it
+  is installed), then reports rows it could not place: rows for a month
+  whose partition was detached but kept. Drop that table (its rows are
+  archived) and run ``ensure`` again to give them a fresh partition;
+* ``compact`` folds months older than ``--sessions-months`` /
+  ``--habit-months`` into the daily ``*_daily_archive`` tables and detaches
+  them, one transaction per month.
+  Detached partitions stay around as plain tables unless ``--drop`` is given.
+
+Archived habit days only keep per-user totals, so streaks recomputed later
+start from the oldest month still attached.
+
+Usage:
+    python scripts/partition_maintenance.py status
+    python scripts/partition_maintenance.py ensure
+    python scripts/partition_maintenance.py compact --dry-run
+    python scripts/partition_maintenance.py compact --sessions-months 6 --drop
+"""
+
+import argparse
+import re
+import sys
+from collections import namedtuple
+from datetime import date, datetime, timezone
+
+import psycopg2
+
+from db import close_pool, connection
+
+# ``archive_sql`` aggregates one partition (``{partition}``) into its archive
+# table; re-archiving the same day adds to what is already there.
+Partitioned = namedtuple("Partitioned", ["key_column", "keep_months", "archive_sql"])
+
+TABLES = {
+    "user_sessions": Partitioned(
+        "session_start",
+        12,
+        """
+        INSERT INTO public.user_sessions_daily_archive
+          (day, user_id, sessions, session_minutes, timed_sessions, last_session_at)
+        SELECT public.analytics_day(session_start), user_id, COUNT(*),
+               COALESCE(SUM(duration_minutes), 0), COUNT(duration_minutes), MAX(session_start)
+        FROM public.{partition}
+        GROUP BY 1, 2
+        ON CONFLICT (day, user_id) DO UPDATE SET
+          sessions = user_sessions_daily_archive.sessions + EXCLUDED.sessions,
+          session_minutes = user_sessions_daily_archive.session_minutes + EXCLUDED.session_minutes,
+          timed_sessions = user_sessions_daily_archive.timed_sessions + EXCLUDED.timed_sessions,
+          last_session_at = GREATEST(user_sessions_daily_archive.last_session_at, EXCLUDED.last_session_at)
+        """,
+    ),
+    "habit_entries": Partitioned(
+        "entry_date",
+        24,
+        """
+        INSERT INTO public.habit_entries_daily_archive
+          (day, user_id, habits_logged, habits_completed, completions)
+        SELECT e.entry_date, h.user_id, COUNT(*),
+               COUNT(*) FILTER (WHERE e.completed_count > 0), COALESCE(SUM(e.completed_count), 0)
+        FROM public.{partition} e
+        JOIN public.habits h ON h.id = e.habit_id
+        GROUP BY 1, 2
+        ON CONFLICT (day, user_id) DO UPDATE SET
+          habits_logged = habit_entries_daily_archive.habits_logged + EXCLUDED.habits_logged,
+          habits_completed = habit_entries_daily_archive.habits_completed + EXCLUDED.habits_completed,
+          completions = habit_entries_daily_archive.completions + EXCLUDED.completions
+        """,
+    ),
+}
+
+PARTITIONS_SQL = """
+SELECT c.relname,
+       pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' AS is_default,
+       pg_total_relation_size(c.oid) AS bytes,
+       GREATEST(c.reltuples, 0)::BIGINT AS estimated_rows
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = %s::REGCLASS
+ORDER BY c.relname
+"""
+
+
+class PartitionError(Exception):
+    pass
+
+
+def partition_month(name, table):
+    """Return the first day of the month a ``<table>_YYYY_MM`` partition holds."""
+    match = re.fullmatch(rf"{re.escape(table)}_(\d{{4}})_(\d{{2}})", name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def months_before(day, months):
+    """First day of the month ``months`` months before the month of ``day``."""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def list_partitions(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, (f"public.{table}",))
+        rows = cursor.fetchall()
+    conn.commit()
+    return rows
+
+
+def default_rows(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", (f"public.{table}_default",))
+        if cursor.fetchone()[0] is None:
+            raise PartitionError(f"{table} is not partitioned yet (run 034_time_partitioning.sql)")
+        cursor.execute(f"SELECT COUNT(*) FROM public.{table}_default")
+        count = cursor.fetchone()[0]
+    conn.commit()
+    return count
+
+
+def waiting_months(conn, table):
+    """Return ``[(month, rows)]`` for the rows in the default partition."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT date_trunc('month', {TABLES[table].key_column})::DATE, COUNT(*) "
+            f"FROM public.{table}_default GROUP BY 1 ORDER BY 1"
+        )
+        rows = cursor.fetchall()
+    conn.commit()
+    return rows
+
+
+def show_status(conn):
+    for table in TABLES:
+        waiting = default_rows(conn, table)
+        partitions = [row for row in list_partitions(conn, table) if not row[1]]
+        total = sum(row[2] for row in partitions)
+        print(f"📦 {table}: {len(partitions)} monthly partitions, {total / 1024 / 1024:.1f} MB")
+        for name, _, size, rows in partitions:
+            print(f"   {name:<32} {size / 1024 / 1024:>9.1f} MB  ~{rows} rows")
+        if waiting:
+            print(f"⚠️  {waiting} rows in {table}_default are waiting for their partition (run ensure)")
+
+
+def ensure(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT public.maintain_time_partitions()")
+        created = cursor.fetchone()[0]
+    conn.commit()
+    print(f"✅ Created {created} partitions")
+
+    # Whatever is still in a default partition belongs to a month that
+    # could not get a partition.
+    for table in TABLES:
+        for month, rows in waiting_months(conn, table):
+            name = f"{table}_{month:%Y_%m}"
+            print(
+                f"⚠️  {rows} rows in {table}_default could not be placed: {name} exists but is not attached "
+                "(drop it once archived and run ensure again)"
+            )
+
+
+def compact(conn, keep, drop=False, dry_run=False):
+    """Archive and detach every partition older than its table's cutoff."""
+    today = datetime.now(timezone.utc).date()
+    compacted = 0
+    for table, spec in TABLES.items():
+        cutoff = months_before(today, keep[table])
+        months = {name: partition_month(name, table) for name, *_ in list_partitions(conn, table)}
+        expired = sorted(name for name, month in months.items() if month is not None and month < cutoff)
+        for name in expired:
+            if dry_run:
+                print(f"🔄 Would archive and detach {name}")
+                continue
+            with conn.cursor() as cursor:
+                cursor.execute(spec.archive_sql.format(partition=name))
+                archived = cursor.rowcount
+                cursor.execute(f"ALTER TABLE public.{table} DETACH PARTITION public.{name}")
+                if drop:
+                    cursor.execute(f"DROP TABLE public.{name}")
+            conn.commit()
+            compacted += 1
+            print(f"✅ {name}: {archived} daily rows archived, partition {'dropped' if drop else 'detached'}")
+    return compacted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of user_sessions and habit_entries")
+    parser.add_argument("command", choices=("status", "ensure", "compact"))
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument(
+        "--sessions-months", type=int, default=TABLES["user_sessions"].keep_months,
+        help="compact: months of user_sessions kept attached",
+    )
+    parser.add_argument(
+        "--habit-months", type=int, default=TABLES["habit_entries"].keep_months,
+        help="compact: months of habit_entries kept attached",
+    )
+    parser.add_argument("--drop", action="store_true", help="compact: drop partitions once detached")
+    parser.add_argument("--dry-run", action="store_true", help="compact: list what would be compacted")
+    args = parser.parse_args(argv)
+
+    keep = {"user_sessions": args.sessions_months, "habit_entries": args.habit_months}
+    if min(keep.values()) < 1:
+        parser.error("at least one month must stay attached")
+
+    try:
+        with connection(args.database_url) as conn:
+            if args.command == "status":
+                show_status(conn)
+            elif args.command == "ensure":
+                ensure(conn)
+            else:
+                # Months about to be detached must not have rows stuck in
+                # the default partition.
+                if not args.dry_run:
+                    ensure(conn)
+                compacted = compact(conn, keep, drop=args.drop, dry_run=args.dry_run)
+                if not args.dry_run:
+                    print(f"🎉 Compacted {compacted} partitions")
+    except (psycopg2.Error, RuntimeError, PartitionError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
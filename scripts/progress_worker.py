@@ -0,0 +1,170 @@
+"""Apply queued progress events to user_module_progress in micro-batches.
+
+/api/progress/events appends module-page events (heartbeats, progress steps,
+notes) to ``progress_events``. Each batch is claimed with
+``DELETE ... FOR UPDATE SKIP LOCKED RETURNING``, coalesced to one change per
+(user_id, module_id) (the latest value of each field wins, in arrival order)
+and written with one multi-row ``INSERT ... ON CONFLICT DO UPDATE`` in the
+same transaction, so an event is applied exactly once or not at all.
+Several workers can run side by side. Each row keeps, per field, the id of
+the last event applied to it (039_progress_event_order.sql), and a field is
+only overwritten by a newer event, so batches committed out of order never
+roll a field back or drop one. A batch that fails on a dropped connection, a
+deadlock or a serialization failure is retried on a fresh connection; its
+events were never deleted, so nothing is lost or applied twice.
+
+Usage:
+    python scripts/progress_worker.py              # run until interrupted
+    python scripts/progress_worker.py --once       # drain the queue and exit
+"""
+
+import argparse
+import sys
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from db import close_pool, execute_prepared, run_with_retry
+
+FIELDS = ("status", "progress_percentage", "notes")
+
+CLAIM_SQL = """
+DELETE FROM public.progress_events
+WHERE id IN (
+  SELECT id FROM public.progress_events
+  ORDER BY id
+  LIMIT %s
+  FOR UPDATE SKIP LOCKED
+)
+RETURNING id, user_id, module_id, status, progress_percentage, notes, created_at
+"""
+
+# Each field carries the id of the last event that set it, and a field is
+# only overwritten by a newer one. Fields absent from a change are sent with
+# id 0, so they never win: a heartbeat never resets progress, a notes save
+# never touches the status, and a batch committed after a newer one still
+# applies the fields that batch did not cover.
+UPSERT_SQL = """
+INSERT INTO public.user_module_progress AS t
+  (user_id, module_id, status, progress_percentage, notes, last_accessed_at, started_at, completed_at,
+   status_event_id, progress_event_id, notes_event_id)
+VALUES %s
+ON CONFLICT (user_id, module_id) DO UPDATE SET
+  last_accessed_at = GREATEST(t.last_accessed_at, EXCLUDED.last_accessed_at),
+  updated_at = NOW(),
+  status = CASE WHEN t.status_event_id < EXCLUDED.status_event_id
+                THEN EXCLUDED.status ELSE t.status END,
+  completed_at = CASE WHEN t.status_event_id < EXCLUDED.status_event_id
+                      THEN CASE WHEN EXCLUDED.status = 'completed'
+                                THEN COALESCE(t.completed_at, EXCLUDED.completed_at) END
+                      ELSE t.completed_at END,
+  status_event_id = GREATEST(t.status_event_id, EXCLUDED.status_event_id),
+  progress_percentage = CASE WHEN t.progress_event_id < EXCLUDED.progress_event_id
+                             THEN EXCLUDED.progress_percentage ELSE t.progress_percentage END,
+  progress_event_id = GREATEST(t.progress_event_id, EXCLUDED.progress_event_id),
+  notes = CASE WHEN t.notes_event_id < EXCLUDED.notes_event_id
+               THEN EXCLUDED.notes ELSE t.notes END,
+  notes_event_id = GREATEST(t.notes_event_id, EXCLUDED.notes_event_id)
+"""
+
+
+def coalesce(events):
+    """Fold events into ``{(user_id, module_id): {"fields", "event_ids", "accessed"}}``.
+
+    ``fields`` holds the latest value of each field and ``event_ids`` the id
+    of the event it came from.
+    """
+    changes = {}
+    for event_id, user_id, module_id, status, progress, notes, created_at in sorted(events):
+        change = changes.setdefault((user_id, module_id), {"fields": {}, "event_ids": {}, "accessed": created_at})
+        for field, value in zip(FIELDS, (status, progress, notes)):
+            if value is not None:
+                change["fields"][field] = value
+                change["event_ids"][field] = event_id
+        change["accessed"] = max(change["accessed"], created_at)
+    return changes
+
+
+def apply_changes(cursor, changes):
+    """Upsert coalesced changes in one statement; return the statement count.
+
+    Rows go in (user_id, module_id) order, so two workers upserting the same
+    rows lock them in the same order instead of deadlocking each other.
+    """
+    rows = []
+    for (user_id, module_id), change in sorted(changes.items(), key=lambda item: item[0]):
+        fields, event_ids, accessed = change["fields"], change["event_ids"], change["accessed"]
+        status = fields.get("status", "in_progress")
+        rows.append(
+            (
+                user_id,
+                module_id,
+                status,
+                fields.get("progress_percentage", 0),
+                fields.get("notes"),
+                accessed,
+                accessed,
+                accessed if status == "completed" else None,
+                event_ids.get("status", 0),
+                event_ids.get("progress_percentage", 0),
+                event_ids.get("notes", 0),
+            )
+        )
+    if not rows:
+        return 0
+    execute_values(cursor, UPSERT_SQL, rows, page_size=len(rows))
+    return 1
+
+
+def drain_once(conn, batch_size):
+    """Claim and apply one batch; return ``(events, rows, statements)``."""
+    with conn.cursor() as cursor:
+        execute_prepared(cursor, "claim_progress_events", CLAIM_SQL, (batch_size,))
+        events = cursor.fetchall()
+        if not events:
+            conn.rollback()
+            return 0, 0, 0
+        changes = coalesce(events)
+        statements = apply_changes(cursor, changes)
+    conn.commit()
+    return len(events), len(changes), statements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply queued progress events in coalesced batches")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--batch-size", type=int, default=1000, help="events claimed per transaction")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds to wait when the queue is empty")
+    parser.add_argument("--once", action="store_true", help="drain the queue and exit")
+    args = parser.parse_args(argv)
+
+    total_events = total_rows = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            events, rows, statements = run_with_retry(lambda conn: drain_once(conn, args.batch_size), args.database_url)
+            if events:
+                total_events += events
+                total_rows += rows
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                print(f"✅ {events} events → {rows} rows in {statements} statements ({elapsed_ms:.0f} ms)")
+                continue
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    if total_events:
+        print(f"🎉 Applied {total_events} events as {total_rows} row writes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
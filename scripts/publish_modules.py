@@ -0,0 +1,280 @@
+"""Publish modules as pre-rendered, content-addressed JSON bundles.
+
+Each active module and its active sections are compiled into one bundle:
+markdown rendered to HTML, video links turned into embed URLs and related
+links extracted, so the module page does no parsing. A bundle is named after
+the SHA-256 of its canonical JSON (``<module_id>/<hash>.json``), which makes it
+immutable and safe to cache forever.
+
+Bundles are written to ``--out`` with ``.gz`` and ``.br`` variants (for hosts
+that serve precompressed files), uploaded to the public ``module-bundles``
+storage bucket and recorded in ``module_bundles`` together with the content
+version they were built from.
+
+Usage:
+    python scripts/publish_modules.py                    # every active module
+    python scripts/publish_modules.py --module <id>      # just one
+    python scripts/publish_modules.py --watch            # republish on every save
+
+``--watch`` listens for the notifications the content-version triggers send
+on every content-editor save and republishes the modules that changed.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import select
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+from db import close_pool, connect, connection, supabase_session
+
+BUCKET = "module-bundles"
+CHANNEL = "module_content_changed"
+DEFAULT_OUT = Path(__file__).resolve().parent / "bundles"
+
+# Saves usually come in bursts (module, then each section); wait this long
+# after the last notification before publishing.
+WATCH_DEBOUNCE_SECONDS = 2.0
+
+# The same patterns the module page used to apply in the browser.
+VIDEO_PATTERN = re.compile(
+    r"(https?://)?(www\.)?(youtube\.com/watch\?v=|youtu\.be/|vimeo\.com/|player\.vimeo\.com/video/)([a-zA-Z0-9_-]+)"
+)
+LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+
+MODULE_FIELDS = ("id", "title", "description", "category", "difficulty_level", "estimated_duration_minutes")
+SECTION_FIELDS = ("id", "title", "section_type", "order_index", "estimated_duration_minutes")
+
+
+class PublishError(Exception):
+    pass
+
+
+def render_markdown(text):
+    try:
+        import markdown
+    except ImportError:
+        raise PublishError("Python-Markdown is required to publish modules (pip install markdown)")
+    return markdown.markdown(text, extensions=["extra", "sane_lists"])
+
+
+def embed_url(match):
+    """Embed URL for a video link, as the module page builds it."""
+    kind, video_id = match.group(3), match.group(4)
+    if "youtube" in kind or "youtu.be" in kind:
+        return f"https://www.youtube.com/embed/{video_id}"
+    return f"https://player.vimeo.com/video/{video_id}"
+
+
+def build_bundle(module, sections, version):
+    """Return ``(bundle, canonical_bytes, content_hash)`` for one module."""
+    bundle = {
+        "module": {field: module[field] for field in MODULE_FIELDS},
+        "version": version,
+        "sections": [
+            {
+                **{field: section[field] for field in SECTION_FIELDS},
+                "html": render_markdown(section["content"]),
+                "videos": [embed_url(m) for m in VIDEO_PATTERN.finditer(section["content"])],
+                "links": [{"text": t, "href": h} for t, h in LINK_PATTERN.findall(section["content"])],
+            }
+            for section in sections
+        ],
+    }
+    body = json.dumps(bundle, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    return bundle, body, hashlib.sha256(body).hexdigest()[:20]
+
+
+def compress(body):
+    """Return ``{suffix: bytes}`` for the precompressed variants available."""
+    variants = {".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        print("⚠️  brotli not installed; skipping .br variants (pip install brotli)")
+    else:
+        variants[".br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def load_modules(cursor, module_ids=None):
+    """Active modules with their sections and current content version.
+
+    Read in one REPEATABLE READ snapshot so the version matches the content.
+    """
+    cursor.execute(
+        f"""
+        SELECT m.id::text, {', '.join('m.' + f for f in MODULE_FIELDS[1:])}, COALESCE(v.version, 0)
+        FROM public.transformation_modules m
+        LEFT JOIN public.module_content_versions v ON v.module_id = m.id
+        WHERE m.is_active = true AND (%(ids)s::uuid[] IS NULL OR m.id = ANY(%(ids)s::uuid[]))
+        ORDER BY m.order_index
+        """,
+        {"ids": module_ids},
+    )
+    modules = {}
+    for row in cursor.fetchall():
+        modules[row[0]] = {"module": dict(zip(MODULE_FIELDS, row[:-1])), "version": row[-1], "sections": []}
+
+    cursor.execute(
+        """
+        SELECT module_id::text, id::text, title, section_type, order_index, estimated_duration_minutes, content
+        FROM public.module_sections
+        WHERE is_active = true AND module_id = ANY(%s::uuid[])
+        ORDER BY module_id, order_index
+        """,
+        (list(modules),),
+    )
+    for module_id, *values in cursor.fetchall():
+        modules[module_id]["sections"].append(dict(zip(SECTION_FIELDS + ("content",), values)))
+    return modules
+
+
+def upload(session, path, body):
+    url = os.environ.get("SUPABASE_URL")
+    response = session.post(
+        f"{url}/storage/v1/object/{BUCKET}/{path}",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "x-upsert": "true",
+        },
+    )
+    if response.status_code not in (200, 201):
+        raise PublishError(f"upload {path}: {response.status_code} {response.text}")
+
+
+def storage_session():
+    try:
+        # Uploads overwrite (x-upsert) a content-hashed path, so retrying one is safe.
+        return supabase_session(retry_post=True)[1]
+    except RuntimeError as e:
+        raise PublishError(f"{e} (or pass --no-upload)")
+
+
+def publish(module_ids=None, out_dir=DEFAULT_OUT, upload_to_storage=True, force=False, database_url=None):
+    """Build, store and register bundles; return the number published."""
+    session = storage_session() if upload_to_storage else None
+    published = 0
+    with connection(database_url) as conn:
+        conn.set_session(isolation_level="REPEATABLE READ")
+        try:
+            with conn.cursor() as cursor:
+                modules = load_modules(cursor, module_ids)
+                cursor.execute("SELECT module_id::text, version, content_hash FROM public.module_bundles")
+                current = {module_id: (version, content_hash) for module_id, version, content_hash in cursor.fetchall()}
+            conn.rollback()
+        finally:
+            conn.set_session(isolation_level="DEFAULT")
+
+        # Modules that were deactivated or deleted lose their bundle.
+        if module_ids:
+            gone = [module_id for module_id in module_ids if module_id not in modules]
+            if gone:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM public.module_bundles WHERE module_id = ANY(%s::uuid[])", (gone,))
+                conn.commit()
+
+        for module_id, entry in modules.items():
+            _, body, content_hash = build_bundle(entry["module"], entry["sections"], entry["version"])
+            if not force and current.get(module_id) == (entry["version"], content_hash):
+                continue
+
+            path = f"{module_id}/{content_hash}.json"
+            variants = compress(body)
+            target = Path(out_dir) / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+            for suffix, data in variants.items():
+                target.with_name(target.name + suffix).write_bytes(data)
+            if session:
+                upload(session, path, body)
+
+            with conn.cursor() as cursor:
+                # Never replace a bundle built from newer content.
+                cursor.execute(
+                    """
+                    INSERT INTO public.module_bundles
+                      (module_id, version, content_hash, path, size_bytes, gzip_bytes, brotli_bytes, published_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+                    ON CONFLICT (module_id) DO UPDATE SET
+                      version = EXCLUDED.version, content_hash = EXCLUDED.content_hash, path = EXCLUDED.path,
+                      size_bytes = EXCLUDED.size_bytes, gzip_bytes = EXCLUDED.gzip_bytes,
+                      brotli_bytes = EXCLUDED.brotli_bytes, published_at = NOW()
+                    WHERE module_bundles.version <= EXCLUDED.version
+                    """,
+                    (
+                        module_id, entry["version"], content_hash, path, len(body),
+                        len(variants[".gz"]), len(variants[".br"]) if ".br" in variants else None,
+                    ),
+                )
+            conn.commit()
+            published += 1
+            sizes = " ".join(f"{suffix[1:]} {len(data) / 1024:.1f} KB" for suffix, data in variants.items())
+            print(f"📦 {entry['module']['title']} v{entry['version']} → {path} ({len(body) / 1024:.1f} KB, {sizes})")
+
+    if session:
+        session.close()
+    return published
+
+
+def watch(out_dir, upload_to_storage, database_url=None):
+    """Republish modules as their content-change notifications arrive."""
+    listener = connect(database_url)
+    listener.autocommit = True
+    with listener.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    print(f"👂 Listening on {CHANNEL}; Ctrl+C to stop")
+
+    pending = set()
+    try:
+        while True:
+            timeout = WATCH_DEBOUNCE_SECONDS if pending else None
+            if select.select([listener], [], [], timeout) == ([], [], []):
+                changed, pending = sorted(pending), set()
+                count = publish(changed, out_dir, upload_to_storage, database_url=database_url)
+                print(f"✅ Published {count} of {len(changed)} changed modules")
+                continue
+            listener.poll()
+            while listener.notifies:
+                pending.add(listener.notifies.pop(0).payload)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        listener.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish modules as pre-rendered bundles")
+    parser.add_argument("--module", action="append", dest="modules", metavar="ID", help="publish only this module")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="where bundle files are written")
+    parser.add_argument("--no-upload", action="store_true", help="write files only, skip the storage bucket")
+    parser.add_argument("--force", action="store_true", help="republish even when the bundle is current")
+    parser.add_argument("--watch", action="store_true", help="keep running and republish on every save")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    args = parser.parse_args(argv)
+
+    try:
+        started = time.perf_counter()
+        count = publish(args.modules, args.out, not args.no_upload, args.force, args.database_url)
+        print(f"🎉 Published {count} modules in {time.perf_counter() - started:.2f}s")
+        if args.watch:
+            return watch(args.out, not args.no_upload, args.database_url)
+    except (PublishError, psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,47 +0,0 @@
-import os
-import subprocess
-import sys
-
-def run_sql_script():
-    """Execute the content management SQL script"""
-    try:
-        print("🚀 Executando script de configuração do sistema de gerenciamento de conteúdo...")
-        
-        # The SQL script will be executed automatically by the v0 environment
-        # when this Python script runs in the scripts folder
-        
-        print("✅ Tabelas de gerenciamento de conteúdo criadas com sucesso!")
-        print("\n📋 Tabelas criadas:")
-        print("   • module_sections - Seções dos módulos")
-        print("   • module_configurations - Configurações avançadas")
-        print("   • content_templates - Templates reutilizáveis")
-        
-        print("\n🔐 Políticas de segurança (RLS) configuradas:")
-        print("   • Apenas admins podem gerenciar conteúdo")
-        print("   • Usuários podem visualizar seções ativas")
-        
-        print("\n📊 Índices de performance criados")
-        print("   • Busca otimizada por módulo e ordem")
-        print("   • Filtros por tipo de template")
-        
-        print("\n🎯 Templates de exemplo inseridos:")
-        print("   • Reflexão Guiada")
-        print("   • Exercício Prático") 
-        print("   • Meditação Guiada")
-        
-        print("\n✨ Sistema de gerenciamento de conteúdo pronto para uso!")
-        print("   Acesse: /admin-panel/content-editor")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Erro ao executar script: {e}")
-        return False
-
-if __name__ == "__main__":
-    success = run_sql_script()
-    if success:
-        print("\n🎉 Configuração concluída com sucesso!")
-    else:
-        print("\n💥 Falha na configuração")
-        sys.exit(1)
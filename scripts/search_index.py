@@ -0,0 +1,194 @@
+"""Rebuild and benchmark the full-text search indexes (037_full_text_search.sql).
+
+``transformation_modules``, ``module_sections`` and ``daily_reflections``
+carry a generated ``search_vector`` that Postgres recomputes on every write,
+and ``search_content()`` ranks and highlights matches. This tool covers the
+upkeep around them:
+
+* ``status`` lists each table's rows and the size of its vectors and index;
+* ``reindex`` flushes the GIN pending lists, rebuilds the indexes without
+  blocking writes and refreshes the planner statistics;
+* ``benchmark`` loads ``--sections`` synthetic sections inside a transaction,
+  times ``search_content()`` for a few queries and rolls everything back.
+
+Stored vectors only change when their row is written, so changing the
+search_pt/search_es configurations takes a migration that drops and re-adds
+the generated columns, not a reindex.
+
+Usage:
+    python scripts/search_index.py status
+    python scripts/search_index.py reindex
+    python scripts/search_index.py benchmark --sections 100000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+import psycopg2
+
+from benchmark import percentile
+from db import close_pool, connect, connection
+
+# ``index`` is None where no GIN index is kept (reflections are searched per
+# user through the (user_id, reflection_date) index).
+SearchTable = namedtuple("SearchTable", ["table", "index"])
+
+TABLES = [
+    SearchTable("transformation_modules", "idx_transformation_modules_search"),
+    SearchTable("module_sections", "idx_module_sections_search"),
+    SearchTable("daily_reflections", None),
+]
+
+STATUS_SQL = """
+SELECT c.reltuples::BIGINT,
+       pg_size_pretty(pg_relation_size(c.oid)),
+       (SELECT pg_size_pretty(COALESCE(SUM(pg_column_size(t.search_vector)), 0))
+        FROM public.{table} t),
+       pg_size_pretty(COALESCE(pg_relation_size(to_regclass(%s)), 0))
+FROM pg_class c
+WHERE c.oid = 'public.{table}'::regclass
+"""
+
+# Words the synthetic sections are written with, in both app languages.
+WORDS = (
+    "gratidão autoestima relacionamento comunicação propósito coragem perdão confiança "
+    "renovação hábito reflexão emoções limites carinho escuta diálogo paciência respeito "
+    "gratitud autoestima relación comunicación propósito valentía perdón confianza "
+    "renovación hábito reflexión emociones límites cariño escucha diálogo paciencia respeto "
+    "semana tempo casa trabalho família amigos corpo mente dia noite manhã caminho"
+).split()
+
+SYNTHETIC_MODULE_SQL = """
+INSERT INTO public.transformation_modules (title, description, category, is_active, order_index)
+VALUES ('Benchmark de busca', 'Módulo temporário do search_index.py', 'personal', true, 9999)
+RETURNING id
+"""
+
+# The correlated reference to ``g`` makes Postgres draw new words per row.
+SYNTHETIC_SECTIONS_SQL = """
+INSERT INTO public.module_sections (module_id, title, content, section_type, order_index)
+SELECT %(module_id)s, 'Seção ' || g,
+       (SELECT string_agg((%(words)s::TEXT[])[1 + floor(random() * %(word_count)s)::INT], ' ')
+        FROM generate_series(1, %(section_words)s) w
+        WHERE g > 0),
+       'text', g
+FROM generate_series(1, %(sections)s) g
+"""
+
+DEFAULT_QUERIES = ["gratidão", "comunicación familia", '"diálogo paciência"', "confianca -trabalho"]
+
+
+def show_status(conn):
+    with conn.cursor() as cursor:
+        for spec in TABLES:
+            index = f"public.{spec.index}" if spec.index else None
+            cursor.execute(STATUS_SQL.format(table=spec.table), (index,))
+            rows, table_size, vector_size, index_size = cursor.fetchone()
+            indexed = f"index {index_size:>8}" if spec.index else "no GIN index"
+            print(f"   {spec.table:<24} ~{rows:>9} rows  table {table_size:>8}  vectors {vector_size:>8}  {indexed}")
+    conn.rollback()
+
+
+def reindex(conn):
+    """Flush pending lists, rebuild each GIN index and ANALYZE its table.
+
+    ``conn`` must be in autocommit mode: REINDEX CONCURRENTLY cannot run
+    inside a transaction block.
+    """
+    with conn.cursor() as cursor:
+        for spec in TABLES:
+            started = time.perf_counter()
+            if spec.index:
+                cursor.execute("SELECT gin_clean_pending_list(%s::regclass)", (f"public.{spec.index}",))
+                pending = cursor.fetchone()[0]
+                cursor.execute(f"REINDEX INDEX CONCURRENTLY public.{spec.index}")
+                print(f"🔄 {spec.index}: {pending} pending pages flushed, rebuilt")
+            cursor.execute(f"ANALYZE public.{spec.table}")
+            print(f"📊 {spec.table} analyzed ({time.perf_counter() - started:.2f}s)")
+
+
+def load_synthetic_sections(cursor, sections, section_words):
+    cursor.execute(SYNTHETIC_MODULE_SQL)
+    module_id = cursor.fetchone()[0]
+    cursor.execute(
+        SYNTHETIC_SECTIONS_SQL,
+        {
+            "module_id": module_id,
+            "words": WORDS,
+            "word_count": len(WORDS),
+            "section_words": section_words,
+            "sections": sections,
+        },
+    )
+    cursor.execute("ANALYZE public.module_sections")
+
+
+def benchmark(conn, sections, section_words, queries, iterations):
+    """Time search_content() per query over ``sections`` extra sections.
+
+    Everything runs in one transaction that is rolled back at the end.
+    """
+    results = {}
+    with conn.cursor() as cursor:
+        started = time.perf_counter()
+        if sections:
+            load_synthetic_sections(cursor, sections, section_words)
+        cursor.execute("SELECT COUNT(*) FROM public.module_sections")
+        total = cursor.fetchone()[0]
+        print(f"📦 {total} sections ({sections} synthetic, loaded in {time.perf_counter() - started:.1f}s)")
+
+        for query in queries:
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                cursor.execute("SELECT * FROM public.search_content(%s, 'pt', 20)", (query,))
+                rows = len(cursor.fetchall())
+                samples.append((time.perf_counter() - started) * 1000)
+            results[query] = (statistics.median(samples), percentile(samples, 0.95), rows)
+    conn.rollback()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or benchmark the full-text search indexes")
+    parser.add_argument("command", choices=("status", "reindex", "benchmark"))
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    parser.add_argument("--sections", type=int, default=100_000, help="benchmark: synthetic sections to load")
+    parser.add_argument("--section-words", type=int, default=150, help="benchmark: words per synthetic section")
+    parser.add_argument("--iterations", type=int, default=20, help="benchmark: timed runs per query")
+    parser.add_argument("--query", action="append", dest="queries", help="benchmark: search for this (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "reindex":
+            conn = connect(args.database_url)
+            try:
+                conn.autocommit = True
+                reindex(conn)
+            finally:
+                conn.close()
+            print("✅ Search indexes rebuilt")
+            return 0
+
+        with connection(args.database_url) as conn:
+            if args.command == "status":
+                show_status(conn)
+                return 0
+            queries = args.queries or DEFAULT_QUERIES
+            results = benchmark(conn, args.sections, args.section_words, queries, args.iterations)
+    except (psycopg2.Error, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        close_pool()
+
+    for query, (p50, p95, rows) in results.items():
+        print(f"⏱️  {query:<32} p50 {p50:>8.2f} ms  p95 {p95:>8.2f} ms  rows {rows:>3}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
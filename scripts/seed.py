@@ -0,0 +1,297 @@
+"""Load declarative seed files (YAML or JSON) into the database in bulk.
+
+A seed file maps table names to lists of rows, in dependency order::
+
+    transformation_modules:
+      - $key: autoconhecimento
+        title: Autoconhecimento Básico
+    module_sections:
+      - $key: autoconhecimento/principal
+        module_id: {$ref: transformation_modules/autoconhecimento}
+        title: Conteúdo Principal
+
+``$key`` names a row inside the file and ``{$ref: table/key}`` points at the
+``id`` of an earlier row, whether that id was given or derived. Ids are derived from the keys (UUIDv5), so parent
+and child rows are linked before anything is sent and re-running a seed
+updates rows in place instead of duplicating them.
+
+Two backends are available:
+
+* ``copy`` streams each table into a temporary table with ``COPY FROM STDIN``
+  and upserts it with one ``INSERT ... SELECT ... ON CONFLICT``, all in one
+  transaction (needs POSTGRES_URL).
+* ``rest`` sends batched multi-row upserts to PostgREST over one keep-alive
+  session (needs SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY).
+
+Usage:
+    python scripts/seed.py scripts/seeds/sample_content.yaml
+    python scripts/seed.py scripts/seeds/sample_content.yaml --copies 2500
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+KEY_FIELD = "$key"
+REF_FIELD = "$ref"
+
+# Fixed namespace so the same seed key always maps to the same row id.
+SEED_NAMESPACE = uuid.UUID("6f1c7a52-3f0e-4d8e-9a51-2b7d2f0c9e11")
+
+
+class SeedError(Exception):
+    pass
+
+
+def load_seed_file(path):
+    """Parse a ``.json``, ``.yaml`` or ``.yml`` seed file into ``{table: rows}``."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SeedError("PyYAML is required for YAML seed files (pip install pyyaml)")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise SeedError(f"{path}: expected a mapping of table name to rows")
+    return data
+
+
+def seed_id(table, key):
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{table}/{key}"))
+
+
+def _copy_key(key, copy):
+    return key if copy == 1 else f"{key}#{copy}"
+
+
+def resolve_rows(tables, copies=1):
+    """Yield ``(table, columns, rows)`` with ids assigned and refs resolved.
+
+    Every keyed row gets ``id`` from its key unless it sets one explicitly.
+    With ``copies > 1`` the whole graph is repeated with suffixed keys, so
+    copy *n* of a section points at copy *n* of its module; explicit ids
+    cannot be repeated and are rejected then. A ``$ref`` resolves to the id
+    the referenced row was actually given, explicit or derived.
+    """
+    ids = {}  # (table, key, copy) -> id of every keyed row emitted so far
+    for table, rows in tables.items():
+        if not isinstance(rows, list):
+            raise SeedError(f"{table}: expected a list of rows")
+        columns = []
+        for row in rows:
+            for column in row:
+                if column != KEY_FIELD and column not in columns:
+                    columns.append(column)
+        if "id" not in columns:
+            columns.insert(0, "id")
+        elif copies > 1:
+            raise SeedError(f"{table}: rows with an explicit id cannot be seeded with --copies > 1")
+
+        resolved = []
+        for copy in range(1, copies + 1):
+            for row in rows:
+                out = {}
+                for column, value in row.items():
+                    if column == KEY_FIELD:
+                        continue
+                    if isinstance(value, dict) and REF_FIELD in value:
+                        ref_table, _, ref_key = value[REF_FIELD].partition("/")
+                        if (ref_table, ref_key, copy) not in ids:
+                            raise SeedError(f"{table}: unresolved reference {value[REF_FIELD]!r}")
+                        value = ids[(ref_table, ref_key, copy)]
+                    out[column] = value
+                if "id" not in out:
+                    if KEY_FIELD in row:
+                        out["id"] = seed_id(table, _copy_key(row[KEY_FIELD], copy))
+                    else:
+                        fingerprint = json.dumps(row, sort_keys=True, default=str)
+                        out["id"] = seed_id(table, _copy_key(fingerprint, copy))
+                if KEY_FIELD in row:
+                    ids[(table, row[KEY_FIELD], copy)] = out["id"]
+                resolved.append(out)
+
+        yield table, columns, resolved
+
+
+def _copy_literal(value, is_array):
+    """Encode one value for ``COPY ... (FORMAT text)``."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        text = "t" if value else "f"
+    elif isinstance(value, (dict, list)) and not is_array:
+        text = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, list):
+        items = ('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in value)
+        text = "{" + ",".join(items) + "}"
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class RowStream(io.TextIOBase):
+    """File-like view over an iterator of rows, encoded lazily for COPY."""
+
+    def __init__(self, rows, columns, array_columns):
+        self._lines = (
+            "\t".join(_copy_literal(row.get(c), c in array_columns) for c in columns) + "\n"
+            for row in rows
+        )
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def table_columns(cursor, table, schema="public"):
+    """Return ``{column: data_type}`` for a table, in column order."""
+    cursor.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position",
+        (schema, table),
+    )
+    return dict(cursor.fetchall())
+
+
+def copy_into(cursor, target, columns, rows, array_columns=()):
+    """Stream ``rows`` into ``target`` (a ``psycopg2.sql`` identifier) with COPY."""
+    from psycopg2 import sql
+
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    cursor.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN").format(target, column_list).as_string(cursor),
+        RowStream(rows, columns, set(array_columns)),
+    )
+
+
+def copy_rows(cursor, table, columns, rows, conflict_column="id"):
+    """Stream ``rows`` into ``public.<table>`` via a staging table and upsert them.
+
+    Returns the number of rows written.
+    """
+    from psycopg2 import sql
+
+    types = table_columns(cursor, table)
+    array_columns = {name for name, data_type in types.items() if data_type == "ARRAY"}
+
+    target = sql.Identifier("public", table)
+    staging = sql.Identifier(f"seed_{table}")
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    updates = sql.SQL(", ").join(
+        sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in columns if c != conflict_column
+    )
+
+    cursor.execute(
+        sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(staging, target)
+    )
+    copy_into(cursor, staging, columns, rows, array_columns)
+    conflict_action = (
+        sql.SQL("DO UPDATE SET {}").format(updates) if len(columns) > 1 else sql.SQL("DO NOTHING")
+    )
+    cursor.execute(
+        sql.SQL("INSERT INTO {target} ({cols}) SELECT {cols} FROM {staging} ON CONFLICT ({key}) {action}").format(
+            target=target,
+            cols=column_list,
+            staging=staging,
+            key=sql.Identifier(conflict_column),
+            action=conflict_action,
+        )
+    )
+    written = cursor.rowcount
+    cursor.execute(sql.SQL("DROP TABLE {}").format(staging))
+    return written
+
+
+def seed_via_copy(resolved, database_url=None):
+    """Load every table in one transaction on one pooled connection."""
+    from db import connection
+
+    counts = {}
+    with connection(database_url) as conn:
+        with conn.cursor() as cursor:
+            for table, columns, rows in resolved:
+                counts[table] = copy_rows(cursor, table, columns, rows)
+        conn.commit()
+    return counts
+
+
+def seed_via_rest(resolved, batch_size=1000):
+    """Upsert every table through PostgREST in batches of ``batch_size`` rows."""
+    from db import supabase_session
+
+    # Every POST is an on_conflict upsert, so a retried batch cannot duplicate rows.
+    url, session = supabase_session(
+        {"Content-Type": "application/json", "Prefer": "resolution=merge-duplicates,return=minimal"},
+        retry_post=True,
+    )
+    counts = {}
+    with session:
+        for table, columns, rows in resolved:
+            for start in range(0, len(rows), batch_size):
+                # PostgREST takes the columns of a bulk insert from its first
+                # object, so every row carries all of them (missing ones as
+                # null, like the COPY path writes them).
+                batch = [{c: row.get(c) for c in columns} for row in rows[start : start + batch_size]]
+                response = session.post(f"{url}/rest/v1/{table}", params={"on_conflict": "id"}, json=batch)
+                if response.status_code not in (200, 201, 204):
+                    raise SeedError(f"{table}: {response.status_code} {response.text}")
+            counts[table] = len(rows)
+    return counts
+
+
+def seed(path, via="copy", copies=1, batch_size=1000, database_url=None):
+    resolved = list(resolve_rows(load_seed_file(path), copies))
+    if via == "rest":
+        return seed_via_rest(resolved, batch_size)
+    return seed_via_copy(resolved, database_url)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load declarative seed files in bulk")
+    parser.add_argument("files", nargs="+", help="YAML or JSON seed files, applied in order")
+    parser.add_argument("--via", choices=["copy", "rest"], default="copy")
+    parser.add_argument("--copies", type=int, default=1, help="repeat the seed graph N times (load environments)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per PostgREST request")
+    parser.add_argument("--database-url", help="defaults to $POSTGRES_URL")
+    args = parser.parse_args(argv)
+
+    try:
+        for path in args.files:
+            started = time.perf_counter()
+            counts = seed(path, args.via, args.copies, args.batch_size, args.database_url)
+            elapsed = time.perf_counter() - started
+            for table, count in counts.items():
+                print(f"✅ {table}: {count} rows")
+            print(f"🌱 Seeded {path} in {elapsed:.2f}s")
+    except Exception as e:
+        print(f"❌ Error seeding: {e}")
+        return 1
+    finally:
+        if args.via == "copy":
+            from db import close_pool
+
+            close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())